@@ -266,4 +266,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Für den Prozess-Pool der GoPro-Extraktion (PyInstaller-Build)
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
@@ -84,6 +84,32 @@ def _get_license_path() -> str:
 base_temp = tempfile.gettempdir()
 TMP_KEYFRAME_DIR = os.path.join(base_temp, "my_KVRouite_keyframes")
 
+def get_cache_dir() -> str:
+    """
+    Dauerhafter Cache-Ordner (wird beim Start NICHT geleert):
+    - Windows => %LOCALAPPDATA%/KVRouite/cache
+    - macOS   => ~/Library/Caches/KVRouite
+    - Linux   => $XDG_CACHE_HOME/KVRouite (Default ~/.cache/KVRouite)
+    """
+    current_system = platform.system()
+    if current_system == 'Windows':
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(root, "KVRouite", "cache")
+    elif current_system == 'Darwin':
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "KVRouite")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(root, "KVRouite")
+
+# Keyframe-Index pro Videodatei (Fingerprint), überlebt Neustarts
+KEYFRAME_CACHE_DIR = os.path.join(get_cache_dir(), "keyframes")
+
+# Fertig gerenderte Export-Segmente (Schlüssel = Hash der Eingaben)
+RENDER_CACHE_DIR = os.path.join(get_cache_dir(), "render")
+
+# Dekodierte Terrain-RGB-Tiles (Höhen) für "Get Elevation"
+ELEVATION_CACHE_DIR = os.path.join(get_cache_dir(), "elevation")
+
 def get_temp_segments_dir() -> str:
     """
     Gibt den konfigurierten Temp-Ordner zurück, falls gesetzt,
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/cut_index.py
+#
+# Zeit-Umrechnung zwischen Rohvideo ("global") und geschnittenem Video
+# ("final"). Die Cuts werden einmal sortiert und verschmolzen, daraus
+# entstehen die Keep-Intervalle samt kumulierter Längen. Alle Abfragen
+# sind dann Binärsuchen (bisect), statt bei jedem Timer-Tick die ganze
+# Cut-Liste neu aufzubauen und linear zu durchlaufen.
+
+from bisect import bisect_right
+
+
+# Toleranz wie bisher in get_final_time_for_global / get_global_time_for_final
+EPS = 1e-9
+
+
+def merge_cut_intervals(cut_intervals):
+    """Sortiert die Cuts und verschmilzt überlappende/angrenzende Bereiche."""
+    if not cut_intervals:
+        return []
+    sorted_cuts = sorted(((float(st), float(en)) for st, en in cut_intervals),
+                         key=lambda x: x[0])
+    merged = []
+    current_start, current_end = sorted_cuts[0]
+    for st, en in sorted_cuts[1:]:
+        if st <= current_end:
+            if en > current_end:
+                current_end = en
+        else:
+            merged.append((current_start, current_end))
+            current_start, current_end = st, en
+    merged.append((current_start, current_end))
+    return merged
+
+
+class CutIndex:
+    """
+    Unveränderlicher Index über Cuts und Gesamtdauer.
+    Bei jeder Änderung der Cuts einen neuen bauen (VideoCutManager.cut_index).
+    """
+
+    def __init__(self, cut_intervals, total_duration):
+        self.total_duration = float(total_duration)
+        self.cuts = merge_cut_intervals(cut_intervals)
+        self.cut_starts = [st for st, _ in self.cuts]
+
+        keeps = []
+        pos = 0.0
+        for cst, cen in self.cuts:
+            if cst > pos:
+                keeps.append((pos, cst))
+            pos = cen
+        if pos < self.total_duration:
+            keeps.append((pos, self.total_duration))
+        self.keeps = keeps
+        self.keep_starts = [st for st, _ in keeps]
+
+        # final_starts[i] = Summe der Keep-Längen vor Keep i
+        self.final_starts = []
+        self.final_ends = []
+        acc = 0.0
+        for kst, ken in keeps:
+            self.final_starts.append(acc)
+            acc += ken - kst
+            self.final_ends.append(acc)
+        self.final_duration = acc
+
+    def __len__(self):
+        return len(self.cuts)
+
+    def cut_at(self, global_s: float):
+        """Verschmolzener Cut (start, end) mit start <= global_s < end oder None."""
+        i = bisect_right(self.cut_starts, global_s) - 1
+        if i >= 0 and global_s < self.cuts[i][1]:
+            return self.cuts[i]
+        return None
+
+    def is_in_cut(self, global_s: float) -> bool:
+        return self.cut_at(global_s) is not None
+
+    def global_to_final(self, global_s: float) -> float:
+        """
+        Rohvideo-Zeit => Zeit im geschnittenen Video. Liegt global_s in einem
+        Cut (oder exakt auf einem Keep-Start), ergibt sich das Ende des
+        vorherigen Keep-Segments.
+        """
+        i = bisect_right(self.keep_starts, global_s + EPS) - 1
+        if i < 0:
+            return 0.0
+        kstart, kend = self.keeps[i]
+        if abs(global_s - kstart) <= EPS:
+            return self.final_starts[i]
+        if global_s < kend - EPS:
+            return self.final_starts[i] + (global_s - kstart)
+        return self.final_ends[i]
+
+    def final_to_global(self, final_s: float) -> float:
+        """
+        Zeit im geschnittenen Video => Rohvideo-Zeit. Exakt auf einem
+        Keep-Ende geht es am Anfang des nächsten Keep-Segments weiter.
+        """
+        i = bisect_right(self.final_ends, final_s + EPS)
+        if i >= len(self.keeps):
+            return self.total_duration
+        local = final_s - self.final_starts[i]
+        if abs(local) <= EPS:
+            local = 0.0
+        return self.keeps[i][0] + local
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/elevation_tiles.py
+#
+# Höhenwerte aus Terrain-RGB-Tiles (Mapbox oder lokaler Ordner).
+#
+# Jedes Tile wird genau einmal dekodiert (Höhe = -10000 + (R*65536 +
+# G*256 + B) * 0.1) und als float32-Array gehalten:
+#   - im Speicher (LRU, MAX_MEMORY_TILES)
+#   - auf der Platte unter ELEVATION_CACHE_DIR/<quelle>/<größe>px/z/x/y.npy
+#     (überlebt Neustarts, LRU-Aufräumen über mtime wie RenderCache)
+# Fehlende Tiles werden parallel geholt (ThreadPoolExecutor); ein zweiter
+# Lauf über dieselbe Gegend kommt ohne Netzwerk aus.
+#
+# Ein lokaler Tile-Ordner (z/x/y.png bzw. .pngraw/.webp) wird vor dem
+# Platten-Cache und dem Netz gefragt; dessen Tiles landen nur im
+# Speicher-Cache. Er darf auch 512er-Tiles enthalten.
+#
+# sample() rechnet für alle Punkte auf einmal (NumPy) bilinear zwischen
+# den vier Nachbarpixeln; Tiles anderer Größe werden vorher auf die größte
+# vorkommende Größe umgerechnet.
+
+import io
+import os
+import threading
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from config import ELEVATION_CACHE_DIR
+
+
+# Zoomstufe wie bisher in update_elevation_from_mapbox (~10 m/Pixel)
+DEFAULT_ZOOM = 14
+
+MAPBOX_TERRAIN_URL = ("https://api.mapbox.com/v4/mapbox.terrain-rgb/"
+                      "{z}/{x}/{y}.pngraw?access_token={token}")
+
+# Größe der .pngraw-Tiles von MAPBOX_TERRAIN_URL (ohne @2x)
+MAPBOX_TILE_SIZE = 256
+
+# Dekodierte Tiles im Speicher (256x256 float32 = 256 KB pro Tile)
+MAX_MEMORY_TILES = 128
+
+# Darüber hinaus werden die am längsten nicht benutzten .npy gelöscht
+MAX_CACHE_BYTES = 512 * 1024 ** 2
+
+# Download wartet fast nur aufs Netz => mehr Threads als Kerne ok
+MAX_FETCH_WORKERS = 8
+
+FETCH_TIMEOUT_S = 20
+
+LOCAL_TILE_EXTENSIONS = (".pngraw", ".png", ".webp")
+
+
+def decode_terrain_rgb(data: bytes) -> np.ndarray:
+    """PNG/WebP-Bytes eines Terrain-RGB-Tiles => Höhen (float32, Meter)."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        rgb = np.asarray(img.convert("RGB"), dtype=np.uint32)
+    code = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    return (code * 0.1 - 10000.0).astype(np.float32)
+
+
+def resample_tile(arr: np.ndarray, size: int) -> np.ndarray:
+    """Quadratisches Höhen-Tile bilinear auf size x size umrechnen."""
+    src = arr.shape[0]
+    if src == size:
+        return arr
+    # Pixelmitten des Ziels im Quell-Raster
+    pos = np.clip((np.arange(size) + 0.5) * src / size - 0.5, 0, src - 1)
+    i0 = np.floor(pos).astype(np.int64)
+    i1 = np.minimum(i0 + 1, src - 1)
+    f = pos - i0
+    a = arr.astype(np.float64)
+    rows = a[i0, :] * (1 - f)[:, None] + a[i1, :] * f[:, None]
+    out = rows[:, i0] * (1 - f)[None, :] + rows[:, i1] * f[None, :]
+    return out.astype(np.float32)
+
+
+def _world_xy(lat, lon, zoom: int):
+    """lat/lon (Arrays) => Web-Mercator-Koordinaten in Tile-Einheiten."""
+    n = float(2 ** zoom)
+    lat_r = np.radians(np.asarray(lat, dtype=np.float64))
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * n
+    y = (1.0 - np.log(np.tan(lat_r) + 1.0 / np.cos(lat_r)) / np.pi) / 2.0 * n
+    return x, y
+
+
+def tiles_for_points(lat, lon, zoom: int = DEFAULT_ZOOM) -> list:
+    """Alle (x, y)-Tiles, in denen die Punkte liegen (sortiert, ohne Doppelte)."""
+    x, y = _world_xy(lat, lon, zoom)
+    n = 2 ** zoom
+    tx = np.clip(np.floor(x), 0, n - 1).astype(np.int64)
+    ty = np.clip(np.floor(y), 0, n - 1).astype(np.int64)
+    keys = np.unique(tx * n + ty)
+    return [(int(k // n), int(k % n)) for k in keys]
+
+
+class ElevationTileCache:
+    """
+    Terrain-RGB-Tiles einer Quelle (Mapbox-Token und/oder lokaler Ordner).
+    Thread-sicher; fetch() darf aus einem Worker-Thread laufen.
+    """
+
+    def __init__(self, token: str = "", local_dir: str = "",
+                 cache_dir: str = ELEVATION_CACHE_DIR, zoom: int = DEFAULT_ZOOM,
+                 max_bytes: int = MAX_CACHE_BYTES):
+        self.token = (token or "").strip()
+        self.local_dir = local_dir or ""
+        self.zoom = zoom
+        self.max_bytes = max_bytes
+        self.cache_dir = os.path.join(cache_dir, "mapbox-terrain-rgb")
+        self.network_fetches = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._written = 0  # neu geschriebene Bytes seit dem letzten prune()
+
+    @property
+    def has_source(self) -> bool:
+        return bool(self.token or (self.local_dir and os.path.isdir(self.local_dir)))
+
+    # ----------------------------------------------------------
+    # einzelne Quellen
+    # ----------------------------------------------------------
+    def _disk_path(self, x: int, y: int, size: int = MAPBOX_TILE_SIZE) -> str:
+        # pro Quelle (cache_dir) und Tile-Größe getrennt
+        return os.path.join(self.cache_dir, f"{size}px", str(self.zoom), str(x), f"{y}.npy")
+
+    def _remember(self, key, arr):
+        with self._lock:
+            self._memory[key] = arr
+            self._memory.move_to_end(key)
+            while len(self._memory) > MAX_MEMORY_TILES:
+                self._memory.popitem(last=False)
+
+    def _from_memory(self, key):
+        with self._lock:
+            arr = self._memory.get(key)
+            if arr is not None:
+                self._memory.move_to_end(key)
+            return arr
+
+    def _from_disk(self, x: int, y: int):
+        path = self._disk_path(x, y)
+        try:
+            arr = np.load(path)
+            os.utime(path)  # für das Aufräumen: zuletzt benutzt
+        except (OSError, ValueError):
+            return None
+        return arr
+
+    def _from_local_dir(self, x: int, y: int):
+        if not self.local_dir:
+            return None
+        base = os.path.join(self.local_dir, str(self.zoom), str(x), str(y))
+        for ext in LOCAL_TILE_EXTENSIONS:
+            path = base + ext
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    return decode_terrain_rgb(f.read())
+        return None
+
+    def _from_network(self, x: int, y: int):
+        if not self.token:
+            return None
+        url = MAPBOX_TERRAIN_URL.format(z=self.zoom, x=x, y=y, token=self.token)
+        with urllib.request.urlopen(url, timeout=FETCH_TIMEOUT_S) as response:
+            data = response.read()
+        with self._lock:
+            self.network_fetches += 1
+        arr = decode_terrain_rgb(data)
+
+        # atomar schreiben => abgebrochene Läufe hinterlassen keine halben Tiles
+        path = self._disk_path(x, y, arr.shape[0])
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.part"
+            with open(tmp_path, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._written += arr.nbytes
+        except OSError as e:
+            print(f"[WARN] Höhen-Tile nicht gespeichert ({x},{y}): {e}")
+        return arr
+
+    def load_tile(self, x: int, y: int):
+        """
+        Ein Tile als Höhen-Array: Speicher => lokaler Ordner => Platte => Netz.
+        None, wenn keine Quelle es hat. Netzfehler werden weitergereicht.
+        """
+        key = (x, y)
+        arr = self._from_memory(key)
+        if arr is not None:
+            return arr
+        # Gewollte Reihenfolge: lokaler Ordner zuerst (vom Benutzer gewählt,
+        # evtl. genauer als Mapbox, wird nie auf die Platte kopiert), dann
+        # der Platten-Cache (nur Mapbox-Tiles), erst zuletzt das Netz.
+        for source in (self._from_local_dir, self._from_disk, self._from_network):
+            arr = source(x, y)
+            if arr is not None:
+                self._remember(key, arr)
+                return arr
+        return None
+
+    # ----------------------------------------------------------
+    # mehrere Tiles / Abfrage
+    # ----------------------------------------------------------
+    def fetch(self, tiles, progress_func=None, max_workers=MAX_FETCH_WORKERS):
+        """
+        Lädt die Tiles parallel. Rückgabe: (tiles_dict, fehler_dict) mit
+        {(x, y): array} bzw. {(x, y): exception}. Fehlt ein Tile in allen
+        Quellen, steht es in keinem der beiden.
+        progress_func(fertig, gesamt) wird aus den Worker-Threads gerufen.
+        """
+        tiles = list(tiles)
+        loaded, errors = {}, {}
+        todo = []
+        for key in tiles:
+            arr = self._from_memory(key)
+            if arr is not None:
+                loaded[key] = arr
+            else:
+                todo.append(key)
+
+        done = len(loaded)
+        if progress_func is not None:
+            progress_func(done, len(tiles))
+        if todo:
+            workers = max(1, min(max_workers, len(todo)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(self.load_tile, x, y): (x, y) for x, y in todo}
+                for fut in as_completed(futures):
+                    key = futures[fut]
+                    try:
+                        arr = fut.result()
+                    except Exception as e:  # urllib/PIL/OS-Fehler
+                        errors[key] = e
+                    else:
+                        if arr is not None:
+                            loaded[key] = arr
+                    done += 1
+                    if progress_func is not None:
+                        progress_func(done, len(tiles))
+
+        if self._written:
+            self.prune()
+        return loaded, errors
+
+    def sample(self, lat, lon, tiles: dict) -> np.ndarray:
+        """
+        Bilinear interpolierte Höhen für alle Punkte (Arrays gleicher Länge).
+        Nachbarpixel aus nicht geladenen Tiles werden durch den Rand des
+        eigenen Tiles ersetzt. Punkte ohne geladenes Tile => NaN.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        out = np.full(lat.shape, np.nan)
+        if not tiles or lat.size == 0:
+            return out
+
+        n = 2 ** self.zoom
+        keys = sorted(tiles)
+        # Tiles aus verschiedenen Quellen können verschieden groß sein
+        size = max(tiles[k].shape[0] for k in keys)
+        stack = np.stack([resample_tile(tiles[k], size) for k in keys])
+        codes = np.array([x * n + y for x, y in keys], dtype=np.int64)
+
+        def _tile_index(tx, ty):
+            c = tx * n + ty
+            pos = np.clip(np.searchsorted(codes, c), 0, len(codes) - 1)
+            return np.where(codes[pos] == c, pos, -1)
+
+        wx, wy = _world_xy(lat, lon, self.zoom)
+        wx = np.clip(wx, 0.0, n - 1e-9)
+        wy = np.clip(wy, 0.0, n - 1e-9)
+        own_tx = np.floor(wx).astype(np.int64)
+        own_ty = np.floor(wy).astype(np.int64)
+        own = _tile_index(own_tx, own_ty)
+        valid = own >= 0
+        if not valid.any():
+            return out
+
+        # Pixelmitten liegen bei +0.5 => Nachbarn links/oben bzw. rechts/unten
+        px = wx * size - 0.5
+        py = wy * size - 0.5
+        x0 = np.floor(px).astype(np.int64)
+        y0 = np.floor(py).astype(np.int64)
+        fx = px - x0
+        fy = py - y0
+
+        def _pixel(gx, gy):
+            gx = np.clip(gx, 0, n * size - 1)
+            gy = np.clip(gy, 0, n * size - 1)
+            t = _tile_index(gx // size, gy // size)
+            lx, ly = gx % size, gy % size
+            # Nachbar-Tile fehlt => Rand des eigenen Tiles
+            missing = t < 0
+            t = np.where(missing, own, t)
+            lx = np.where(missing, np.clip(gx - own_tx * size, 0, size - 1), lx)
+            ly = np.where(missing, np.clip(gy - own_ty * size, 0, size - 1), ly)
+            return stack[t[valid], ly[valid], lx[valid]].astype(np.float64)
+
+        fx, fy = fx[valid], fy[valid]
+        top = _pixel(x0, y0) * (1 - fx) + _pixel(x0 + 1, y0) * fx
+        bottom = _pixel(x0, y0 + 1) * (1 - fx) + _pixel(x0 + 1, y0 + 1) * fx
+        out[valid] = top * (1 - fy) + bottom * fy
+        return out
+
+    def prune(self):
+        """Älteste .npy löschen, bis der Platten-Cache unter max_bytes liegt."""
+        self._written = 0
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        print(f"[DEBUG] Höhen-Cache aufgeräumt => {total / 1024 ** 2:.0f} MB")
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/ffmpeg_runner.py
+#
+# Gemeinsamer ffmpeg-Fortschrittskanal für alle Dialoge.
+#
+# ffmpeg bekommt "-progress pipe:1 -nostats": auf stdout kommen dann
+# key=value-Blöcke (frame, fps, speed, out_time_us, ..., progress=continue),
+# stderr enthält nur noch echte Meldungen statt einer Statuszeile pro Frame.
+# FFmpegProgress parst stdout stückweise (auch halbe Zeilen aus QProcess),
+# LogTail hält nur die letzten N stderr-Zeilen im Speicher.
+#
+# run_ffmpeg() ist die blockierende Variante (Worker-Threads, xfade_main),
+# die QProcess-Dialoge füttern FFmpegProgress/LogTail direkt.
+
+import time
+import queue
+import threading
+import subprocess
+from collections import deque
+
+
+def add_progress_args(cmd):
+    """Hängt "-progress pipe:1 -nostats" direkt hinter das ffmpeg-Programm."""
+    cmd = list(cmd)
+    if "-progress" in cmd:
+        return cmd
+    return cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
+
+
+def _parse_float(value, suffix=""):
+    if value is None:
+        return None
+    value = value.strip()
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return None  # "N/A"
+
+
+def format_hms(seconds) -> str:
+    if seconds is None:
+        return "--:--:--"
+    s = int(max(0, seconds))
+    return f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}"
+
+
+class FFmpegProgress:
+    """
+    Inkrementeller Parser für "-progress"-Ausgabe.
+    feed(text) nimmt beliebige Stücke, nach jedem vollständigen Block
+    (Zeile "progress=...") sind frame/fps/speed/out_time_s aktuell.
+    """
+
+    def __init__(self, total_duration=None):
+        self.total_duration = total_duration
+        self.values = {}
+        self.finished = False
+        self.blocks = 0
+        self._partial = ""
+        self._block = {}
+
+    def feed(self, text: str) -> int:
+        """Verarbeitet text, gibt die Anzahl abgeschlossener Blöcke zurück."""
+        *lines, self._partial = (self._partial + text).split("\n")
+        done = 0
+        for line in lines:
+            key, sep, value = line.strip().partition("=")
+            if not sep:
+                continue
+            self._block[key] = value
+            if key == "progress":
+                self.values.update(self._block)
+                self._block = {}
+                self.finished = value == "end"
+                self.blocks += 1
+                done += 1
+        return done
+
+    @property
+    def frame(self):
+        v = _parse_float(self.values.get("frame"))
+        return int(v) if v is not None else None
+
+    @property
+    def fps(self):
+        return _parse_float(self.values.get("fps"))
+
+    @property
+    def speed(self):
+        """Faktor gegenüber Echtzeit ("1.5x" => 1.5)."""
+        return _parse_float(self.values.get("speed"), "x")
+
+    @property
+    def out_time_s(self):
+        # out_time_us ist in allen Versionen vorhanden (out_time_ms heißt nur so)
+        us = _parse_float(self.values.get("out_time_us") or self.values.get("out_time_ms"))
+        return us / 1e6 if us is not None and us >= 0 else None
+
+    def fraction(self, total_duration=None):
+        total = total_duration or self.total_duration
+        if self.finished:
+            return 1.0
+        t = self.out_time_s
+        if not total or t is None:
+            return None
+        return min(1.0, max(0.0, t / total))
+
+    def eta_s(self, total_duration=None):
+        """Restzeit in Sekunden aus out_time und speed (None, wenn unbekannt)."""
+        total = total_duration or self.total_duration
+        t = self.out_time_s
+        speed = self.speed
+        if not total or t is None or not speed or speed <= 0:
+            return None
+        return max(0.0, (total - t) / speed)
+
+    def format(self, total_duration=None) -> str:
+        total = total_duration or self.total_duration
+        parts = [f"frame={self.frame if self.frame is not None else '-'}"]
+        if self.fps is not None:
+            parts.append(f"fps={self.fps:.1f}")
+        if self.speed is not None:
+            parts.append(f"speed={self.speed:.2f}x")
+        time_str = format_hms(self.out_time_s)
+        if total:
+            time_str += f" / {format_hms(total)}"
+        parts.append(f"time={time_str}")
+        eta = self.eta_s(total)
+        if eta is not None:
+            parts.append(f"ETA {format_hms(eta)}")
+        return "  ".join(parts)
+
+
+class LogTail:
+    """Die letzten max_lines Zeilen eines Logs (stückweise gefüttert)."""
+
+    def __init__(self, max_lines=200):
+        self.lines = deque(maxlen=max_lines)
+        self._partial = ""
+
+    def feed(self, text: str) -> list:
+        """Speichert vollständige Zeilen und gibt sie zurück."""
+        *lines, self._partial = (self._partial + text.replace("\r", "\n")).split("\n")
+        lines = [ln.rstrip() for ln in lines if ln.strip()]
+        self.lines.extend(lines)
+        return lines
+
+    def flush(self) -> list:
+        rest = self._partial
+        self._partial = ""
+        return self.feed(rest + "\n") if rest.strip() else []
+
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def _pump(stream, tag, q):
+    for raw in iter(stream.readline, b""):
+        q.put((tag, raw.decode("utf-8", "replace")))
+    q.put((tag, None))
+
+
+def run_ffmpeg(cmd, log_func=None, progress_func=None, total_duration=None,
+               tail_lines=200, progress_interval=0.5):
+    """
+    Startet ffmpeg mit Fortschrittskanal und wartet auf das Ende.
+    log_func(zeile) für stderr, progress_func(FFmpegProgress) höchstens alle
+    progress_interval Sekunden (und einmal am Ende). Beide werden im
+    aufrufenden Thread ausgeführt; die Pipes lesen zwei Hilfs-Threads.
+    Bei Fehler: CalledProcessError mit dem Log-Ende als .stderr.
+    """
+    cmd = add_progress_args(cmd)
+    progress = FFmpegProgress(total_duration)
+    tail = LogTail(tail_lines)
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    q = queue.Queue()
+    readers = [
+        threading.Thread(target=_pump, args=(proc.stdout, "progress", q), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, "log", q), daemon=True),
+    ]
+    for t in readers:
+        t.start()
+
+    open_streams = len(readers)
+    last_report = 0.0
+    while open_streams:
+        tag, text = q.get()
+        if text is None:
+            open_streams -= 1
+            continue
+        if tag == "log":
+            for line in tail.feed(text):
+                if log_func is not None:
+                    log_func(line)
+        elif progress.feed(text) and progress_func is not None:
+            now = time.monotonic()
+            if progress.finished or now - last_report >= progress_interval:
+                last_report = now
+                progress_func(progress)
+
+    for line in tail.flush():
+        if log_func is not None:
+            log_func(line)
+    proc.wait()
+    for t in readers:
+        t.join()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=tail.text())
+    return progress
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/fingerprint.py
+#
+# Schneller Inhalts-Fingerprint für (große) Videodateien, z. B. als
+# Schlüssel für dauerhafte Caches.
+
+import os
+import hashlib
+
+
+# So viele Bytes werden am Anfang und am Ende der Datei gehasht
+FINGERPRINT_CHUNK = 1024 * 1024
+
+# (Pfad, Größe, mtime_ns) -> Fingerprint, spart das erneute Lesen
+_memo = {}
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Fingerprint aus Dateigröße, mtime und einem Hash über die ersten und
+    letzten FINGERPRINT_CHUNK Bytes. Liest höchstens 2 MiB, egal wie groß
+    die Datei ist. Gleicher Inhalt unter anderem Pfad => gleicher Fingerprint.
+    """
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    fp = _memo.get(memo_key)
+    if fp is not None:
+        return fp
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{st.st_size}:{st.st_mtime_ns}".encode("ascii"))
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_CHUNK))
+        if st.st_size > FINGERPRINT_CHUNK:
+            f.seek(max(FINGERPRINT_CHUNK, st.st_size - FINGERPRINT_CHUNK))
+            h.update(f.read(FINGERPRINT_CHUNK))
+    fp = h.hexdigest()
+    _memo[memo_key] = fp
+    return fp
@@ -42,6 +42,10 @@ import math
 import gc
 import json
 
+import numpy as np
+
+from core.media_probe import probe_media
+
 MY_GLOBAL_TMP_DIR = os.environ.get("KVR_TEMP_DIR", tempfile.gettempdir())
 if not os.path.exists(MY_GLOBAL_TMP_DIR):
     os.makedirs(MY_GLOBAL_TMP_DIR, exist_ok=True)
@@ -105,15 +109,17 @@ def trim_invalid_gps_points(points, max_jump_distance=500, max_tunnel_time_gap=1
 # -----------------------------
 # Robust start time
 # -----------------------------
-def get_video_start_time(video_path, metadata):
+def get_video_start_time(video_path, metadata=None, gpsu_time=None):
     """
     Liefert die realistische Startzeit des Videos.
     Priorität:
-    1. GPSU im Metadata-Stream
+    1. GPSU im Metadata-Stream (oder bereits beim Streamen ermittelt: gpsu_time)
     2. Creation time via FFprobe
     3. Fallback: jetzt
     """
-    start_time = find_gpsu_time(metadata)
+    start_time = gpsu_time
+    if start_time is None and metadata:
+        start_time = find_gpsu_time(metadata)
     if start_time:
         # Prüfen, ob Jahr plausibel ist (z.B. 2020-2030)
         if 2000 <= start_time.year <= 2030:
@@ -124,10 +130,7 @@ def get_video_start_time(video_path, metadata):
 
     # FFprobe creation_time
     try:
-        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', video_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        data = json.loads(result.stdout)
-        creation_time_str = data.get('format', {}).get('tags', {}).get('creation_time')
+        creation_time_str = probe_media(video_path)["creation_time"]
         if creation_time_str:
             try:
                 creation_time = datetime.fromisoformat(creation_time_str.replace('Z', '+00:00'))
@@ -150,166 +153,343 @@ def get_video_start_time(video_path, metadata):
 # -----------------------------
 def get_video_duration(video_path):
     try:
-        cmd = ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'json', video_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        data = json.loads(result.stdout)
-        duration = float(data['format']['duration'])
+        duration = probe_media(video_path)["duration"]
         print(f"Video duration: {duration:.2f} seconds")
         return duration
     except Exception as e:
         print(f"Error getting video duration: {e}")
         return None
 
-def extract_metadata(video_path):
+def find_gpmd_stream_index(video_path):
+    """Index des GoPro-Metadatenstreams (codec_tag 'gpmd') oder None."""
+    index = probe_media(video_path)["gpmd_index"]
+    if index is not None:
+        return index
+    print("No GPMD stream found")
+    return None
+
+
+# Lesegröße für den gpmd-Stream aus ffmpeg (begrenzt den Speicherbedarf)
+GPMF_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_gpmd_chunks(video_path, stream_index, chunk_size=GPMF_CHUNK_SIZE):
+    """
+    Lässt ffmpeg den gpmd-Stream nach stdout kopieren und liefert ihn
+    stückweise (keine Temp-Datei).
+    """
+    cmd = ['ffmpeg', '-v', 'error', '-i', video_path, '-codec', 'copy',
+           '-map', f'0:{stream_index}', '-f', 'rawvideo', 'pipe:1']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
     try:
-        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', video_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        data = json.loads(result.stdout)
-        gpmd_stream = None
-        for stream in data.get('streams', []):
-            if stream.get('codec_tag_string') == 'gpmd':
-                gpmd_stream = stream
+        while True:
+            chunk = proc.stdout.read(chunk_size)
+            if not chunk:
                 break
-        if not gpmd_stream:
-            print("No GPMD stream found")
+            yield chunk
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+
+def extract_metadata(video_path):
+    """Kompletter gpmd-Stream als bytes (nur noch für die Kommandozeile)."""
+    try:
+        stream_index = find_gpmd_stream_index(video_path)
+        if stream_index is None:
             return None
-        stream_index = gpmd_stream['index']
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.bin') as f:
-            temp_path = f.name
-        cmd = ['ffmpeg', '-y', '-i', video_path, '-codec', 'copy', '-map', f'0:{stream_index}', '-f', 'rawvideo', temp_path]
-        subprocess.run(cmd, capture_output=True)
-        with open(temp_path, 'rb') as f:
-            metadata = f.read()
-        os.unlink(temp_path)
-        return metadata
+        return b''.join(iter_gpmd_chunks(video_path, stream_index))
     except Exception as e:
         print(f"Error: {e}")
         return None
 
 # -----------------------------
-# GPS parsing
+# GPS parsing (GPMF / KLV)
 # -----------------------------
-def find_gpsu_time(metadata):
-    gpsu_times = []
-    pos = 0
-    while pos < len(metadata) - 20:
+#
+# GPMF besteht aus KLV-Einträgen: 4 Byte FourCC, 1 Byte Typ, 1 Byte
+# Strukturgröße, 2 Byte Wiederholungen (big endian), danach size*repeat
+# Bytes Nutzdaten, auf 4 Byte aufgefüllt. Typ 0 = verschachtelter Container
+# (DEVC -> STRM -> GPSU/GPSF/GPSP/SCAL/GPS5 ...).
+# Der Walker springt anhand dieser Größen, statt Byte für Byte zu suchen.
+
+_KLV_HEADER = struct.Struct(">4sBBH")
+
+# GPMF-Typzeichen -> numpy dtype (big endian)
+_GPMF_DTYPES = {
+    ord('b'): '>i1', ord('B'): '>u1',
+    ord('s'): '>i2', ord('S'): '>u2',
+    ord('l'): '>i4', ord('L'): '>u4',
+    ord('j'): '>i8', ord('J'): '>u8',
+    ord('f'): '>f4', ord('d'): '>f8',
+}
+
+# Fallback-Skalierung für GPS5, falls kein SCAL im Stream steht
+_GPS5_DEFAULT_SCALE = np.array([10000000.0, 10000000.0, 100.0, 1.0, 1.0])
+
+
+def _decode_gpsu(raw):
+    """'yymmddhhmmss.sss' -> datetime (naiv, UTC) oder None."""
+    time_str = raw.decode('ascii', errors='ignore').split('\x00')[0]
+    if len(time_str) < 14:
+        return None
+    full_time_str = ('20' if time_str[0] in ['0', '1'] else '19') + time_str
+    try:
+        return datetime.strptime(full_time_str[:17], '%Y%m%d%H%M%S.%f')
+    except ValueError:
         try:
-            if metadata[pos:pos+4] == b'GPSU':
-                data_start = pos + 8
-                time_data = metadata[data_start:data_start+20]
-                time_str = time_data.decode('ascii', errors='ignore').split('\x00')[0]
-                if len(time_str) >= 14:
-                    full_time_str = ('20' if time_str[0] in ['0','1'] else '19') + time_str
-                    try:
-                        gpsu_time = datetime.strptime(full_time_str[:17], '%Y%m%d%H%M%S.%f')
-                    except ValueError:
-                        gpsu_time = datetime.strptime(full_time_str[:14], '%Y%m%d%H%M%S')
-                    gpsu_times.append(gpsu_time)
-            pos += 1
-        except Exception:
-            pos += 1
+            return datetime.strptime(full_time_str[:14], '%Y%m%d%H%M%S')
+        except ValueError:
+            return None
+
+
+def _decode_numeric(buf, typ, size, repeat, offset):
+    dtype = _GPMF_DTYPES.get(typ)
+    if dtype is None:
+        return None
+    itemsize = np.dtype(dtype).itemsize
+    if size % itemsize:
+        return None
+    count = size // itemsize * repeat
+    return np.frombuffer(buf, dtype=dtype, count=count, offset=offset)
+
+
+def _walk_container(buf, pos, end, keys, scale):
+    """
+    Läuft über eine Ebene KLV-Einträge in buf[pos:end] und steigt in
+    Container ab. scale ist die (sticky) SCAL-Angabe des aktuellen Streams.
+    """
+    while pos + 8 <= end:
+        key, typ, size, repeat = _KLV_HEADER.unpack_from(buf, pos)
+        length = size * repeat
+        data = pos + 8
+        nxt = data + ((length + 3) & ~3)
+        if nxt > end or not key.isalnum():
+            # Kaputter Eintrag => Rest dieses Containers verwerfen
+            return
+
+        if typ == 0:
+            # STRM bekommt eine eigene Skalierung, DEVC etc. erben nicht
+            yield from _walk_container(buf, data, data + length, keys, [None])
+        elif key == b'SCAL':
+            vals = _decode_numeric(buf, typ, size, repeat, data)
+            if vals is not None and len(vals):
+                scale[0] = vals.astype(np.float64)
+        elif key == b'GPS5':
+            if size == 20 and (keys is None or 'GPS5' in keys):
+                raw = np.frombuffer(buf, dtype='>i4', count=repeat * 5, offset=data)
+                vals = raw.reshape(repeat, 5).astype(np.float64)
+                s = scale[0]
+                if s is None or len(s) not in (1, 5):
+                    s = _GPS5_DEFAULT_SCALE
+                s = np.where(s == 0, 1.0, s)
+                yield 'GPS5', vals / s
+        elif key == b'GPSU':
+            if keys is None or 'GPSU' in keys:
+                t = _decode_gpsu(bytes(buf[data:data + length]))
+                if t is not None:
+                    yield 'GPSU', t
+        elif key == b'GPSF':
+            if keys is None or 'GPSF' in keys:
+                vals = _decode_numeric(buf, typ, size, repeat, data)
+                if vals is not None and len(vals):
+                    yield 'GPSF', int(vals[0])
+        elif key == b'GPSP':
+            if keys is None or 'GPSP' in keys:
+                vals = _decode_numeric(buf, typ, size, repeat, data)
+                if vals is not None and len(vals):
+                    # DOP * 100
+                    yield 'GPSP', float(vals[0]) / 100.0
+        pos = nxt
+
+
+def walk_gpmf(metadata, keys=None):
+    """
+    Einmaliger Durchlauf durch einen rohen GPMF-Stream.
+
+    Liefert (key, wert)-Paare in Stream-Reihenfolge:
+        ('GPSU', datetime)          UTC-Zeit des folgenden GPS5-Blocks
+        ('GPSF', int)               Fix (0 = kein, 2 = 2D, 3 = 3D)
+        ('GPSP', float)             Präzision (DOP)
+        ('GPS5', ndarray (n, 5))    lat, lon, alt, speed2d, speed3d (skaliert)
+    keys: optional Menge der gewünschten Keys (der Rest wird nur übersprungen).
+
+    Ist ein Top-Level-Eintrag kaputt, wird ab dem nächsten 'DEVC' weitergesucht.
+    """
+    pos = 0
+    end = len(metadata)
+    while pos + 8 <= end:
+        key, typ, size, repeat = _KLV_HEADER.unpack_from(metadata, pos)
+        length = size * repeat
+        nxt = pos + 8 + ((length + 3) & ~3)
+        if nxt > end or not key.isalnum():
+            nxt = metadata.find(b'DEVC', pos + 1)
+            if nxt < 0:
+                return
+            pos = nxt
             continue
+        yield from _walk_container(metadata, pos, nxt, keys, [None])
+        pos = nxt
+
+
+def find_gpsu_time(metadata):
+    gpsu_times = [t for _, t in walk_gpmf(metadata, keys=('GPSU',))]
     if gpsu_times:
         start_time = min(gpsu_times)
         print(f"Using start time: {start_time}")
         return start_time
     return None
 
-def parse_gps5_data(metadata):
-    points = []
-    pos = 0
-    current_time = None
 
-    while pos < len(metadata) - 8:
-        try:
-            # GPSU → Zeitstempel extrahieren
-            if metadata[pos:pos+4] == b'GPSU':
-                data_start = pos + 8
-                time_data = metadata[data_start:data_start+20]
-                time_str = time_data.decode('ascii', errors='ignore').split('\x00')[0]
-                if len(time_str) >= 14:
-                    full_time_str = ('20' if time_str[0] in ['0','1'] else '19') + time_str
-                    try:
-                        current_time = datetime.strptime(full_time_str[:17], '%Y%m%d%H%M%S.%f')
-                    except ValueError:
-                        current_time = datetime.strptime(full_time_str[:14], '%Y%m%d%H%M%S')
-
-            # GPS5 → Positionsdaten extrahieren
-            if metadata[pos:pos+4] == b'GPS5':
-                type_byte = metadata[pos+4]
-                size = metadata[pos+5]
-                repeat = struct.unpack_from('>H', metadata, pos+6)[0]
-                data_start = pos + 8
-                for i in range(repeat):
-                    offset = data_start + i*20
-                    if offset + 20 <= len(metadata):
-                        values = struct.unpack_from('>5i', metadata, offset)
-                        lat = values[0] / 10000000.0
-                        lon = values[1] / 10000000.0
-                        alt = values[2] / 100.0
-                        if -90 <= lat <= 90 and -180 <= lon <= 180 and current_time:
-                            # Jeder GPS5-Block folgt typischerweise mit 0.2s Abstand (5Hz)
-                            timestamp = current_time + timedelta(seconds=i*0.2)
-                            points.append((lat, lon, alt, timestamp))
-            pos += 1
-        except Exception:
-            pos += 1
-            continue
-
-    #points = trim_invalid_gps_points(points)
-    print(f"GPS without trimming: {len(points)}")
-    #print(f"Remaining GPS points after trimming: {len(points)}")
-    return points
-
-
-# -----------------------------
-# Temp-JSON-Zwischenspeicherung (RAM-Entlastung)
-# -----------------------------
-import gc
-import json
-
-def save_temp_points(points, video_path, tmp_dir=MY_GLOBAL_TMP_DIR):
+class GPMFStreamParser:
     """
-    Speichert extrahierte Rohpunkte in eine temporäre JSON-Datei.
-    Rückgabe: Pfad zur Datei oder None.
+    Inkrementeller GPMF-Parser: feed() nimmt beliebig große Stücke an,
+    verarbeitet jeweils alle vollständigen Top-Level-Einträge und behält nur
+    den angefangenen Rest. Der Speicherbedarf hängt damit von der
+    Stückgröße ab, nicht von der Länge des Streams.
     """
-    if not points:
-        return None
-
-    base_name = os.path.basename(video_path)
-    safe_name = os.path.splitext(base_name)[0].replace(" ", "_")
-    temp_json_path = os.path.join(tmp_dir, f"KVR_GOPRO_RAW_{safe_name}.json")
 
-    try:
-        with open(temp_json_path, "w", encoding="utf-8") as f:
-            # Konvertiere Zeitstempel in ISO (serialisierbar)
-            json.dump([
-                {"lat": lat, "lon": lon, "ele": alt, "time": timestamp.isoformat()}
-                for (lat, lon, alt, timestamp) in points
-            ], f)
-        print(f"[DEBUG] Saved raw GPS to {temp_json_path} ({len(points)} pts)")
-        return temp_json_path
-    except Exception as e:
-        print(f"[ERROR] Could not save temp JSON: {e}")
-        return None
-
-def load_temp_points(temp_json_path):
+    # Größere Einträge gelten als kaputt (sonst würde endlos gepuffert)
+    MAX_ENTRY_SIZE = 64 * 1024 * 1024
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._blocks = []
+        self._current_time = None
+        self._fix = -1
+        self._dop = np.nan
+        self.gpsu_times = []
+        self.bytes_fed = 0
+
+    def feed(self, chunk):
+        self._buf += chunk
+        self.bytes_fed += len(chunk)
+        buf = self._buf
+        pos = 0
+        end = len(buf)
+        while pos + 8 <= end:
+            key, typ, size, repeat = _KLV_HEADER.unpack_from(buf, pos)
+            length = size * repeat
+            if key != b'DEVC' or typ != 0 or length > self.MAX_ENTRY_SIZE:
+                # Top-Level ist immer ein DEVC-Container => sonst Resync
+                nxt = buf.find(b'DEVC', pos + 1)
+                if nxt < 0:
+                    pos = max(pos, end - 3)
+                    break
+                pos = nxt
+                continue
+            nxt = pos + 8 + ((length + 3) & ~3)
+            if nxt > end:
+                break
+            self._consume(bytes(buf[pos:nxt]))
+            pos = nxt
+        del buf[:pos]
+
+    def _consume(self, data):
+        for key, value in walk_gpmf(data):
+            if key == 'GPSU':
+                self._current_time = value
+                self.gpsu_times.append(value)
+            elif key == 'GPSF':
+                self._fix = value
+            elif key == 'GPSP':
+                self._dop = value
+            elif key == 'GPS5' and self._current_time is not None and len(value):
+                base_ns = int((self._current_time - datetime(1970, 1, 1))
+                              // timedelta(microseconds=1)) * 1000
+                self._blocks.append((value, base_ns, self._fix, self._dop))
+
+    @property
+    def start_time(self):
+        return min(self.gpsu_times) if self.gpsu_times else None
+
+    def close(self):
+        """
+        Beendet den Stream und liefert alle GPS5-Samples spaltenweise:
+        dict mit numpy-Arrays lat, lon, alt, time_ns (Epoch-ns, naive
+        UTC-Zeit), fix, dop.
+        Zeit: GPSU des Blocks + i * 0.2 s (GPS5 kommt mit 5 Hz).
+        Punkte außerhalb gültiger Koordinaten oder ohne GPSU entfallen.
+        """
+        if self._buf:
+            self._consume(bytes(self._buf))
+            self._buf = bytearray()
+        blocks = self._blocks
+        self._blocks = []
+
+        if not blocks:
+            empty = np.zeros(0)
+            return {"lat": empty, "lon": empty, "alt": empty,
+                    "time_ns": np.zeros(0, dtype=np.int64),
+                    "fix": np.zeros(0, dtype=np.int64), "dop": empty}
+
+        vals = np.concatenate([b[0] for b in blocks])
+        counts = np.array([len(b[0]) for b in blocks])
+        block_start = np.repeat(np.cumsum(counts) - counts, counts)
+        sample_idx = np.arange(len(vals)) - block_start
+        time_ns = np.repeat([b[1] for b in blocks], counts) + sample_idx * 200_000_000
+
+        lat = vals[:, 0]
+        lon = vals[:, 1]
+        ok = (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)
+        return {
+            "lat": lat[ok],
+            "lon": lon[ok],
+            "alt": vals[ok, 2],
+            "time_ns": time_ns[ok].astype(np.int64),
+            "fix": np.repeat([b[2] for b in blocks], counts)[ok],
+            "dop": np.repeat([b[3] for b in blocks], counts)[ok],
+        }
+
+
+def parse_gpmf_gps(metadata):
+    """GPS5-Samples eines kompletten Puffers (siehe GPMFStreamParser.close)."""
+    parser = GPMFStreamParser()
+    parser.feed(metadata)
+    return parser.close()
+
+
+def stream_gpmf_gps(video_path, chunk_size=GPMF_CHUNK_SIZE, progress_callback=None):
     """
-    Lädt Punkte aus der Temp-JSON zurück in List[dict] mit datetime-Objekt.
+    Liest den gpmd-Stream direkt aus ffmpeg (stdout) in den Parser.
+    progress_callback(parser) wird nach jedem Stück aufgerufen.
+    Rückgabe: (gps-Spalten wie parse_gpmf_gps, GPSU-Startzeit) oder
+    (None, None), wenn das Video keinen gpmd-Stream hat.
     """
-    try:
-        with open(temp_json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        # Konvertiere ISO-Zeiten zurück
-        for pt in data:
-            pt["time"] = datetime.fromisoformat(pt["time"])
-        print(f"[DEBUG] Loaded {len(data)} points from {temp_json_path}")
-        return data
-    except Exception as e:
-        print(f"[ERROR] Could not load temp JSON: {e}")
-        return []
+    stream_index = find_gpmd_stream_index(video_path)
+    if stream_index is None:
+        return None, None
+    parser = GPMFStreamParser()
+    for chunk in iter_gpmd_chunks(video_path, stream_index, chunk_size):
+        parser.feed(chunk)
+        if progress_callback is not None:
+            progress_callback(parser)
+    gps = parser.close()
+    print(f"[DEBUG] GPMF streamed: {parser.bytes_fed} bytes, {len(gps['lat'])} GPS points")
+    return gps, parser.start_time
+
+
+def gps_to_points(gps):
+    """GPS-Spalten -> list[dict] (lat, lon, ele, time als naive UTC-datetime)."""
+    epoch = datetime(1970, 1, 1)
+    return [
+        {"lat": lat, "lon": lon, "ele": alt, "time": epoch + timedelta(microseconds=t // 1000)}
+        for lat, lon, alt, t in zip(gps["lat"].tolist(), gps["lon"].tolist(),
+                                    gps["alt"].tolist(), gps["time_ns"].tolist())
+    ]
 
 
+def parse_gps5_data(metadata):
+    points = [(pt["lat"], pt["lon"], pt["ele"], pt["time"])
+              for pt in gps_to_points(parse_gpmf_gps(metadata))]
+
+    #points = trim_invalid_gps_points(points)
+    print(f"GPS without trimming: {len(points)}")
+    #print(f"Remaining GPS points after trimming: {len(points)}")
+    return points
+
 
 # -----------------------------
 # Resample GPS to 1s
@@ -453,6 +633,124 @@ def adjust_gpx_to_video_duration(points, video_duration):
     return points
     
 
+# -----------------------------
+# Kapitel-Extraktion (auch im Worker-Prozess nutzbar, ohne Qt)
+# -----------------------------
+def extend_last_point_to_video(points, video_duration):
+    """
+    Stellt sicher, dass die letzte GPX-Zeit dem Video entspricht.
+    Fügt die Differenz in Millisekunden nur dem letzten Punkt hinzu.
+    Keine Interpolation von lat/lon/ele.
+    """
+    if not points or len(points) < 1:
+        return points
+
+    gpx_start = points[0]["time"]
+    gpx_end = points[-1]["time"]
+    gpx_duration = (gpx_end - gpx_start).total_seconds()
+    diff = video_duration - gpx_duration
+
+    if diff <= 0 or diff < 0.001:  # Kleine Differenz ignorieren
+        return points
+
+    points[-1]["time"] += timedelta(seconds=diff)
+    return points
+
+
+def extract_chapter_to_gpx(video_path, temp_path, progress_callback=None):
+    """
+    Extrahiert ein einzelnes Video (Kapitel) in eine temporäre GPX-Datei:
+    Dauer, GPS streamen, an Videolänge anpassen, 1 Hz resamplen, schreiben.
+
+    progress_callback(fraction, message) wird mit 0.0..1.0 aufgerufen
+    (message darf None sein).
+    Rückgabe: (temp_path oder None, Liste von Log-Zeilen)
+    """
+    log = []
+
+    def report(fraction, message=None):
+        if message:
+            log.append(message)
+        if progress_callback is not None:
+            progress_callback(fraction, message)
+
+    try:
+        video_duration = get_video_duration(video_path)
+        if not video_duration:
+            report(1.0, "✗ Could not get video duration")
+            return None, log
+        report(0.05)
+
+        # Fortschritt beim Streamen: von GPSU abgedeckte Zeit / Videolänge
+        def on_chunk(parser):
+            times = parser.gpsu_times
+            if times:
+                covered = (times[-1] - times[0]).total_seconds()
+                report(0.05 + 0.75 * min(1.0, covered / video_duration))
+
+        # gpmd-Stream direkt aus ffmpeg (stdout) in den Parser, ohne Temp-Dateien
+        gps, _ = stream_gpmf_gps(video_path, progress_callback=on_chunk)
+        if gps is None:
+            report(1.0, "✗ No GPS metadata found in video")
+            return None, log
+
+        if not len(gps["lat"]):
+            report(1.0, "✗ No GPS points extracted")
+            return None, log
+
+        points_dict = gps_to_points(gps)
+        del gps
+        report(0.8)
+
+        # Video-Dauer grob anpassen (>0,5s)
+        points_adjusted = adjust_gpx_to_video_duration(points_dict, video_duration)
+
+        # Resample auf 1 Hz
+        try:
+            points_final = resample_to_1s_auto(points_adjusted)
+            report(0.9, f"→ Resampled to {len(points_final)} points (1s grid)")
+        except Exception as e:
+            report(0.9, f"⚠ Resample skipped due to error: {e}")
+            points_final = points_adjusted
+
+        # Letzten Punkt exakt auf Videolänge bringen (ms auffüllen)
+        points_final = extend_last_point_to_video(points_final, video_duration)
+
+        create_gpx_with_time(points_final, temp_path)
+        report(1.0)
+        return temp_path, log
+
+    except Exception as e:
+        import traceback
+        report(1.0, f"✗ Extraction error: {e}")
+        log.append(traceback.format_exc())
+        return None, log
+
+
+# Fortschritts-Queue der Worker-Prozesse (über den Pool-Initializer gesetzt)
+_chapter_progress_queue = None
+
+
+def init_chapter_worker(progress_queue):
+    global _chapter_progress_queue
+    _chapter_progress_queue = progress_queue
+
+
+def extract_chapter_job(index, video_path, temp_path):
+    """
+    Einstiegspunkt für ProcessPoolExecutor. Fortschritt geht als
+    (index, fraction) in die Queue aus init_chapter_worker, die Log-Zeilen
+    kommen gesammelt mit dem Ergebnis zurück.
+    Rückgabe: (index, temp_path oder None, Log-Zeilen)
+    """
+    def progress(fraction, message):
+        if _chapter_progress_queue is not None:
+            _chapter_progress_queue.put((index, fraction))
+
+    temp_path, log = extract_chapter_to_gpx(video_path, temp_path, progress)
+    return index, temp_path, log
+
+
 # -----------------------------
 # Main
 # -----------------------------
@@ -470,13 +768,13 @@ def main():
     if not video_duration:
         return
 
-    metadata = extract_metadata(args.input_file)
-    if not metadata:
+    gps, gpsu_time = stream_gpmf_gps(args.input_file)
+    if gps is None:
         return
 
     #gps_start_time = find_gpsu_time(metadata) or datetime.now()
-    gps_start_time = get_video_start_time(args.input_file, metadata)
-    points = parse_gps5_data(metadata)
+    gps_start_time = get_video_start_time(args.input_file, gpsu_time=gpsu_time)
+    points = gps_to_points(gps)
     
     if not points:
         return
@@ -487,7 +785,7 @@ def main():
     points_with_time = points  # Rohpunkte haben schon die echte Zeit
     #points_resampled = resample_to_1s(points_with_time)
 
-    points_resampled = adjust_gpx_to_video_duration(points_resampled, video_duration)
+    points_resampled = adjust_gpx_to_video_duration(points_with_time, video_duration)
     
     output_path = os.path.join(MY_GLOBAL_TMP_DIR, "KVR_GOPRO_Extract.tmp.gpx")
     
@@ -20,12 +20,17 @@
 
 # core/gpx_parser.py
 
-import math
+import os
 import uuid
+from array import array
+
+import numpy as np
 import xml.etree.ElementTree as ET
-from datetime import datetime
+from datetime import datetime, timezone
 from dateutil.parser import parse as dateutil_parse
 
+from core.track import Track, datetime_to_ns, NAT
+
 
 gpx_video_shift = None #in seconds, can be negative (first gpx are before video) or positive (missing gpx at start)
 def set_gpx_video_shift(t):
@@ -41,103 +46,233 @@ def is_gpx_video_shift_set():
     return gpx_video_shift is not None
 
 
-def parse_gpx(gpx_file_path):
+def _local_name(tag: str) -> str:
+    """'{http://www.topografix.com/GPX/1/1}trkpt' -> 'trkpt' (auch ohne Namespace)."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _decode_time_slow(text: str):
+    """Einzelner Zeitstempel über dateutil (beliebige Formate/Zeitzonen)."""
+    try:
+        return dateutil_parse(text)
+    except (ValueError, OverflowError):
+        return None
+
+
+def decode_gpx_times(time_texts):
+    """
+    Wandelt die gesammelten <time>-Texte in Epoch-ns um.
+
+    Schneller Weg: das übliche feste Format 'YYYY-MM-DDTHH:MM:SS[.fff]Z'
+    wird in einem Rutsch von numpy (datetime64) geparst. Nur was davon
+    abweicht (Offsets wie +02:00, exotische Formate) geht einzeln durch
+    dateutil. Leere Einträge (None) ergeben NAT.
+
+    Rückgabe: (int64-Array, tzinfo des ersten gültigen Zeitstempels)
+    """
+    n = len(time_texts)
+    out = np.full(n, NAT, dtype=np.int64)
+
+    fast_idx = [i for i, t in enumerate(time_texts)
+                if t and len(t) >= 20 and t[-1] == "Z" and t[10] == "T"]
+    if fast_idx:
+        try:
+            out[fast_idx] = np.array([time_texts[i][:-1] for i in fast_idx],
+                                     dtype="datetime64[ns]").astype(np.int64)
+        except ValueError:
+            # Mindestens ein Ausreißer => einzeln versuchen
+            for i in fast_idx:
+                try:
+                    out[i] = np.datetime64(time_texts[i][:-1], "ns").astype(np.int64)
+                except ValueError:
+                    dt = _decode_time_slow(time_texts[i])
+                    out[i] = datetime_to_ns(dt)
+
+    fast_set = set(fast_idx)
+    first_slow_tz = None
+    first_slow_idx = None
+    for i, t in enumerate(time_texts):
+        if not t or i in fast_set:
+            continue
+        dt = _decode_time_slow(t)
+        if dt is None:
+            continue
+        out[i] = datetime_to_ns(dt)
+        if first_slow_idx is None:
+            first_slow_idx = i
+            first_slow_tz = dt.tzinfo if dt.utcoffset() is not None else None
+
+    tzinfo = timezone.utc
+    if first_slow_idx is not None and (not fast_idx or first_slow_idx < fast_idx[0]):
+        tzinfo = first_slow_tz
+    return out, tzinfo
+
+
+def parse_gpx(gpx_file_path, progress_callback=None):
     """
     Liest eine GPX-Datei ein, extrahiert lat, lon, ele (Höhe) und time.
     Zusätzlich berechnet die Funktion distance, speed, gradient etc.
-    Rückgabe: Liste von Dicts mit Feldern: 
-        lat, lon, ele, time, delta_m, speed_kmh, gradient, rel_s
+    Rückgabe: Track (core.track) mit den Spalten
+        lat, lon, ele, time, delta_m, speed_kmh, gradient
+    Jeder Index liefert eine dict-artige Sicht, alter Code funktioniert weiter.
+
+    Die Datei wird per iterparse gestreamt, fertige <trkpt> werden sofort
+    wieder freigegeben (Speicher bleibt auch bei sehr großen Dateien klein).
+    Namespaces werden ignoriert => GPX 1.1, GPX 1.0 und Dateien ohne xmlns.
+    Die Zeitstempel werden erst am Ende gesammelt dekodiert (decode_gpx_times).
+
+    progress_callback(bytes_read, total_bytes) wird gelegentlich aufgerufen.
     """
-    tree = ET.parse(gpx_file_path)
-    root = tree.getroot()
+    lat_col = array("d")
+    lon_col = array("d")
+    ele_col = array("d")
+    time_texts = []
+
+    total_bytes = os.path.getsize(gpx_file_path)
+    next_report = 0
 
-    ns = {"default": "http://www.topografix.com/GPX/1/1"}
-    trkpts = root.findall(".//default:trkpt", ns)
-    if not trkpts:
+    with open(gpx_file_path, "rb") as f:
+        parents = []
+        in_pt = False
+        pt_depth = 0
+        cur_ele = 0.0
+        cur_time = None
+
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            name = _local_name(elem.tag)
+            if event == "start":
+                parents.append(elem)
+                if name == "trkpt" and not in_pt:
+                    in_pt = True
+                    pt_depth = len(parents)
+                    cur_ele = 0.0
+                    cur_time = None
+                continue
+
+            parents.pop()
+            if not in_pt:
+                elem.clear()  # Metadaten, Wegpunkte, ... werden nicht gebraucht
+                continue
+
+            if len(parents) == pt_depth:
+                # direkte Kinder von <trkpt>
+                if name == "ele" and elem.text:
+                    try:
+                        cur_ele = float(elem.text)
+                    except ValueError:
+                        cur_ele = 0.0
+                elif name == "time":
+                    cur_time = elem.text.strip() if elem.text else None
+            elif name == "trkpt" and len(parents) == pt_depth - 1:
+                lat_col.append(float(elem.attrib["lat"]))
+                lon_col.append(float(elem.attrib["lon"]))
+                ele_col.append(cur_ele)
+                time_texts.append(cur_time)
+                in_pt = False
+                # Punkt samt Kindern aus dem (Teil-)Baum entfernen
+                elem.clear()
+                if parents:
+                    parents[-1].clear()
+
+                if progress_callback is not None and len(time_texts) >= next_report:
+                    next_report = len(time_texts) + 5000
+                    progress_callback(f.tell(), total_bytes)
+
+    if not time_texts:
         print("[DEBUG] Keine <trkpt> Elemente gefunden!")
-        return []
-
-    parsed_points = []
-    for pt in trkpts:
-        lat = float(pt.attrib["lat"])
-        lon = float(pt.attrib["lon"])
-        ele_el = pt.find("default:ele", ns)
-        ele = float(ele_el.text) if ele_el is not None else 0.0
-        time_el = pt.find("default:time", ns)
-        if time_el is not None:
-            time_str = time_el.text
-            try:
-                dt = dateutil_parse(time_str)
-            except ValueError:
-                dt = None
-        else:
-            dt = None
-
-        parsed_points.append({
-            "lat": lat,
-            "lon": lon,
-            "ele": ele,
-            "time": dt
-        })
-
-    # Haversine etc.
-    def haversine_m(lat1, lon1, lat2, lon2):
-        R = 6371000
-        d_lat = math.radians(lat2 - lat1)
-        d_lon = math.radians(lon2 - lon1)
-        a = (math.sin(d_lat/2)**2
-             + math.cos(math.radians(lat1))
-             * math.cos(math.radians(lat2))
-             * math.sin(d_lon/2)**2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        return R * c
-
-    results = []
-    total_distance_m = 0.0
-    for i in range(len(parsed_points)):
-        p = parsed_points[i]
-        if i == 0:
-            data = {
-                "lat": p["lat"], 
-                "lon": p["lon"],
-                "ele": p["ele"], 
-                "time": p["time"],
-                "delta_m": 0.0, 
-                "speed_kmh": 0.0, 
-                "gradient": 0.0,
-            }
-        else:
-            p_prev = parsed_points[i-1]
-            dist_2d = haversine_m(p_prev["lat"], p_prev["lon"], p["lat"], p["lon"])
-            elev_diff = p["ele"] - p_prev["ele"]
-            dist_3d = math.sqrt(dist_2d**2 + elev_diff**2)
-            time_diff_s = 0
-            if p["time"] and p_prev["time"]:
-                time_diff_s = (p["time"] - p_prev["time"]).total_seconds()
-            delta_m = dist_3d
-            total_distance_m += delta_m
-            speed_kmh = 0.0
-            if time_diff_s > 0:
-                speed_kmh = (dist_3d / time_diff_s) * 3.6
-            gradient = 0.0
-            if dist_2d > 0:
-                gradient = (elev_diff / dist_2d) * 100
-
-            data = {
-                "lat": p["lat"], 
-                "lon": p["lon"],
-                "ele": p["ele"], 
-                "time": p["time"],
-                "delta_m": delta_m,
-                "speed_kmh": speed_kmh,
-                "gradient": gradient
-            }
-
-        results.append(data)
-    return results
-
-
-def recalc_gpx_data(gpx_data: list[dict]):
+        return Track()
+
+    time_ns, tzinfo = decode_gpx_times(time_texts)
+    if progress_callback is not None:
+        progress_callback(total_bytes, total_bytes)
+
+    track = Track.from_columns(
+        np.frombuffer(lat_col, dtype=np.float64),
+        np.frombuffer(lon_col, dtype=np.float64),
+        np.frombuffer(ele_col, dtype=np.float64),
+        time_ns,
+        tzinfo=tzinfo,
+    )
+    # distance, speed, gradient in einem vektorisierten Durchlauf
+    recalc_range(track, 0, len(track) - 1)
+    return track
+
+
+EARTH_RADIUS_M = 6371000
+
+
+def compute_segment_metrics(lat, lon, ele, time_ns):
+    """
+    Vektorisierter Kern für delta_m, speed_kmh und gradient.
+
+    Erwartet Arrays der Länge m (aufeinanderfolgende Punkte) und liefert
+    drei Arrays der Länge m-1: die Werte für Punkt 1..m-1, jeweils
+    bezogen auf den Vorgänger. Gleiche Formeln wie bisher:
+    Haversine (2D), 3D-Distanz mit Höhendifferenz, Speed aus der Zeitdifferenz
+    (0, falls Zeit fehlt oder <= 0), Gradient = dEle / 2D-Distanz in %.
+    """
+    lat_r = np.radians(lat)
+    d_lat = np.diff(lat_r)
+    d_lon = np.radians(np.diff(lon))
+    a = (np.sin(d_lat / 2) ** 2
+         + np.cos(lat_r[:-1]) * np.cos(lat_r[1:]) * np.sin(d_lon / 2) ** 2)
+    dist_2d = EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    elev_diff = np.diff(ele)
+    dist_3d = np.sqrt(dist_2d * dist_2d + elev_diff * elev_diff)
+
+    time_ns = np.asarray(time_ns, dtype=np.int64)
+    valid_t = (time_ns[1:] != NAT) & (time_ns[:-1] != NAT)
+    time_diff_s = np.where(valid_t, np.diff(time_ns), 0).astype(np.float64) / 1e9
+
+    speed_kmh = np.zeros_like(dist_3d)
+    moving = time_diff_s > 0
+    speed_kmh[moving] = dist_3d[moving] / time_diff_s[moving] * 3.6
+
+    gradient = np.zeros_like(dist_3d)
+    flat = dist_2d > 0
+    gradient[flat] = elev_diff[flat] / dist_2d[flat] * 100
+    return dist_3d, speed_kmh, gradient
+
+
+def recalc_range(track: Track, i0: int, i1: int):
+    """
+    Berechnet delta_m, speed_kmh und gradient nur für die Punkte i0..i1
+    (inklusive) neu. Da jeder Wert nur vom Vorgänger abhängt, genügt nach
+    dem Verschieben von Punkt i ein recalc_range(track, i, i+1).
+    """
+    n = len(track)
+    if n == 0:
+        return
+    i0 = max(0, i0)
+    i1 = min(n - 1, i1)
+    if i1 < i0:
+        return
+
+    delta = track.column("delta_m")
+    speed = track.column("speed_kmh")
+    grad = track.column("gradient")
+    first = i0
+
+    # Punkt 0 hat keinen Vorgänger
+    if i0 == 0:
+        delta[0] = speed[0] = grad[0] = 0.0
+        i0 = 1
+    if i1 >= i0:
+        s = slice(i0 - 1, i1 + 1)
+        d, v, g = compute_segment_metrics(
+            track.column("lat")[s],
+            track.column("lon")[s],
+            np.nan_to_num(track.column("ele")[s], nan=0.0),
+            track.time_ns()[s],
+        )
+        delta[i0:i1 + 1] = d
+        speed[i0:i1 + 1] = v
+        grad[i0:i1 + 1] = g
+    track.touch(first)
+
+
+def recalc_gpx_data(gpx_data):
     
     """
     Aktualisiert delta_m, speed_kmh, gradient und rel_s,
@@ -148,52 +283,27 @@ def recalc_gpx_data(gpx_data: list[dict]):
     if not gpx_data:
         return
 
-    # C) Hilfsfunktion Haversine
-    def haversine_m(lat1, lon1, lat2, lon2):
-        R = 6371000
-        d_lat = math.radians(lat2 - lat1)
-        d_lon = math.radians(lon2 - lon1)
-        a = (math.sin(d_lat/2)**2
-             + math.cos(math.radians(lat1))
-             * math.cos(math.radians(lat2))
-             * math.sin(d_lon/2)**2)
-        c = 2*math.atan2(math.sqrt(a), math.sqrt(1-a))
-        return R*c
-
-    # D) Alle Punkte durchgehen
-    for i, pt in enumerate(gpx_data):
-        if i == 0:
-            pt["delta_m"]   = 0.0
-            pt["speed_kmh"] = 0.0
-            pt["gradient"]  = 0.0
-        else:
-            prev = gpx_data[i-1]
-            lat1, lon1 = prev["lat"], prev["lon"]
-            lat2, lon2 = pt["lat"],   pt["lon"]
-
-            dist_2d = haversine_m(lat1, lon1, lat2, lon2)
-            elev_diff = pt["ele"] - prev["ele"]
-            dist_3d = math.sqrt(dist_2d*dist_2d + elev_diff*elev_diff)
-
-            pt["delta_m"] = dist_3d
-
-            time_diff_s = 0.0
-            if pt["time"] and prev["time"]:
-                time_diff_s = (pt["time"] - prev["time"]).total_seconds()
-
-            if time_diff_s > 0:
-                pt["speed_kmh"] = (dist_3d / time_diff_s)*3.6
-            else:
-                pt["speed_kmh"] = 0.0
-
-            if dist_2d > 0:
-                pt["gradient"] = (elev_diff/dist_2d)*100
-            else:
-                pt["gradient"] = 0.0
+    if isinstance(gpx_data, Track):
+        recalc_range(gpx_data, 0, len(gpx_data) - 1)
+        return
+
+    # Alte list[dict]-Daten: Spalten einsammeln, Kern rechnen, zurückschreiben
+    d, v, g = compute_segment_metrics(
+        np.array([pt["lat"] for pt in gpx_data], dtype=np.float64),
+        np.array([pt["lon"] for pt in gpx_data], dtype=np.float64),
+        np.array([pt["ele"] for pt in gpx_data], dtype=np.float64),
+        np.array([datetime_to_ns(pt["time"]) for pt in gpx_data], dtype=np.int64),
+    )
+    first = gpx_data[0]
+    first["delta_m"] = first["speed_kmh"] = first["gradient"] = 0.0
+    for pt, d_i, v_i, g_i in zip(gpx_data[1:], d.tolist(), v.tolist(), g.tolist()):
+        pt["delta_m"] = d_i
+        pt["speed_kmh"] = v_i
+        pt["gradient"] = g_i
 
     # Keine Rückgabe, weil gpx_data in-place aktualisiert wird
     
-def ensure_gpx_stable_ids(gpx_data: list[dict]):
+def ensure_gpx_stable_ids(gpx_data):
     """
     Weist jedem GPX-Punkt ein 'stable_id' zu, falls nicht vorhanden.
     Bleibt unverändert, selbst wenn Index / Reihenfolge sich ändert.
@@ -20,6 +20,7 @@
 
 
 # core/hardware_detect.py
+import os
 import subprocess
 
 _cached_encoders = None  # Global Cache
@@ -69,3 +70,31 @@ def detect_available_hw_encoders(ffmpeg_path="ffmpeg"):
     print("[DEBUG] => GPU encoders found:", encoders_found)
     _cached_encoders = encoders_found
     return _cached_encoders
+
+
+# Wie viele Encoder-Sessions parallel laufen dürfen.
+# NVENC: Consumer-Karten sind treiberseitig auf wenige gleichzeitige Sessions
+# begrenzt (je nach Treiber 3..8) => konservativ 3.
+# AMF/QSV: mehr Sessions bringen auf einer GPU kaum etwas.
+_HW_SESSION_LIMITS = {
+    "nvidia": 3,
+    "amd": 2,
+    "intel": 2,
+}
+
+def max_parallel_encodes(hw_encode=None):
+    """
+    Obergrenze für gleichzeitig laufende ffmpeg-Encodes.
+    CPU (hw_encode None/"none"/"CPU"): x264/x265 nutzen selbst schon mehrere
+    Threads => ca. ein Encode pro 4 Kerne, mindestens 1.
+    GPU: Session-Limit des Herstellers (siehe _HW_SESSION_LIMITS).
+    """
+    cores = os.cpu_count() or 1
+    if not hw_encode or hw_encode.lower() in ("none", "cpu"):
+        return max(1, cores // 4)
+    vendor = hw_encode.lower().split("_", 1)[0]
+    return max(1, min(_HW_SESSION_LIMITS.get(vendor, 1), cores))
+
+def max_parallel_copies():
+    """Obergrenze für gleichzeitige Stream-Copy-Schnitte (I/O-lastig)."""
+    return max(2, min(8, os.cpu_count() or 1))
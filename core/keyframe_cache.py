@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/keyframe_cache.py
+#
+# Dauerhafter Keyframe-Index: pro Videodatei (file_fingerprint) eine .npy
+# mit den Keyframe-Zeiten in Sekunden, relativ zum Videoanfang.
+# Liegt in KEYFRAME_CACHE_DIR und wird beim Start nicht gelöscht.
+
+import os
+import csv
+
+import numpy as np
+
+from config import KEYFRAME_CACHE_DIR
+from core.fingerprint import file_fingerprint
+
+
+# Ältere Einträge (nach letzter Nutzung) werden darüber hinaus entfernt
+MAX_CACHE_ENTRIES = 2000
+
+
+def _cache_path(fingerprint: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{fingerprint}.npy")
+
+
+def load_cached_keyframes(video_path: str, cache_dir: str = KEYFRAME_CACHE_DIR):
+    """
+    Keyframe-Zeiten (list[float], sortiert, lokal zum Video) aus dem Cache
+    oder None, falls die Datei noch nicht indiziert wurde.
+    """
+    try:
+        path = _cache_path(file_fingerprint(video_path), cache_dir)
+        if not os.path.isfile(path):
+            return None
+        times = np.load(path)
+        os.utime(path)  # für das Aufräumen: zuletzt benutzt
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Keyframe-Cache nicht lesbar für {video_path}: {e}")
+        return None
+    print(f"[DEBUG] Keyframe-Cache Treffer: {os.path.basename(video_path)} => {len(times)} Keyframes")
+    return times.tolist()
+
+
+def store_keyframes(video_path: str, times, cache_dir: str = KEYFRAME_CACHE_DIR):
+    """Speichert die Keyframe-Zeiten (lokal zum Video) im Cache."""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = _cache_path(file_fingerprint(video_path), cache_dir)
+        arr = np.sort(np.asarray(times, dtype=np.float64))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp_path, path)
+        print(f"[DEBUG] Keyframe-Cache gespeichert: {os.path.basename(video_path)} => {len(arr)} Keyframes")
+    except OSError as e:
+        print(f"[WARN] Konnte Keyframe-Cache nicht schreiben: {e}")
+        return
+    _prune(cache_dir)
+
+
+def _prune(cache_dir: str):
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.name.endswith(".npy")]
+    except OSError:
+        return
+    if len(entries) <= MAX_CACHE_ENTRIES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for e in entries[:len(entries) - MAX_CACHE_ENTRIES]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
+
+
+def read_ffprobe_keyframe_csv(csv_file: str) -> list:
+    """
+    Liest die ffprobe-CSV des Indexing-Dialogs (key_frame,pts_time,pict_type,
+    ohne Header) und liefert die Keyframe-Zeiten in Sekunden.
+    """
+    times = []
+    with open(csv_file, "r", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            try:
+                times.append(float(row[1]))
+            except (IndexError, ValueError):
+                continue
+    return times
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/keyframe_index.py
+#
+# Sortierter Keyframe-Index mit O(log n)-Abfragen (bisect) für
+# Encoder-Planung und Keyframe-Stepping.
+
+from bisect import bisect_left, bisect_right
+
+
+class KeyframeIndex:
+    """
+    Unveränderliche, sortierte Liste von Keyframe-Zeiten (Sekunden).
+    Verhält sich beim Lesen wie eine Liste (len, Index, Iteration).
+    """
+
+    __slots__ = ("_times",)
+
+    def __init__(self, times=()):
+        self._times = sorted(float(t) for t in times)
+
+    def __len__(self):
+        return len(self._times)
+
+    def __bool__(self):
+        return bool(self._times)
+
+    def __iter__(self):
+        return iter(self._times)
+
+    def __getitem__(self, idx):
+        return self._times[idx]
+
+    def __repr__(self):
+        return f"KeyframeIndex({len(self._times)} keyframes)"
+
+    # -----------------------------------------------------------------
+    # Abfragen
+    # -----------------------------------------------------------------
+    def floor(self, t, default=None):
+        """Größter Keyframe <= t (sonst default)."""
+        i = bisect_right(self._times, t)
+        return self._times[i - 1] if i else default
+
+    def ceil(self, t, default=None):
+        """Kleinster Keyframe >= t (sonst default)."""
+        i = bisect_left(self._times, t)
+        return self._times[i] if i < len(self._times) else default
+
+    def index_after(self, t):
+        """Index des ersten Keyframes > t oder None."""
+        i = bisect_right(self._times, t)
+        return i if i < len(self._times) else None
+
+    def index_before(self, t):
+        """Index des letzten Keyframes < t oder None."""
+        i = bisect_left(self._times, t)
+        return i - 1 if i else None
+
+    def nth_after(self, t, n=1):
+        """
+        n-ter Keyframe nach t (n=1 => nächster). Über das Ende hinaus wird
+        auf den letzten begrenzt. Rückgabe: (index, zeit) oder None.
+        """
+        idx = self.index_after(t)
+        if idx is None:
+            return None
+        idx = min(idx + max(1, n) - 1, len(self._times) - 1)
+        return idx, self._times[idx]
+
+    def nth_before(self, t, n=1):
+        """n-ter Keyframe vor t, am Anfang begrenzt. (index, zeit) oder None."""
+        idx = self.index_before(t)
+        if idx is None:
+            return None
+        idx = max(idx - (max(1, n) - 1), 0)
+        return idx, self._times[idx]
+
+
+def keyframe_index(kf_list) -> KeyframeIndex:
+    """
+    Liefert einen KeyframeIndex für kf_list. Ist kf_list schon ein Index,
+    kommt er direkt zurück, sonst wird einer gebaut (O(n log n)).
+    Wer oft abfragt, baut den Index einmal dort, wo die Liste entsteht,
+    und reicht ihn weiter.
+    """
+    if isinstance(kf_list, KeyframeIndex):
+        return kf_list
+    return KeyframeIndex(kf_list or ())
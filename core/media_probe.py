@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/media_probe.py
+#
+# Zentrale ffprobe-Abfrage für Videodateien.
+#
+# Pro Datei genau ein ffprobe-Aufruf (-show_format -show_streams), daraus
+# werden Dauer, erster Videostream, gpmd-Stream und creation_time gelesen.
+# Das Ergebnis wird pro (Pfad, file_fingerprint) gemerkt: wer dieselbe Datei später
+# noch einmal fragt (Timeline, Export, GoPro-Import), startet kein ffprobe.
+# probe_many() fragt eine ganze Playlist parallel ab, bereits bekannte
+# Dateien kosten dabei nur den (ebenfalls gemerkten) Fingerprint.
+
+import os
+import json
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from core.fingerprint import file_fingerprint
+
+
+# So viele Ergebnisse werden gemerkt (Temp-Dateien beim Export kommen dazu)
+MAX_MEMO_ENTRIES = 1024
+
+# ffprobe wartet fast nur auf die Platte => etwas mehr als CPU-Kerne ist ok
+MAX_PROBE_WORKERS = 8
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _parse_rate(rate):
+    """'30000/1001' -> 29.97, unbekannt -> 0.0"""
+    num, _, den = (rate or "0/1").partition("/")
+    try:
+        num = float(num)
+        den = float(den or 1)
+    except ValueError:
+        return 0.0
+    return num / den if den else 0.0
+
+
+def _parse_duration(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None  # fehlt oder "N/A"
+
+
+def _build_info(path, data):
+    fmt = data.get("format") or {}
+    streams = data.get("streams") or []
+
+    video = None
+    gpmd_index = None
+    for st in streams:
+        if video is None and st.get("codec_type") == "video":
+            video = {
+                "index":    st.get("index"),
+                "codec":    st.get("codec_name"),
+                "width":    int(st.get("width", 0) or 0),
+                "height":   int(st.get("height", 0) or 0),
+                "pix_fmt":  st.get("pix_fmt"),
+                "profile":  st.get("profile"),
+                "level":    st.get("level"),
+                "rate":     st.get("r_frame_rate"),
+                "fps":      _parse_rate(st.get("r_frame_rate")),
+            }
+        if gpmd_index is None and st.get("codec_tag_string") == "gpmd":
+            gpmd_index = st.get("index")
+
+    duration = _parse_duration(fmt.get("duration"))
+    if duration is None:
+        # manche Container haben keine Format-Dauer => längster Stream
+        stream_durs = [_parse_duration(st.get("duration")) for st in streams]
+        stream_durs = [d for d in stream_durs if d is not None]
+        duration = max(stream_durs) if stream_durs else 0.0
+
+    return {
+        "path":          path,
+        "duration":      duration,
+        "format_name":   fmt.get("format_name"),
+        "creation_time": (fmt.get("tags") or {}).get("creation_time"),
+        "video":         video,
+        "gpmd_index":    gpmd_index,
+        "streams":       streams,
+    }
+
+
+def _run_ffprobe(path):
+    cmd = ["ffprobe", "-v", "error", "-show_format", "-show_streams",
+           "-of", "json", path]
+    rr = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(rr.stdout or "{}")
+
+
+def probe_media(path: str) -> dict:
+    """
+    Metadaten einer Mediendatei (siehe _build_info), gemerkt pro Pfad und
+    Fingerprint (eine Kopie derselben Datei bekommt ihren eigenen Eintrag,
+    "path" im Ergebnis stimmt also immer).
+    Fehler (Datei fehlt, ffprobe scheitert) werden als OSError,
+    CalledProcessError bzw. ValueError weitergereicht und nicht gemerkt.
+    Das Ergebnis bitte nicht verändern, es wird geteilt.
+    """
+    key = (os.path.normcase(os.path.abspath(path)), file_fingerprint(path))
+    with _memo_lock:
+        info = _memo.get(key)
+        if info is not None:
+            _memo.move_to_end(key)
+            return info
+
+    info = _build_info(path, _run_ffprobe(path))
+    with _memo_lock:
+        _memo[key] = info
+        while len(_memo) > MAX_MEMO_ENTRIES:
+            _memo.popitem(last=False)
+    return info
+
+
+def probe_many(paths, max_workers=MAX_PROBE_WORKERS) -> list:
+    """
+    probe_media() für mehrere Dateien, parallel. Rückgabe in derselben
+    Reihenfolge wie paths; für nicht lesbare Dateien steht dort None.
+    """
+    paths = list(paths)
+
+    def _probe(path):
+        try:
+            return probe_media(path)
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            print(f"[WARN] ffprobe fehlgeschlagen für {path}: {e}")
+            return None
+
+    if len(paths) <= 1:
+        return [_probe(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paths)))) as pool:
+        return list(pool.map(_probe, paths))
+
+
+def media_duration(path: str) -> float:
+    """Dauer in Sekunden (Fehler wie bei probe_media)."""
+    return probe_media(path)["duration"]
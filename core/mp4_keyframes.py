@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/mp4_keyframes.py
+#
+# Keyframe-Zeiten direkt aus den MP4/MOV-Sample-Tabellen der ersten
+# Videospur (stss = Sync-Samples, stts = Dauer, ctts = Composition-Offset,
+# mdhd = Timescale, elst = Edit-Liste). Es wird nur die moov-Box gelesen,
+# kein einziges Video-Paket. Für fragmentierte oder ungewöhnliche Dateien
+# liefert read_mp4_keyframes() None => Aufrufer nimmt ffprobe.
+
+import os
+import struct
+
+import numpy as np
+
+
+# Container-Boxen, in die wir absteigen
+_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts"}
+
+# moov größer als das gilt als ungewöhnlich (normal: wenige MB)
+MAX_MOOV_SIZE = 256 * 1024 * 1024
+
+
+class _Unsupported(Exception):
+    """Datei kann nicht über die Sample-Tabellen gelesen werden."""
+
+
+def _iter_boxes(buf, pos, end):
+    """(typ, nutzdaten_start, box_ende) für eine Ebene in buf[pos:end]."""
+    while pos + 8 <= end:
+        size, typ = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                raise _Unsupported("kaputter Box-Header")
+            size = struct.unpack_from(">Q", buf, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise _Unsupported(f"Box {typ!r} mit ungültiger Größe")
+        yield typ, pos + header, pos + size
+        pos += size
+
+
+def _read_moov(f, file_size):
+    """Sucht die Top-Level-Boxen ab und liest nur moov ein."""
+    pos = 0
+    moov = None
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        head = f.read(16)
+        if len(head) < 8:
+            break
+        size, typ = struct.unpack_from(">I4s", head, 0)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", head, 8)[0]
+            header = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header:
+            raise _Unsupported("kaputter Top-Level-Header")
+        if typ == b"moof":
+            raise _Unsupported("fragmentiertes MP4")
+        if typ == b"moov":
+            if size > MAX_MOOV_SIZE:
+                raise _Unsupported("moov zu groß")
+            f.seek(pos + header)
+            moov = f.read(size - header)
+        pos += size
+    if moov is None:
+        raise _Unsupported("keine moov-Box")
+    return moov
+
+
+def _full_box(buf, start):
+    """(version, flags, nutzdaten_start) einer FullBox."""
+    vf = struct.unpack_from(">I", buf, start)[0]
+    return vf >> 24, vf & 0xFFFFFF, start + 4
+
+
+def _table(buf, start, end, fields):
+    """
+    Liest eine Tabelle '[entry_count][entries...]' einer FullBox als
+    numpy-Array (n, fields) big endian uint32.
+    """
+    _, _, p = _full_box(buf, start)
+    count = struct.unpack_from(">I", buf, p)[0]
+    p += 4
+    if p + count * 4 * fields > end:
+        raise _Unsupported("Tabelle abgeschnitten")
+    return np.frombuffer(buf, dtype=">u4", count=count * fields, offset=p).reshape(count, fields)
+
+
+def _parse_trak(buf, start, end):
+    """Sammelt die für uns interessanten Boxen einer Spur."""
+    found = {}
+
+    def walk(s, e):
+        for typ, ps, pe in _iter_boxes(buf, s, e):
+            if typ in _CONTAINERS:
+                walk(ps, pe)
+            elif typ in (b"hdlr", b"mdhd", b"stss", b"stts", b"ctts", b"elst", b"stsz"):
+                found[typ] = (ps, pe)
+    walk(start, end)
+    return found
+
+
+def _track_keyframes(buf, boxes, movie_timescale):
+    ps, _ = boxes[b"mdhd"]
+    version, _, p = _full_box(buf, ps)
+    if version == 1:
+        timescale = struct.unpack_from(">I", buf, p + 16)[0]
+    else:
+        timescale = struct.unpack_from(">I", buf, p + 8)[0]
+    if not timescale:
+        raise _Unsupported("timescale 0")
+
+    stts = _table(buf, *boxes[b"stts"], 2).astype(np.int64)
+    deltas = np.repeat(stts[:, 1], stts[:, 0])
+    n = len(deltas)
+    if n == 0:
+        raise _Unsupported("keine Samples")
+    dts = np.concatenate(([0], np.cumsum(deltas)[:-1]))
+
+    pts = dts
+    if b"ctts" in boxes:
+        ctts = _table(buf, *boxes[b"ctts"], 2)
+        counts = ctts[:, 0].astype(np.int64)
+        # Version 1 erlaubt negative Offsets, Version 0 praktisch nie > 2^31
+        offsets = ctts[:, 1].astype(np.uint32).view(np.int32).astype(np.int64)
+        comp = np.repeat(offsets, counts)
+        if len(comp) != n:
+            raise _Unsupported("ctts passt nicht zu stts")
+        pts = dts + comp
+
+    # Edit-Liste: leere Edits = Startverzögerung, erster echter Edit = media_time
+    shift = 0
+    if b"elst" in boxes:
+        ps, pe = boxes[b"elst"]
+        version, _, p = _full_box(buf, ps)
+        count = struct.unpack_from(">I", buf, p)[0]
+        p += 4
+        entry_fmt = ">Qq" if version == 1 else ">Ii"
+        entry_size = 20 if version == 1 else 12
+        real_edits = 0
+        for i in range(count):
+            seg_duration, media_time = struct.unpack_from(entry_fmt, buf, p + i * entry_size)
+            if media_time == -1:
+                if real_edits == 0 and movie_timescale:
+                    shift += seg_duration * timescale // movie_timescale
+            else:
+                real_edits += 1
+                if real_edits == 1:
+                    shift -= media_time
+        if real_edits > 1:
+            raise _Unsupported("mehrere Edits")
+    pts = pts + shift
+
+    if b"stss" in boxes:
+        sync = _table(buf, *boxes[b"stss"], 1)[:, 0].astype(np.int64) - 1
+        sync = sync[(sync >= 0) & (sync < n)]
+        key_pts = pts[sync]
+    else:
+        # Ohne stss ist jedes Sample ein Sync-Sample (z. B. Intra-Codecs)
+        key_pts = pts
+
+    return np.sort(key_pts.astype(np.float64) / timescale)
+
+
+def read_mp4_keyframes(video_path):
+    """
+    Keyframe-Zeiten (list[float], Sekunden, sortiert) der ersten Videospur
+    aus den MP4-Tabellen, oder None, wenn das nicht geht (kein MP4/MOV,
+    fragmentiert, mehrere Edits, ...). Dann bitte ffprobe benutzen.
+    """
+    try:
+        file_size = os.path.getsize(video_path)
+        with open(video_path, "rb") as f:
+            moov = _read_moov(f, file_size)
+
+        movie_timescale = 0
+        for typ, ps, pe in _iter_boxes(moov, 0, len(moov)):
+            if typ == b"mvex":
+                raise _Unsupported("fragmentiertes MP4 (mvex)")
+            if typ == b"mvhd":
+                version, _, p = _full_box(moov, ps)
+                movie_timescale = struct.unpack_from(">I", moov, p + (16 if version == 1 else 8))[0]
+
+        for typ, ps, pe in _iter_boxes(moov, 0, len(moov)):
+            if typ != b"trak":
+                continue
+            boxes = _parse_trak(moov, ps, pe)
+            if b"hdlr" not in boxes:
+                continue
+            # hdlr: version/flags (4), pre_defined (4), handler_type (4)
+            handler = moov[boxes[b"hdlr"][0] + 8:boxes[b"hdlr"][0] + 12]
+            if handler != b"vide":
+                continue
+            if b"mdhd" not in boxes or b"stts" not in boxes:
+                raise _Unsupported("Videospur ohne mdhd/stts")
+            times = _track_keyframes(moov, boxes, movie_timescale)
+            print(f"[DEBUG] MP4-Keyframes aus stss/stts: {os.path.basename(video_path)} => {len(times)}")
+            return times.tolist()
+        raise _Unsupported("keine Videospur")
+
+    except (_Unsupported, OSError, struct.error, ValueError) as e:
+        print(f"[DEBUG] MP4-Keyframe-Index nicht möglich ({e}) => ffprobe")
+        return None
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/project_file.py
+#
+# Lesen/Schreiben von .KVRouiteproj-Dateien.
+#
+# Binärformat (Version 1):
+#   8 Byte   MAGIC
+#   uint32   Formatversion (little endian)
+#   uint32   Länge des JSON-Headers in Bytes
+#   ...      JSON-Header (UTF-8, mit Leerzeichen auf ALIGN aufgefüllt)
+#   ...      Spalten-Blöcke, jeweils auf ALIGN ausgerichtet
+#
+# Der Header enthält alle kleinen Projektdaten (Playlist, Cuts, Overlays, ...)
+# und unter "columns" pro Spalte eine npy-artige Beschreibung
+# {"descr": "<f8", "shape": [n], "offset": ...}. Beim Öffnen werden die
+# Spalten per np.memmap (copy-on-write) eingeblendet statt eingelesen.
+#
+# Alte Projektdateien (reines JSON) werden weiterhin gelesen.
+
+import os
+import json
+import struct
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from core.track import Track, FLOAT_FIELDS
+
+
+MAGIC = b"KVRPROJ\x00"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+_PREFIX = struct.Struct("<8sII")
+
+# Spalten der GPX-Daten im Binärformat
+_TRACK_COLUMNS = [(name, "<f8") for name in FLOAT_FIELDS] + [("time", "<i8")]
+
+
+def is_binary_project(filename: str) -> bool:
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _padding(pos: int) -> int:
+    return (-pos) % ALIGN
+
+
+def _tz_to_header(track: Track):
+    """tzinfo als Offset in Sekunden (None => naive Zeitstempel)."""
+    tz = track.tzinfo
+    if tz is None:
+        return None
+    offset = tz.utcoffset(datetime.now())
+    return 0 if offset is None else int(offset.total_seconds())
+
+
+def _tz_from_header(offset_s):
+    if offset_s is None:
+        return None
+    if offset_s == 0:
+        return timezone.utc
+    return timezone(timedelta(seconds=offset_s))
+
+
+def save_project_file(filename: str, project_data: dict):
+    """
+    Schreibt project_data im Binärformat.
+    project_data["gpx_data"] darf ein Track oder eine list[dict] sein,
+    project_data["global_keyframes"] eine Liste von Sekunden.
+
+    Geschrieben wird in eine Temp-Datei, die erst am Ende die alte Datei
+    ersetzt. Gemappte Spalten des Tracks werden vorher in den Speicher geholt
+    (unter Windows wäre die alte Datei sonst gesperrt).
+    """
+    project = dict(project_data)
+    gpx = project.pop("gpx_data", None)
+    track = gpx if isinstance(gpx, Track) else Track.from_points(gpx or [])
+    track.release_mapping()
+    keyframes = np.asarray(project.pop("global_keyframes", None) or [], dtype="<f8")
+
+    blobs = []
+    n = len(track)
+    for name, descr in _TRACK_COLUMNS:
+        arr = track.time_ns() if name == "time" else track.column(name)
+        blobs.append(("gpx/" + name, np.ascontiguousarray(arr, dtype=descr)))
+    blobs.append(("global_keyframes", np.ascontiguousarray(keyframes)))
+
+    header = {
+        "format": "KVRouiteproj",
+        "version": FORMAT_VERSION,
+        "project": project,
+        "gpx": {
+            "length": n,
+            "tz_offset_s": _tz_to_header(track),
+            "extra": track.extra_columns(),
+        },
+        "columns": {},
+    }
+
+    # Offsets hängen von der Header-Länge ab und umgekehrt => so lange
+    # wiederholen, bis sich die Länge nicht mehr ändert (meist 2 Durchläufe).
+    header_len = 0
+    while True:
+        pos = _PREFIX.size + header_len
+        pos += _padding(pos)
+        for key, arr in blobs:
+            header["columns"][key] = {
+                "descr": arr.dtype.str,
+                "shape": list(arr.shape),
+                "offset": pos,
+            }
+            pos += arr.nbytes + _padding(arr.nbytes)
+        header_bytes = json.dumps(header, default=str).encode("utf-8")
+        if len(header_bytes) == header_len:
+            break
+        header_len = len(header_bytes)
+
+    tmp_name = filename + ".tmp"
+    with open(tmp_name, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b" " * _padding(f.tell()))
+        for key, arr in blobs:
+            assert f.tell() == header["columns"][key]["offset"]
+            arr.tofile(f)
+            f.write(b"\0" * _padding(arr.nbytes))
+    os.replace(tmp_name, filename)
+    print(f"[DEBUG] Projekt (binär v{FORMAT_VERSION}) gespeichert: {filename}, {n} GPX-Punkte")
+
+
+def _map_column(filename: str, info: dict):
+    shape = tuple(info["shape"])
+    dtype = np.dtype(info["descr"])
+    if not shape or shape[0] == 0:
+        return np.zeros(shape or (0,), dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode="c",
+                     offset=info["offset"], shape=shape)
+
+
+def _load_binary(filename: str) -> dict:
+    with open(filename, "rb") as f:
+        magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError("Keine KVRouite-Projektdatei (binär).")
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"Projektdatei-Version {version} wird nicht unterstützt "
+                f"(maximal {FORMAT_VERSION}). Bitte KVRouite aktualisieren."
+            )
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    columns = header["columns"]
+    gpx_info = header.get("gpx", {})
+    col = {name: _map_column(filename, columns["gpx/" + name])
+           for name, _ in _TRACK_COLUMNS}
+
+    track = Track.from_columns(
+        col["lat"], col["lon"], col["ele"],
+        time_ns=col["time"],
+        tzinfo=_tz_from_header(gpx_info.get("tz_offset_s")),
+        extra=gpx_info.get("extra"),
+        copy=False,
+        delta_m=col["delta_m"],
+        speed_kmh=col["speed_kmh"],
+        gradient=col["gradient"],
+    )
+
+    project_data = dict(header.get("project", {}))
+    project_data["gpx_data"] = track
+    # Keyframes sind klein und werden als Liste erweitert/sortiert
+    project_data["global_keyframes"] = (
+        _map_column(filename, columns["global_keyframes"]).tolist()
+        if "global_keyframes" in columns else []
+    )
+    return project_data
+
+
+def _load_json(filename: str) -> dict:
+    with open(filename, "r", encoding="utf-8") as f:
+        project_data = json.load(f)
+
+    # GPX-Daten reparieren (datetime aus String machen)
+    gpx_data = project_data.get("gpx_data", [])
+    for pt in gpx_data:
+        if "time" in pt and isinstance(pt["time"], str):
+            try:
+                pt["time"] = datetime.fromisoformat(pt["time"])
+            except Exception:
+                pt["time"] = None  # Zeit kaputt => ohne Zeit übernehmen
+    project_data["gpx_data"] = Track.from_points(gpx_data)
+    return project_data
+
+
+def load_project_file(filename: str) -> dict:
+    """
+    Liest eine Projektdatei (binär oder altes JSON-Format).
+    Rückgabe: project_data-Dict, "gpx_data" ist immer ein Track.
+    """
+    if is_binary_project(filename):
+        return _load_binary(filename)
+    return _load_json(filename)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/render_cache.py
+#
+# Dauerhafter Cache für gerenderte Export-Segmente.
+# Jedes geplante Segment bekommt einen Schlüssel aus allen Eingaben
+# (Quell-Fingerprint, Zeitbereich, Encoder-Einstellungen, Overlay-Parameter).
+# Beim erneuten Rendern werden nur Segmente mit geändertem Schlüssel neu
+# erzeugt, der Rest kommt direkt aus RENDER_CACHE_DIR.
+#
+# Dateien werden erst unter "<key>.part<ext>" geschrieben und nach
+# erfolgreichem ffmpeg-Lauf umbenannt => abgebrochene Renders landen nie
+# als Treffer im Cache.
+#
+# "Zuletzt benutzt" steht in ACCESS_INDEX statt in der mtime der Dateien:
+# die mtime geht in file_fingerprint() ein und darf sich bei einem Treffer
+# nicht ändern.
+
+import os
+import json
+import time
+import hashlib
+
+from config import RENDER_CACHE_DIR
+
+
+# Bei Änderungen an der Render-Logik hochzählen => alte Einträge ungültig
+RENDER_CACHE_VERSION = 1
+
+# Darüber hinaus werden die am längsten nicht benutzten Segmente gelöscht
+# (einstellbar im Encoder-Setup, QSettings "encoder/render_cache_gb")
+DEFAULT_CACHE_GB = 5
+MAX_CACHE_BYTES = DEFAULT_CACHE_GB * 1024 ** 3
+
+# Dateiname -> Zeitpunkt der letzten Benutzung (liegt im Cache-Ordner)
+ACCESS_INDEX = "access.json"
+
+
+def render_key(*parts) -> str:
+    """Hash über beliebige JSON-fähige Eingaben (Floats auf µs gerundet)."""
+    def _norm(v):
+        if isinstance(v, float):
+            return round(v, 6)
+        if isinstance(v, (list, tuple)):
+            return [_norm(x) for x in v]
+        if isinstance(v, dict):
+            return {str(k): _norm(x) for k, x in v.items()}
+        return v
+
+    payload = json.dumps([RENDER_CACHE_VERSION, _norm(list(parts))],
+                         sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, cache_dir: str = RENDER_CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._access = self._load_access()
+
+    def _access_path(self) -> str:
+        return os.path.join(self.cache_dir, ACCESS_INDEX)
+
+    def _load_access(self) -> dict:
+        try:
+            with open(self._access_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_access(self):
+        tmp_path = self._access_path() + ".part"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._access, f)
+            os.replace(tmp_path, self._access_path())
+        except OSError as e:
+            print(f"[WARN] Render-Cache-Index nicht gespeichert: {e}")
+
+    def path(self, key: str, ext: str = ".mp4") -> str:
+        return os.path.join(self.cache_dir, key + ext)
+
+    def lookup(self, key: str, ext: str = ".mp4"):
+        """Pfad der fertigen Datei oder None."""
+        path = self.path(key, ext)
+        if not os.path.isfile(path):
+            self.misses += 1
+            return None
+        # für das Aufräumen: zuletzt benutzt (mtime bleibt unverändert)
+        self._access[os.path.basename(path)] = time.time()
+        self.hits += 1
+        return path
+
+    def reserve(self, key: str, ext: str = ".mp4"):
+        """
+        Für ein neu zu renderndes Segment: (temp_pfad, end_pfad, commit).
+        Der Job schreibt nach temp_pfad, commit() verschiebt nach end_pfad.
+        """
+        final_path = self.path(key, ext)
+        tmp_path = os.path.join(self.cache_dir, key + ".part" + ext)
+
+        def commit():
+            os.replace(tmp_path, final_path)
+
+        return tmp_path, final_path, commit
+
+    def total_bytes(self) -> int:
+        """Belegter Platz aller Cache-Dateien (inkl. abgebrochener .part)."""
+        total = 0
+        try:
+            for e in os.scandir(self.cache_dir):
+                if e.is_file():
+                    total += e.stat().st_size
+        except OSError:
+            pass
+        return total
+
+    def clear(self) -> int:
+        """Löscht alle Einträge. Rückgabe: freigegebene Bytes."""
+        freed = 0
+        try:
+            for e in os.scandir(self.cache_dir):
+                if not e.is_file():
+                    continue
+                size = e.stat().st_size
+                try:
+                    os.remove(e.path)
+                    freed += size
+                except OSError as err:
+                    print(f"[WARN] Render-Cache: {e.name} nicht gelöscht: {err}")
+        except OSError:
+            pass
+        self._access = {}
+        return freed
+
+    def prune(self):
+        """
+        Am längsten nicht benutzte Einträge löschen, bis der Cache unter
+        max_bytes liegt. Speichert danach den Zugriffs-Index.
+        """
+        try:
+            entries = []
+            for e in os.scandir(self.cache_dir):
+                if not e.is_file() or e.name.startswith(ACCESS_INDEX):
+                    continue
+                st = e.stat()
+                last_used = max(st.st_mtime, self._access.get(e.name, 0.0))
+                entries.append((last_used, st.st_size, e.name))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, name in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    total -= size
+                except OSError:
+                    pass
+            print(f"[DEBUG] Render-Cache aufgeräumt => {total / 1024 ** 3:.1f} GB")
+        existing = {name for _, _, name in entries}
+        self._access = {name: t for name, t in self._access.items()
+                        if name in existing and os.path.isfile(os.path.join(self.cache_dir, name))}
+        self._save_access()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/route_sync.py
+#
+# Abgleich der Route zwischen Python und Karte (map_page.html).
+#
+# Statt nach jeder Änderung eine komplette GeoJSON-FeatureCollection zu
+# bauen und in der Karte alle Features neu anzulegen, merkt sich MapWidget
+# den zuletzt gesendeten Stand (RouteSnapshot). diff_routes() vergleicht
+# alt/neu spaltenweise und liefert wenige Bereichs-Operationen:
+#
+#   ("insert", start, count)   neue Punkte new[start:start+count]
+#   ("delete", start, count)   Punkte alt[start:start+count] entfernen
+#   ("update", start, count)   Punkte verschoben bzw. Farbe (grau) geändert
+#
+# build_patch() verpackt sie als JSON für das mapBridge.routePatch-Signal.
+# Koordinaten gehen als flaches Float64Array (lon,lat,lon,lat,...) mit,
+# base64-kodiert; die Flags als Uint8Array.
+
+import json
+import base64
+
+import numpy as np
+
+from core.track import as_track, NAT
+
+
+# Bits in RouteSnapshot.flags
+FLAG_TIMED = 1   # Punkt hat eine Zeit => gehört zur (schwarzen) Linie
+FLAG_GREY = 2    # Punkt liegt vor dem Videostart (negativer Shift) => grau
+
+# Mehr Einzelbereiche als das werden zu einem zusammengefasst
+MAX_UPDATE_RUNS = 64
+
+# Ab diesem Anteil geänderter Punkte ist Neuaufbau billiger als ein Diff
+FULL_RELOAD_RATIO = 0.5
+
+
+class RouteSnapshot:
+    """Stand der Route, wie ihn die Karte zeigt (Kopie, nicht die Track-Spalten)."""
+
+    __slots__ = ("lon", "lat", "flags")
+
+    def __init__(self, lon, lat, flags):
+        self.lon = lon
+        self.lat = lat
+        self.flags = flags
+
+    def __len__(self):
+        return len(self.lon)
+
+    @classmethod
+    def from_track(cls, data, video_shift: float = 0.0):
+        """
+        Wie früher _build_route_geojson_from_gpx: Punkte mit Zeit bilden die
+        Linie, bei negativem Shift sind die Punkte vor dem Start grau.
+        """
+        track = as_track(data)
+        t_ns = track.time_ns()
+        flags = np.where(t_ns != NAT, FLAG_TIMED, 0).astype(np.uint8)
+        if len(track):
+            positive_ns = int(t_ns[0])
+            if positive_ns != NAT:
+                if video_shift < 0:  # extra Punkte am Anfang
+                    positive_ns += int(abs(video_shift) * 1e9)
+                flags[t_ns < positive_ns] |= FLAG_GREY
+        return cls(np.array(track.column("lon"), dtype=np.float64),
+                   np.array(track.column("lat"), dtype=np.float64),
+                   flags)
+
+    def xy(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """lon/lat verschränkt als flaches Array (für Float64Array in JS)."""
+        sl = slice(start, stop)
+        out = np.empty(2 * len(self.lon[sl]), dtype="<f8")
+        out[0::2] = self.lon[sl]
+        out[1::2] = self.lat[sl]
+        return out
+
+
+def _changed(old: RouteSnapshot, o0: int, new: RouteSnapshot, n0: int, count: int) -> np.ndarray:
+    """Maske: old[o0+k] != new[n0+k] für k < count (NaN == NaN)."""
+    def _ne(a, b):
+        return (a != b) & ~(np.isnan(a) & np.isnan(b))
+
+    return (_ne(old.lon[o0:o0 + count], new.lon[n0:n0 + count])
+            | _ne(old.lat[o0:o0 + count], new.lat[n0:n0 + count])
+            | (old.flags[o0:o0 + count] != new.flags[n0:n0 + count]))
+
+
+def _update_runs(mask: np.ndarray, offset: int) -> list:
+    """Zusammenhängende True-Bereiche der Maske als ("update", start, count)."""
+    edges = np.diff(np.r_[0, mask.astype(np.int8), 0])
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+    if len(starts) > MAX_UPDATE_RUNS:
+        starts, ends = starts[:1], ends[-1:]
+    return [("update", offset + int(s), int(e - s)) for s, e in zip(starts, ends)]
+
+
+def diff_routes(old: RouteSnapshot, new: RouteSnapshot):
+    """
+    Operationen, die old in new überführen (Reihenfolge einhalten), oder
+    None, wenn sich so viel geändert hat, dass ein Neuaufbau günstiger ist.
+    """
+    n_old, n_new = len(old), len(new)
+    if n_old == 0 or n_new == 0:
+        return None
+
+    common = min(n_old, n_new)
+    if n_old == n_new:
+        ops = _update_runs(_changed(old, 0, new, 0, common), 0)
+    else:
+        # gleicher Anfang / gleiches Ende, dazwischen ersetzen
+        diff_head = np.flatnonzero(_changed(old, 0, new, 0, common))
+        prefix = int(diff_head[0]) if len(diff_head) else common
+        tail_len = common - prefix
+        diff_tail = np.flatnonzero(_changed(old, n_old - tail_len, new, n_new - tail_len, tail_len)[::-1])
+        suffix = int(diff_tail[0]) if len(diff_tail) else tail_len
+
+        mid_old = n_old - prefix - suffix
+        mid_new = n_new - prefix - suffix
+        both = min(mid_old, mid_new)
+        ops = _update_runs(_changed(old, prefix, new, prefix, both), prefix)
+        if mid_new > mid_old:
+            ops.append(("insert", prefix + both, mid_new - mid_old))
+        elif mid_old > mid_new:
+            ops.append(("delete", prefix + both, mid_old - mid_new))
+
+    sent = sum(count for op, _, count in ops if op != "delete")
+    if sent > FULL_RELOAD_RATIO * n_new:
+        return None
+    return ops
+
+
+def _b64(arr: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(arr).tobytes()).decode("ascii")
+
+
+def build_patch(new: RouteSnapshot, ops=None, fit: bool = False) -> str:
+    """
+    JSON für applyRoutePatch() in map_page.html.
+    ops=None => kompletter Neuaufbau ("load") mit allen Punkten von new.
+    """
+    if ops is None:
+        out = [{"op": "load", "xy": _b64(new.xy()), "flags": _b64(new.flags), "fit": bool(fit)}]
+    else:
+        out = []
+        for op, start, count in ops:
+            entry = {"op": op, "start": start, "count": count}
+            if op != "delete":
+                entry["xy"] = _b64(new.xy(start, start + count))
+                entry["flags"] = _b64(new.flags[start:start + count])
+            out.append(entry)
+    return json.dumps({"ops": out})
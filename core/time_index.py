@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/time_index.py
+#
+# Video-Zeit => GPX-Index. Die relativen Sekunden der GPX-Punkte werden
+# einmal (in set_gpx_data) übergeben; ist die Reihe monoton, findet
+# closest() den Punkt per Binärsuche, sonst per vektorisiertem argmin.
+
+import numpy as np
+
+
+class TimeIndex:
+    """
+    Unveränderlicher Index über die relativen Zeiten (Sekunden) der
+    GPX-Punkte. Liste, Chart, Mini-Chart und Karte bekommen ihren Index
+    aus derselben Abfrage (GPXListWidget.get_closest_index_for_time).
+    """
+
+    __slots__ = ("_times", "_monotonic", "_last_query")
+
+    def __init__(self, times=()):
+        self._times = np.asarray(times, dtype=np.float64)
+        n = len(self._times)
+        self._monotonic = bool(n < 2 or np.all(np.diff(self._times) >= 0))
+        # (zeit, index) der letzten Abfrage: pro Timer-Tick wird dieselbe
+        # Zeit oft mehrfach gefragt
+        self._last_query = None
+        if not self._monotonic:
+            print(f"[WARN] GPX-Zeiten nicht monoton ({n} Punkte) => lineare Suche")
+
+    def __len__(self):
+        return len(self._times)
+
+    @property
+    def is_monotonic(self) -> bool:
+        return self._monotonic
+
+    def closest(self, t: float) -> int:
+        """
+        Index mit minimaler |zeit - t|; bei Gleichstand der kleinste Index
+        (wie die frühere lineare Suche). Leerer Index => 0.
+        """
+        last = self._last_query
+        if last is not None and last[0] == t:
+            return last[1]
+
+        times = self._times
+        n = len(times)
+        if n == 0:
+            return 0
+        if not self._monotonic:
+            idx = int(np.argmin(np.abs(times - t)))
+        else:
+            i = int(np.searchsorted(times, t, side="left"))
+            if i >= n:
+                idx = int(np.searchsorted(times, times[n - 1], side="left"))
+            elif i == 0:
+                idx = 0
+            else:
+                # Vorgänger liegt < t, bei Gleichstand gewinnt er; bei
+                # doppelten Zeitstempeln den ersten davon nehmen
+                if t - times[i - 1] <= times[i] - t:
+                    idx = int(np.searchsorted(times, times[i - 1], side="left"))
+                else:
+                    idx = i
+        self._last_query = (t, idx)
+        return idx
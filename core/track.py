@@ -0,0 +1,678 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/track.py
+
+import copy
+import weakref
+from collections import deque
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+
+# "Keine Zeit" (entspricht time=None im alten list[dict]-Format)
+NAT = np.iinfo(np.int64).min
+
+FLOAT_FIELDS = ("lat", "lon", "ele", "delta_m", "speed_kmh", "gradient")
+TIME_FIELD = "time"
+# Reihenfolge, in der ein Punkt seine Keys ausgibt (wie im alten Dict)
+FIELD_ORDER = ("lat", "lon", "ele", "time", "delta_m", "speed_kmh", "gradient")
+
+# So viele Änderungen merkt sich ein Track für changed_from()
+CHANGE_LOG_SIZE = 64
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class _Missing:
+    """Platzhalter für 'Key nicht vorhanden' in den Zusatzspalten."""
+    __slots__ = ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return "_MISSING"
+
+    def __repr__(self):
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+
+def datetime_to_ns(dt) -> int:
+    """
+    Wandelt ein datetime in Epoch-Nanosekunden um (None => NAT).
+    Naive Zeiten werden so behandelt, als wären sie UTC.
+    """
+    if dt is None:
+        return NAT
+    if isinstance(dt, str):
+        dt = datetime.fromisoformat(dt.replace("Z", "+00:00"))
+    if dt.tzinfo is not None and dt.utcoffset() is not None:
+        delta = dt - _EPOCH_UTC
+    else:
+        delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+
+
+def ns_to_datetime(ns: int, tzinfo=None):
+    """
+    Gegenstück zu datetime_to_ns. Mit tzinfo=None kommt ein naives datetime zurück.
+    """
+    if ns == NAT:
+        return None
+    us = int(ns) // 1000
+    if tzinfo is None:
+        return _EPOCH + timedelta(microseconds=us)
+    dt = _EPOCH_UTC + timedelta(microseconds=us)
+    if tzinfo is timezone.utc:
+        return dt
+    return dt.astimezone(tzinfo)
+
+
+def _is_mapped(arr) -> bool:
+    """True, wenn arr (auch als Sicht, z.B. nach np.asarray) auf einem np.memmap liegt."""
+    while arr is not None:
+        if isinstance(arr, np.memmap):
+            return True
+        arr = getattr(arr, "base", None)
+    return False
+
+
+class TrackPoint(MutableMapping):
+    """
+    Dict-artige Sicht auf eine Zeile eines Track.
+    Lesen/Schreiben geht direkt in die Spalten-Arrays, damit alter Code
+    wie pt["ele"] += 1.0 oder pt.get("time") unverändert funktioniert.
+    copy()/deepcopy() liefern ein losgelöstes, normales Dict.
+    """
+    __slots__ = ("_track", "_idx")
+
+    def __init__(self, track, idx: int):
+        self._track = track
+        self._idx = idx
+
+    def __getitem__(self, key):
+        return self._track._get_value(self._idx, key)
+
+    def __setitem__(self, key, value):
+        self._track._set_value(self._idx, key, value)
+
+    def __delitem__(self, key):
+        self._track._del_value(self._idx, key)
+
+    def __iter__(self):
+        return iter(self._track._row_keys(self._idx))
+
+    def __len__(self):
+        return len(self._track._row_keys(self._idx))
+
+    def __contains__(self, key):
+        try:
+            self._track._get_value(self._idx, key)
+            return True
+        except KeyError:
+            return False
+
+    def __repr__(self):
+        return f"TrackPoint({self._idx}, {dict(self)!r})"
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+    @property
+    def index(self) -> int:
+        return self._idx
+
+
+class Track:
+    """
+    Spaltenbasierter GPX-Track.
+
+    Statt einer Liste von Dicts liegen lat/lon/ele/delta_m/speed_kmh/gradient
+    als zusammenhängende float64-Arrays und die Zeit als int64 (Epoch-ns) vor.
+    Zusätzliche Keys (stable_id, abs_s, ...) landen in einfachen Listen.
+
+    Die Klasse verhält sich wie eine Liste: len(), Index-Zugriff (liefert
+    TrackPoint-Sichten), Slicing (liefert einen neuen Track), insert/append/
+    pop/del, '+' und deepcopy (reine Array-Kopie, ideal für Undo-Snapshots).
+    """
+
+    def __init__(self, capacity: int = 0):
+        self._n = 0
+        self._cols = {name: np.full(capacity, np.nan) for name in FLOAT_FIELDS}
+        self._time = np.full(capacity, NAT, dtype=np.int64)
+        self._extra = {}
+        # Zeitzone der Zeitstempel (None => naive datetimes)
+        self.tzinfo = None
+        self._tz_known = False
+        # Wird bei jeder Änderung erhöht (z. B. für Caches in Widgets)
+        self.version = 0
+        # [erste version, letzte version, erster geänderter Index] der letzten
+        # Änderungen; aufeinanderfolgende Änderungen ab gleichem oder späterem
+        # Index teilen sich einen Eintrag (Schleifen pt["ele"] = ... über viele Punkte)
+        self._change_log = deque(maxlen=CHANGE_LOG_SIZE)
+        # weakrefs auf Callbacks für release_mapping()
+        self._release_listeners = []
+
+    # -----------------------------------------------------------------
+    # Konstruktion / Export
+    # -----------------------------------------------------------------
+    @classmethod
+    def from_points(cls, points):
+        """
+        Baut einen Track aus einer Liste von Dicts (altes Format).
+        Ist points bereits ein Track, wird eine Kopie zurückgegeben.
+        """
+        if isinstance(points, Track):
+            return points.copy()
+        points = list(points)
+        n = len(points)
+        track = cls(n)
+        track._n = n
+        if n == 0:
+            return track
+
+        for name in FLOAT_FIELDS:
+            vals = [p.get(name) for p in points]
+            track._cols[name][:n] = [np.nan if v is None else v for v in vals]
+
+        times = [p.get("time") for p in points]
+        for t in times:
+            if t is not None:
+                track._set_tz_from(t)
+                break
+        track._time[:n] = [datetime_to_ns(t) for t in times]
+
+        extra_keys = []
+        for p in points:
+            for k in p.keys():
+                if k not in FIELD_ORDER and k not in extra_keys:
+                    extra_keys.append(k)
+        for k in extra_keys:
+            track._extra[k] = [p.get(k, _MISSING) for p in points]
+        return track
+
+    @classmethod
+    def from_columns(cls, lat, lon, ele=None, time_ns=None, tzinfo=timezone.utc,
+                     extra=None, copy=True, **metrics):
+        """
+        Baut einen Track direkt aus Arrays (z. B. Parser, Projekt-Laden).
+
+        extra: optionale Zusatzspalten {key: liste}, None = Key fehlt.
+        copy=False übernimmt passende Arrays (float64/int64) ohne Kopie,
+        z. B. memory-mapped Spalten aus einer Projektdatei.
+        """
+        conv = np.array if copy else np.asarray
+        lat = conv(lat, dtype=np.float64)
+        n = len(lat)
+        track = cls(0)
+        track._n = n
+        track._cols["lat"] = lat
+        track._cols["lon"] = conv(lon, dtype=np.float64)
+        track._cols["ele"] = (np.zeros(n) if ele is None
+                              else conv(ele, dtype=np.float64))
+        for name in ("delta_m", "speed_kmh", "gradient"):
+            vals = metrics.get(name)
+            track._cols[name] = (np.zeros(n) if vals is None
+                                 else conv(vals, dtype=np.float64))
+        track._time = (np.full(n, NAT, dtype=np.int64) if time_ns is None
+                       else conv(time_ns, dtype=np.int64))
+        track.tzinfo = tzinfo
+        track._tz_known = time_ns is not None
+        for k, vals in (extra or {}).items():
+            if k in FIELD_ORDER:
+                continue
+            track._extra[k] = [_MISSING if v is None else v for v in vals]
+        return track
+
+    def to_points(self) -> list:
+        """Exportiert den Track als Liste normaler Dicts (z. B. für JSON)."""
+        return [dict(TrackPoint(self, i)) for i in range(self._n)]
+
+    def extra_columns(self) -> dict:
+        """Zusatz-Keys als {key: liste}, fehlende Werte als None."""
+        return {k: [None if v is _MISSING else v for v in lst[:self._n]]
+                for k, lst in self._extra.items()}
+
+    def release_mapping(self):
+        """
+        Holt memory-mapped Spalten vollständig in den Speicher.
+        Nötig, bevor die zugrunde liegende Datei überschrieben wird
+        (unter Windows ist eine gemappte Datei sonst gesperrt).
+        Wer Sichten aus column()/time_ns() aufhebt, meldet sich per
+        add_release_listener() an und holt sie im Callback neu; erst wenn
+        keine alte Sicht mehr lebt, ist die Datei wirklich frei.
+        """
+        n = self._n
+        released = False
+        for name, col in self._cols.items():
+            if _is_mapped(col):
+                self._cols[name] = np.array(col[:n])
+                released = True
+        if _is_mapped(self._time):
+            self._time = np.array(self._time[:n])
+            released = True
+        if not released:
+            return
+        for ref in list(self._release_listeners):
+            callback = ref()
+            if callback is None:
+                self._release_listeners.remove(ref)
+            else:
+                callback()
+
+    def add_release_listener(self, callback):
+        """
+        callback() wird nach release_mapping() aufgerufen. Gehalten wird nur
+        eine weakref (bei Methoden per WeakMethod), doppelte zählen einfach.
+        """
+        ref = (weakref.WeakMethod(callback) if hasattr(callback, "__self__")
+               else weakref.ref(callback))
+        if ref not in self._release_listeners:
+            self._release_listeners.append(ref)
+
+    def copy(self):
+        track = Track(0)
+        n = self._n
+        track._n = n
+        track._cols = {name: col[:n].copy() for name, col in self._cols.items()}
+        track._time = self._time[:n].copy()
+        track._extra = {k: copy.deepcopy(v) for k, v in self._extra.items()}
+        track.tzinfo = self.tzinfo
+        track._tz_known = self._tz_known
+        return track
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    # -----------------------------------------------------------------
+    # Spalten-Zugriff (vektorisiert)
+    # -----------------------------------------------------------------
+    def column(self, name: str) -> np.ndarray:
+        """
+        Liefert eine (beschreibbare) Sicht auf eine float64-Spalte.
+        Nach direktem Schreiben bitte touch() aufrufen.
+        """
+        return self._cols[name][:self._n]
+
+    def time_ns(self) -> np.ndarray:
+        """Sicht auf die Zeitspalte (Epoch-Nanosekunden, NAT = keine Zeit)."""
+        return self._time[:self._n]
+
+    def has_times(self) -> np.ndarray:
+        return self._time[:self._n] != NAT
+
+    def rel_seconds(self, base_ns: int = None) -> np.ndarray:
+        """
+        Zeit in Sekunden relativ zu base_ns (Default: erster Punkt).
+        Punkte ohne Zeit ergeben NaN.
+        """
+        t = self._time[:self._n]
+        if self._n == 0:
+            return np.zeros(0)
+        if base_ns is None:
+            base_ns = t[0]
+        out = (t - base_ns).astype(np.float64) / 1e9
+        if base_ns == NAT:
+            out[:] = np.nan
+        else:
+            out[t == NAT] = np.nan
+        return out
+
+    def time_at(self, idx: int):
+        return ns_to_datetime(self._time[self._norm_index(idx)], self.tzinfo)
+
+    def shift_time(self, delta: timedelta, start: int = 0, stop: int = None):
+        """Verschiebt die Zeiten in [start:stop] um delta (vektorisiert)."""
+        t = self._time[:self._n][start:stop]
+        valid = t != NAT
+        step = delta // timedelta(microseconds=1) * 1000
+        t[valid] += step
+        self.touch(range(self._n)[start:stop].start)
+
+    def touch(self, start: int = 0):
+        """
+        Markiert den Track als geändert. start = erster Index, der sich
+        geändert (oder verschoben) haben kann; davor ist alles wie vorher.
+        """
+        self.version += 1
+        start = max(0, int(start))
+        log = self._change_log
+        if log and log[-1][1] == self.version - 1 and start >= log[-1][2]:
+            log[-1][1] = self.version
+        else:
+            log.append([self.version, self.version, start])
+
+    def changed_from(self, since_version: int):
+        """
+        Erster Index, der sich seit since_version geändert haben kann
+        (None = unverändert). Reicht das Änderungsprotokoll nicht so weit
+        zurück, kommt 0 (=> alles neu).
+        """
+        if since_version == self.version:
+            return None
+        log = self._change_log
+        if since_version > self.version or not log or log[0][0] > since_version + 1:
+            return 0
+        return min(start for first, last, start in log if last > since_version)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.nbytes for col in self._cols.values()) + self._time.nbytes
+
+    # -----------------------------------------------------------------
+    # Listen-Protokoll
+    # -----------------------------------------------------------------
+    def __len__(self):
+        return self._n
+
+    def __bool__(self):
+        return self._n > 0
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield TrackPoint(self, i)
+
+    def __repr__(self):
+        return f"<Track n={self._n}>"
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._take(range(*key.indices(self._n)))
+        return TrackPoint(self, self._norm_index(key))
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            rng = range(*key.indices(self._n))
+            values = list(value)
+            if key.step not in (None, 1):
+                if len(values) != len(rng):
+                    raise ValueError("attempt to assign sequence of wrong size to extended slice")
+                for i, v in zip(rng, values):
+                    self._write_row(i, v, touch=False)
+                if len(rng):
+                    self.touch(min(rng))
+                return
+            del self[key]
+            start = rng.start
+            for k, v in enumerate(values):
+                self._insert_row(start + k, v)
+            if values:
+                self.touch(start)
+            return
+        self._write_row(self._norm_index(key), value)
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            rng = range(*key.indices(self._n))
+            if len(rng) == 0:
+                return
+            if rng.step == 1:
+                self._delete_block(rng.start, rng.stop)
+            else:
+                keep = np.ones(self._n, dtype=bool)
+                keep[list(rng)] = False
+                self._compact(keep)
+            return
+        i = self._norm_index(key)
+        self._delete_block(i, i + 1)
+
+    def __add__(self, other):
+        result = self.copy()
+        result.extend(other)
+        return result
+
+    def __radd__(self, other):
+        result = Track.from_points(other)
+        result.extend(self)
+        return result
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def insert(self, idx: int, point):
+        n = self._n
+        if idx < 0:
+            idx = max(0, n + idx)
+        idx = min(idx, n)
+        self._insert_row(idx, point)
+        self.touch(idx)
+
+    def _insert_row(self, idx: int, point):
+        """insert() ohne touch(); idx muss bereits in [0, len] liegen."""
+        n = self._n
+        if isinstance(point, TrackPoint):
+            point = dict(point)
+        self._reserve(n + 1)
+        for col in self._cols.values():
+            col[idx + 1:n + 1] = col[idx:n]
+        self._time[idx + 1:n + 1] = self._time[idx:n]
+        for lst in self._extra.values():
+            lst.insert(idx, _MISSING)
+        self._n = n + 1
+        self._write_row(idx, point, touch=False)
+
+    def append(self, point):
+        self.insert(self._n, point)
+
+    def extend(self, points):
+        if isinstance(points, Track):
+            other = points
+        else:
+            other = Track.from_points(points)
+        m = other._n
+        if m == 0:
+            return
+        if not self._tz_known and other._tz_known:
+            self.tzinfo = other.tzinfo
+            self._tz_known = True
+        n = self._n
+        self._reserve(n + m)
+        for name, col in self._cols.items():
+            col[n:n + m] = other._cols[name][:m]
+        self._time[n:n + m] = other._time[:m]
+        for k in set(self._extra) | set(other._extra):
+            mine = self._extra.setdefault(k, [_MISSING] * n)
+            mine.extend(other._extra.get(k, [_MISSING] * m))
+        self._n = n + m
+        self.touch(n)
+
+    def pop(self, idx: int = -1) -> dict:
+        i = self._norm_index(idx)
+        point = dict(TrackPoint(self, i))
+        self._delete_block(i, i + 1)
+        return point
+
+    def clear(self):
+        self._delete_block(0, self._n)
+
+    # -----------------------------------------------------------------
+    # Interna
+    # -----------------------------------------------------------------
+    def _norm_index(self, idx: int) -> int:
+        idx = int(idx)
+        if idx < 0:
+            idx += self._n
+        if idx < 0 or idx >= self._n:
+            raise IndexError("track index out of range")
+        return idx
+
+    def _reserve(self, needed: int):
+        cap = len(self._time)
+        if needed <= cap:
+            return
+        new_cap = max(needed, cap * 2, 16)
+        for name, col in self._cols.items():
+            grown = np.full(new_cap, np.nan)
+            grown[:self._n] = col[:self._n]
+            self._cols[name] = grown
+        grown_t = np.full(new_cap, NAT, dtype=np.int64)
+        grown_t[:self._n] = self._time[:self._n]
+        self._time = grown_t
+
+    def _take(self, indices):
+        idx = np.asarray(indices, dtype=np.int64)
+        track = Track(0)
+        track._n = len(idx)
+        track._cols = {name: col[:self._n][idx] for name, col in self._cols.items()}
+        track._time = self._time[:self._n][idx]
+        track._extra = {k: [copy.deepcopy(v[i]) for i in idx] for k, v in self._extra.items()}
+        track.tzinfo = self.tzinfo
+        track._tz_known = self._tz_known
+        return track
+
+    def _delete_block(self, start: int, stop: int):
+        n = self._n
+        k = stop - start
+        if k <= 0:
+            return
+        for col in self._cols.values():
+            col[start:n - k] = col[stop:n]
+            col[n - k:n] = np.nan
+        self._time[start:n - k] = self._time[stop:n]
+        self._time[n - k:n] = NAT
+        for lst in self._extra.values():
+            del lst[start:stop]
+        self._n = n - k
+        self.touch(start)
+
+    def _compact(self, keep: np.ndarray):
+        n = self._n
+        m = int(keep.sum())
+        for col in self._cols.values():
+            col[:m] = col[:n][keep]
+            col[m:n] = np.nan
+        self._time[:m] = self._time[:n][keep]
+        self._time[m:n] = NAT
+        for k, lst in self._extra.items():
+            self._extra[k] = [v for v, flag in zip(lst, keep) if flag]
+        self._n = m
+        self.touch(int(np.argmin(keep[:n])) if m < n else n)
+
+    def _set_tz_from(self, dt):
+        if self._tz_known or not isinstance(dt, datetime):
+            return
+        self.tzinfo = dt.tzinfo if dt.utcoffset() is not None else None
+        self._tz_known = True
+
+    def _write_row(self, idx: int, point, touch: bool = True):
+        if isinstance(point, TrackPoint):
+            point = dict(point)
+        for name, col in self._cols.items():
+            v = point.get(name)
+            col[idx] = np.nan if v is None else v
+        self._store_value(idx, TIME_FIELD, point.get(TIME_FIELD))
+        for k, lst in self._extra.items():
+            lst[idx] = point.get(k, _MISSING) if k in point else _MISSING
+        for k in point.keys():
+            if k not in FIELD_ORDER and k not in self._extra:
+                self._store_value(idx, k, point[k])
+        # eine Änderung pro Zeile, nicht pro Feld (sonst läuft das
+        # Änderungsprotokoll bei Bulk-Edits sofort über)
+        if touch:
+            self.touch(idx)
+
+    def _get_value(self, idx: int, key):
+        col = self._cols.get(key)
+        if col is not None:
+            v = col[idx]
+            if v != v:  # NaN => Key nicht vorhanden
+                raise KeyError(key)
+            return float(v)
+        if key == TIME_FIELD:
+            return ns_to_datetime(self._time[idx], self.tzinfo)
+        lst = self._extra.get(key)
+        if lst is None or lst[idx] is _MISSING:
+            raise KeyError(key)
+        return lst[idx]
+
+    def _set_value(self, idx: int, key, value):
+        self._store_value(idx, key, value)
+        self.touch(idx)
+
+    def _store_value(self, idx: int, key, value):
+        """Schreibt ein Feld ohne touch() (der Aufrufer markiert die Änderung)."""
+        col = self._cols.get(key)
+        if col is not None:
+            col[idx] = np.nan if value is None else value
+        elif key == TIME_FIELD:
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if value is not None:
+                self._set_tz_from(value)
+            self._time[idx] = datetime_to_ns(value)
+        else:
+            lst = self._extra.get(key)
+            if lst is None:
+                lst = self._extra[key] = [_MISSING] * self._n
+            lst[idx] = value
+
+    def _del_value(self, idx: int, key):
+        self._get_value(idx, key)  # KeyError, falls nicht vorhanden
+        col = self._cols.get(key)
+        if col is not None:
+            col[idx] = np.nan
+        elif key == TIME_FIELD:
+            self._time[idx] = NAT
+        else:
+            self._extra[key][idx] = _MISSING
+        self.touch(idx)
+
+    def _row_keys(self, idx: int) -> list:
+        keys = []
+        for name in FIELD_ORDER:
+            if name == TIME_FIELD:
+                keys.append(name)
+            else:
+                v = self._cols[name][idx]
+                if v == v:
+                    keys.append(name)
+        for k, lst in self._extra.items():
+            if lst[idx] is not _MISSING:
+                keys.append(k)
+        return keys
+
+
+def as_track(data) -> Track:
+    """
+    Gibt data als Track zurück (ohne Kopie, falls es schon einer ist).
+    """
+    if isinstance(data, Track):
+        return data
+    return Track.from_points(data or [])
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of KVRouite.
+#
+# Copyright (C) 2025 by Bernd Eller
+#
+# KVRouite is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KVRouite is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
+#
+
+# core/track_stats.py
+#
+# Statistik-Index über einem Track für Übersichtszeile, Summary und die
+# B..E-Dialoge.
+#
+# Pro Punkt i gibt es ein "Segment" i-1 => i (Punkt 0 hat keins). Daraus
+# werden Präfixsummen gebildet (Distanz 3D = delta_m, Distanz 2D per
+# Haversine, positiver Anstieg, Pausen), so dass jede Bereichsabfrage B..E
+# nur eine Differenz zweier Einträge ist. Min/Max (gradient, speed_kmh)
+# beantwortet ein Sparse-Table über 64er-Blöcken plus die beiden Randblöcke.
+#
+# Der Index hängt per TrackStats.for_track() am Track und wird bei der
+# nächsten Abfrage nachgezogen: Track.changed_from() liefert den ersten
+# geänderten Index, alles davor bleibt stehen.
+
+import weakref
+
+import numpy as np
+
+from core.track import Track, as_track, NAT
+
+
+EARTH_RADIUS_M = 6371000
+
+# Lücken über so vielen Sekunden zählen als Pause (wie _update_gpx_overview)
+PAUSE_GAP_S = 1.0
+
+# Blockgröße für die Min/Max-Abfragen
+RANGE_BLOCK = 64
+
+_stats_by_track = weakref.WeakKeyDictionary()
+
+
+def _column0(track: Track, name: str, start: int = 0) -> np.ndarray:
+    """Spalte ab start, fehlende Werte (NaN) wie pt.get(name, 0.0) als 0."""
+    return np.nan_to_num(track.column(name)[start:], nan=0.0)
+
+
+def _prefix(old: np.ndarray, start: int, seg: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """
+    Präfixsumme der Segmente start.. an die unveränderten Einträge old[:start]
+    anhängen. Summiert wird der Reihe nach (wie die früheren Schleifen).
+    """
+    out = np.empty(start + len(seg), dtype=dtype)
+    out[:start] = old[:start]
+    base = out[start - 1] if start > 0 else 0
+    out[start:] = np.cumsum(np.r_[np.asarray(base, dtype=dtype), seg.astype(dtype)])[1:]
+    return out
+
+
+class _RangeArg:
+    """
+    Index des größten (bzw. kleinsten) Werts in values[l..r].
+    Bei Gleichstand gewinnt der kleinste Index (wie list.index(max(...))).
+    """
+
+    def __init__(self, want_max: bool):
+        self.want_max = want_max
+        self.values = np.zeros(0)
+        self._levels = []  # Sparse-Table über die Blockbesten (Indizes)
+
+    def _better(self, a, b):
+        """Elementweise: b statt a, wenn echt besser (a liegt links von b)."""
+        va, vb = self.values[a], self.values[b]
+        return np.where(vb > va if self.want_max else vb < va, b, a)
+
+    def _arg(self, lo: int, hi: int) -> int:
+        seg = self.values[lo:hi + 1]
+        return lo + int(np.argmax(seg) if self.want_max else np.argmin(seg))
+
+    def update(self, values: np.ndarray, start: int = 0):
+        """values komplett übernehmen, Blöcke ab start neu berechnen."""
+        self.values = values
+        n = len(values)
+        n_blocks = (n + RANGE_BLOCK - 1) // RANGE_BLOCK
+        b0 = min(start // RANGE_BLOCK, len(self._levels[0]) if self._levels else 0)
+
+        # Ebene 0: bester Index je Block
+        pad = n_blocks * RANGE_BLOCK - n
+        fill = -np.inf if self.want_max else np.inf
+        blocks = np.r_[values[b0 * RANGE_BLOCK:], np.full(pad, fill)].reshape(-1, RANGE_BLOCK)
+        best = blocks.argmax(axis=1) if self.want_max else blocks.argmin(axis=1)
+        best = best + (np.arange(b0, n_blocks) * RANGE_BLOCK)
+        old = self._levels[0][:b0] if self._levels else np.zeros(0, dtype=np.int64)
+        levels = [np.r_[old, best].astype(np.int64)]
+
+        # Ebene k: bester Index in Blöcken j..j+2^k-1
+        k = 1
+        while (1 << k) <= n_blocks:
+            half = 1 << (k - 1)
+            prev = levels[k - 1]
+            size = n_blocks - (1 << k) + 1
+            j0 = max(0, b0 - (1 << k) + 1)
+            if k < len(self._levels):
+                j0 = min(j0, len(self._levels[k]))
+                keep = self._levels[k][:j0]
+            else:
+                j0, keep = 0, np.zeros(0, dtype=np.int64)
+            j = np.arange(j0, size)
+            levels.append(np.r_[keep, self._better(prev[j], prev[j + half])].astype(np.int64))
+            k += 1
+        self._levels = levels
+
+    def query(self, lo: int, hi: int) -> int:
+        bl = lo // RANGE_BLOCK + 1       # erster ganz enthaltener Block
+        br = (hi + 1) // RANGE_BLOCK - 1  # letzter ganz enthaltener Block
+        if br < bl:
+            return self._arg(lo, hi)
+
+        # linker Rand, Blöcke, rechter Rand (in dieser Reihenfolge vergleichen)
+        candidates = []
+        if lo < bl * RANGE_BLOCK:
+            candidates.append(self._arg(lo, bl * RANGE_BLOCK - 1))
+        k = int(br - bl + 1).bit_length() - 1
+        lvl = self._levels[k]
+        candidates.append(int(self._better(lvl[bl], lvl[br - (1 << k) + 1])))
+        if (br + 1) * RANGE_BLOCK <= hi:
+            candidates.append(self._arg((br + 1) * RANGE_BLOCK, hi))
+
+        best = candidates[0]
+        for c in candidates[1:]:
+            best = int(self._better(best, c))
+        return best
+
+
+class TrackStats:
+    """
+    Präfixsummen und Min/Max-Index für einen Track.
+    Alle Bereichsabfragen nehmen Punktindizes b..e (inklusive, b <= e).
+    """
+
+    def __init__(self):
+        self.version = None
+        self.n = 0
+        self._cum_dist = np.zeros(0)     # Summe delta_m (3D)
+        self._cum_dist2d = np.zeros(0)   # Summe Haversine (2D)
+        self._cum_climb = np.zeros(0)    # Summe positiver Höhendifferenzen
+        self._cum_pause = np.zeros(0, dtype=np.int64)
+        self._cum_unordered = np.zeros(0, dtype=np.int64)  # fehlende/fallende Zeiten
+        self._below = {}                 # name, schwelle => Präfix-Zähler
+        self._ranges = {
+            (name, want_max): _RangeArg(want_max)
+            for name in ("gradient", "speed_kmh") for want_max in (True, False)
+        }
+        # nur schwach: der Index hängt per WeakKeyDictionary am Track und
+        # darf ihn nicht am Leben halten
+        self._track_ref = None
+        self._owned_track = None  # list[dict]-Daten: eigene, nicht gemerkte Kopie
+
+    @property
+    def _track(self):
+        return self._track_ref() if self._track_ref is not None else None
+
+    @classmethod
+    def for_track(cls, data):
+        """
+        Aktueller Index für data. Für einen Track wird er gemerkt und nur ab
+        der ersten Änderung neu gerechnet; list[dict]-Daten zählen jedes Mal neu.
+        """
+        track = as_track(data)
+        if track is not data:
+            stats = cls()
+            stats._owned_track = track
+            stats.refresh(track)
+            return stats
+        stats = _stats_by_track.get(track)
+        if stats is None:
+            stats = _stats_by_track[track] = cls()
+        stats.refresh(track)
+        return stats
+
+    def refresh(self, track: Track):
+        """Zieht den Index nach den Änderungen seit dem letzten Aufruf nach."""
+        if self.version is None:
+            start = 0
+        else:
+            start = track.changed_from(self.version)
+            if start is None:
+                return
+        n = len(track)
+        start = min(start, self.n, n)
+        self._track_ref = weakref.ref(track)
+        self.n = n
+        self.version = track.version
+        if n == 0:
+            owned = self._owned_track
+            self.__init__()
+            self._owned_track = owned
+            self._track_ref, self.version = weakref.ref(track), track.version
+            return
+
+        # Segment i braucht Punkt i-1 => ab s0 lesen
+        s0 = max(0, start - 1)
+        lat = track.column("lat")[s0:]
+        lon = track.column("lon")[s0:]
+        ele = _column0(track, "ele", s0)
+        t = track.time_ns()[s0:]
+
+        def _seg(values):
+            # Segmente start..n-1; Punkt 0 bekommt eine 0
+            return values if start > 0 else np.r_[0, values]
+
+        d_lat = np.radians(np.diff(lat))
+        d_lon = np.radians(np.diff(lon))
+        lat_r = np.radians(lat)
+        a = (np.sin(d_lat / 2) ** 2
+             + np.cos(lat_r[:-1]) * np.cos(lat_r[1:]) * np.sin(d_lon / 2) ** 2)
+        dist2d = EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        dh = np.diff(ele)
+        valid_t = (t[1:] != NAT) & (t[:-1] != NAT)
+        dt_s = np.where(valid_t, np.diff(t), 0).astype(np.float64) / 1e9
+
+        # delta_m[0] steht mit drin, fällt aber bei jeder Differenz heraus
+        self._cum_dist = _prefix(self._cum_dist, start, _column0(track, "delta_m", start))
+        self._cum_dist2d = _prefix(self._cum_dist2d, start, _seg(dist2d))
+        self._cum_climb = _prefix(self._cum_climb, start, _seg(np.where(dh > 0, dh, 0.0)))
+        self._cum_pause = _prefix(self._cum_pause, start,
+                                  _seg(valid_t & (dt_s > PAUSE_GAP_S)), np.int64)
+        self._cum_unordered = _prefix(self._cum_unordered, start,
+                                      _seg(~valid_t | (np.diff(t) < 0)), np.int64)
+
+        for key in list(self._below):
+            name, threshold = key
+            vals = _column0(track, name, start) < threshold
+            self._below[key] = _prefix(self._below[key], start, vals, np.int64)
+
+        for (name, _), rng in self._ranges.items():
+            rng.update(_column0(track, name), start)
+
+    # ----------------------------------------------------------
+    # Abfragen
+    # ----------------------------------------------------------
+    def _clip(self, b: int, e: int):
+        if b > e:
+            b, e = e, b
+        return max(0, b), min(self.n - 1, e)
+
+    def distance_m(self, b: int, e: int) -> float:
+        """Summe delta_m der Punkte b+1..e (3D-Distanz wie in der Übersicht)."""
+        b, e = self._clip(b, e)
+        return float(self._cum_dist[e] - self._cum_dist[b]) if e > b else 0.0
+
+    def distance_2d_m(self, b: int, e: int) -> float:
+        """Haversine-Distanz (2D) von Punkt b bis Punkt e."""
+        b, e = self._clip(b, e)
+        return float(self._cum_dist2d[e] - self._cum_dist2d[b]) if e > b else 0.0
+
+    def cumulative_2d(self, b: int, e: int) -> np.ndarray:
+        """2D-Distanz von b zu jedem Punkt b..e (erster Eintrag 0)."""
+        b, e = self._clip(b, e)
+        return self._cum_dist2d[b:e + 1] - self._cum_dist2d[b]
+
+    def climb_m(self, b: int, e: int) -> float:
+        """Summe der positiven Höhendifferenzen zwischen b und e."""
+        b, e = self._clip(b, e)
+        return float(self._cum_climb[e] - self._cum_climb[b]) if e > b else 0.0
+
+    def pause_count(self, b: int, e: int) -> int:
+        """Anzahl Segmente in b..e mit Zeitlücke > PAUSE_GAP_S."""
+        b, e = self._clip(b, e)
+        return int(self._cum_pause[e] - self._cum_pause[b]) if e > b else 0
+
+    def count_below(self, name: str, threshold: float, b: int, e: int) -> int:
+        """Anzahl Punkte b+1..e mit name < threshold (fehlend = 0)."""
+        key = (name, float(threshold))
+        cum = self._below.get(key)
+        if cum is None:
+            if len(self._below) >= 8:
+                self._below.clear()
+            vals = _column0(self._track, name) < threshold
+            cum = self._below[key] = _prefix(np.zeros(0, dtype=np.int64), 0, vals, np.int64)
+        b, e = self._clip(b, e)
+        return int(cum[e] - cum[b]) if e > b else 0
+
+    def max_index(self, name: str, b: int, e: int) -> int:
+        """Index des größten Werts (gradient/speed_kmh) in b..e."""
+        b, e = self._clip(b, e)
+        return self._ranges[(name, True)].query(b, e)
+
+    def min_index(self, name: str, b: int, e: int) -> int:
+        """Index des kleinsten Werts (gradient/speed_kmh) in b..e."""
+        b, e = self._clip(b, e)
+        return self._ranges[(name, False)].query(b, e)
+
+    def max_value(self, name: str, b: int, e: int) -> float:
+        return float(self._ranges[(name, True)].values[self.max_index(name, b, e)])
+
+    def min_value(self, name: str, b: int, e: int) -> float:
+        return float(self._ranges[(name, False)].values[self.min_index(name, b, e)])
+
+    def first_index_at_or_after(self, t_ns: int):
+        """
+        Erster Punkt mit Zeit >= t_ns (None, wenn keiner). Sind alle Zeiten
+        vorhanden und aufsteigend, per Binärsuche.
+        """
+        t = self._track.time_ns()
+        if self.n and self._cum_unordered[-1] == 0:
+            i = int(np.searchsorted(t, t_ns, side="left"))
+            return i if i < self.n else None
+        hit = (t != NAT) & (t >= t_ns)
+        return int(np.argmax(hit)) if hit.any() else None
@@ -22,6 +22,8 @@
 from PySide6.QtWidgets import QMessageBox
 from PySide6.QtCore import QObject, QTimer, Signal
 
+from core.cut_index import CutIndex
+
 class VideoCutManager(QObject):
     cutsChanged = Signal(float)
 
@@ -39,6 +41,10 @@ class VideoCutManager(QObject):
         self.video_durations = []
         self._last_skip_target = None
         self._orig_marker_func = None
+
+        # CutIndex + Schlüssel, wird nur bei geänderten Cuts neu gebaut
+        self._cut_index = None
+        self._cut_index_key = None
         
         
     def stop_skip_timer(self):
@@ -55,6 +61,24 @@ class VideoCutManager(QObject):
     def set_video_durations(self, durations_list):
         self.video_durations = durations_list
 
+    def invalidate_cut_index(self):
+        """Nach direkten Änderungen an _cut_intervals aufrufen."""
+        self._cut_index = None
+
+    def cut_index(self, total_duration=None) -> CutIndex:
+        """
+        CutIndex für die aktuellen Cuts (total_duration: Standard = Summe der
+        Videolängen). Neu gebaut wird nur nach invalidate_cut_index() bzw.
+        wenn Liste, Anzahl der Cuts oder Gesamtdauer sich geändert haben.
+        """
+        if total_duration is None:
+            total_duration = sum(self.video_durations)
+        key = (id(self._cut_intervals), len(self._cut_intervals), total_duration)
+        if self._cut_index is None or key != self._cut_index_key:
+            self._cut_index = CutIndex(self._cut_intervals, total_duration)
+            self._cut_index_key = key
+        return self._cut_index
+
     def on_markB_clicked(self):
         current_global_s = self._get_current_global_time()
         if self.markE_time_s >= 0 and current_global_s >= self.markE_time_s:
@@ -96,6 +120,7 @@ class VideoCutManager(QObject):
             return
         print(f"[DEBUG] CUT hinzugefügt: ({start_s:.3f}, {end_s:.3f})")
         self._cut_intervals.append((start_s, end_s))
+        self.invalidate_cut_index()
         self.timeline.add_cut_interval(start_s, end_s)
         self.markB_time_s = -1
         self.markE_time_s = -1
@@ -108,6 +133,7 @@ class VideoCutManager(QObject):
         if not self._cut_intervals:
             return
         self._cut_intervals.pop()
+        self.invalidate_cut_index()
         self.timeline.remove_last_cut_interval()
         self._emit_cuts_changed()
         self.video_editor.set_cut_intervals(self._cut_intervals)
@@ -176,12 +202,13 @@ class VideoCutManager(QObject):
     def _find_skip_target(self, current_s: float):
         """
         Falls current_s in einem cut-Intervall liegt (start_s <= current_s < end_s),
-        soll direkt ans Ende (end_s) gesprungen werden.
+        soll direkt ans Ende (end_s) gesprungen werden. Überlappende Cuts sind
+        im CutIndex verschmolzen => ein Sprung ans Ende des ganzen Bereichs.
         """
-        for (start_s, end_s) in self._cut_intervals:
-            if start_s <= current_s < end_s:
-                return end_s
-        return None
+        if not self._cut_intervals:
+            return None
+        cut = self.cut_index().cut_at(current_s)
+        return cut[1] if cut is not None else None
 
     def _is_repeated_skip_target(self, skip_target: float) -> bool:
         """
@@ -272,7 +299,6 @@ class VideoCutManager(QObject):
         Returns True, wenn 'time_s' innerhalb eines vorhandenen 
         Schnittbereichs (start_s <= time_s < end_s) liegt.
         """
-        for (start_s, end_s) in self._cut_intervals:
-            if start_s <= time_s < end_s:
-                return True
-        return False
+        if not self._cut_intervals:
+            return False
+        return self.cut_index().is_in_cut(time_s)
@@ -38,7 +38,10 @@ import subprocess
 import tempfile
 import shutil
 import contextlib
+import threading
+import queue
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from PySide6.QtCore import Qt, QSettings
 from PySide6.QtGui import QTextCursor
@@ -50,15 +53,33 @@ from PySide6.QtWidgets import (
 
 # Hilfsklasse, um print(...) in ein Callback zu leiten:
 class _StringStream:
-    """Alle print()-Ausgaben in write(text)->callback(text)."""
+    """
+    Alle print()-Ausgaben in write(text)->callback(text).
+    Nur für den Thread, der den Stream angelegt hat (GUI); Ausgaben anderer
+    Threads gehen weiter auf die Konsole, damit kein Worker das Textfeld
+    anfasst.
+    """
     def __init__(self, callback):
         self._callback = callback
+        self._owner = threading.get_ident()
     def write(self, text):
+        if threading.get_ident() != self._owner:
+            if sys.__stdout__ is not None:  # z.B. Windows-GUI-Build ohne Konsole
+                sys.__stdout__.write(text)
+            return
         self._callback(text)
     def flush(self):
         pass
 
 from config import MY_GLOBAL_TMP_DIR
+from core.mp4_keyframes import read_mp4_keyframes
+from core.keyframe_index import KeyframeIndex, keyframe_index
+from core.keyframe_cache import load_cached_keyframes, store_keyframes
+from core.fingerprint import file_fingerprint
+from core.render_cache import RenderCache, render_key, DEFAULT_CACHE_GB
+from core.ffmpeg_runner import run_ffmpeg
+from core.media_probe import probe_media, probe_many, media_duration
+from core.hardware_detect import max_parallel_encodes, max_parallel_copies
 
 ##### hier xfade6_2.py rein kopieren!
 
@@ -226,6 +247,22 @@ ERLÄUTERUNG DER FELDER
        => hält Seitenverhältnis. 
     => z.B. 1280 => 1280 x (height?)
 
+12) **"smart_render"** (optional, default: QSettings "encoder/smart_render" = false,
+    Schalter im Encoder-Setup)  
+    => nur die GOPs an Crossfades/Overlays/Trim-Grenzen werden neu 
+       encodet, der Rest per Stream-Copy direkt aus den Originalen. 
+    => Nur möglich, wenn Codec, Profil/Level, Breite und FPS der Quellen
+       zum Export passen; sonst automatisch der klassische Weg (merged.mp4).
+    => Neu encodete Teile bekommen Profil/Level der Quelle und werden
+       danach geprüft; das MP4 trägt die Parameter-Sets in-band
+       (avc3/hev1). Passt etwas nicht => ebenfalls klassischer Weg.
+
+13) **"single_process"** (optional, default: QSettings "encoder/single_process" = false,
+    Schalter im Encoder-Setup)  
+    => kompletter Schnitt (Keep-Bereiche, Crossfades, Overlays) in EINEM
+       ffmpeg-Aufruf per filter_complex, ohne merged.mp4 und Segment-Dateien.
+    => hat Vorrang vor "smart_render".
+
 BFRAMES=0 / CLOSED-GOP
 -----------------------
 Wir erzwingen minimal-bf / closed-gop, 
@@ -319,24 +356,21 @@ def remap_time(t, timeline_map):
     return None
 
 
-def pre_trim_input_videos(videos, keep_segments, temp_dir):
+def pre_trim_input_videos(videos, keep_segments, temp_dir, dry_run=False):
     """
     Schneidet alle relevanten Keep-Segmente aus allen Videos heraus,
     wobei die Zeitachsen über die gesamte Videoliste laufen.
     Gibt: Liste Trim-Dateien, Mapping-Table mit src_start/src_end/dst_start
+    dry_run=True => nichts schneiden, nur das Mapping berechnen
+    (z. B. wenn die merged-Datei aus dem Render-Cache kommt).
     """
     result_files = []
     timeline_map = []
     dst_time = 0.0
     counter = 1
 
-    # Ermittele Gesamtlänge der Videos
-    durations = []
-    for v in videos:
-        cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-               "-of", "default=noprint_wrappers=1:nokey=1", v]
-        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        durations.append(float(out.stdout.strip()))
+    # Ermittele Gesamtlänge der Videos (meist schon von der Timeline bekannt)
+    durations = [media_duration(v) for v in videos]
 
     video_ranges = []  # Liste: (video_index, start_time_in_video, abs_time_start)
     current_abs = 0.0
@@ -371,9 +405,10 @@ def pre_trim_input_videos(videos, keep_segments, temp_dir):
                 "-map", "0:v:0", "-c", "copy",
                 outname
             ]
-            print("PRE-TRIM:", " ".join(cmd))
-            #subprocess.run(cmd, check=True)
-            run_command_gui(cmd, log_func=print)  # oder deine GUI-Logfunktion
+            if not dry_run:
+                print("PRE-TRIM:", " ".join(cmd))
+                #subprocess.run(cmd, check=True)
+                run_command_gui(cmd, log_func=print, total_duration=duration)  # oder deine GUI-Logfunktion
 
             result_files.append(outname)
             timeline_map.append({
@@ -387,12 +422,25 @@ def pre_trim_input_videos(videos, keep_segments, temp_dir):
     return result_files, timeline_map
     
     
-def run_command_gui(cmd, log_func=print):
+def run_command_gui(cmd, log_func=print, total_duration=None):
     """
     Führt einen externen Befehl aus und streamt stdout + stderr live in die GUI (z. B. QTextEdit).
+    ffmpeg läuft über core.ffmpeg_runner (-progress pipe:1 -nostats): statt einer
+    Statuszeile pro Frame kommt höchstens alle 2 s eine [PROGRESS]-Zeile
+    (mit ETA, wenn total_duration = Länge der Ausgabe bekannt ist).
     """
     log_func(f"[CMD] {' '.join(cmd)}")
 
+    if os.path.splitext(os.path.basename(cmd[0]))[0].lower() == "ffmpeg":
+        run_ffmpeg(
+            cmd,
+            log_func=log_func,
+            progress_func=lambda p: log_func(f"[PROGRESS] {p.format()}"),
+            total_duration=total_duration,
+            progress_interval=2.0
+        )
+        return
+
     process = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
@@ -495,22 +543,31 @@ def map_preset_for_gpu(user_preset, hw_encode):
     return user_preset
     
     
-def get_kf_le_with_margin(kf_list, time, margin):
+def _require_kf_index(kf_index):
     """
-    Sucht in kf_list das Keyframe, das <= (time - margin) liegt.
+    Die get_kf_*-Abfragen nehmen nur einen fertigen KeyframeIndex: eine
+    Liste würde bei jeder Abfrage neu sortiert (O(n log n) statt bisect).
+    Den Index einmal mit keyframe_index() bauen und weiterreichen.
+    """
+    if not isinstance(kf_index, KeyframeIndex):
+        raise TypeError(
+            f"KeyframeIndex erwartet, nicht {type(kf_index).__name__} "
+            "(einmal keyframe_index(kf_list) bauen und weiterreichen)"
+        )
+    return kf_index
+
+
+def get_kf_le_with_margin(kf_index, time, margin):
+    """
+    Sucht in kf_index (KeyframeIndex) das Keyframe, das <= (time - margin) liegt.
     Liegt (time - margin) < 0, dann wird 0 genommen.
     Gibt das 'größte' Keyframe zurück, das immer noch <= diesem Wert ist.
     """
+    index = _require_kf_index(kf_index)
     target = time - margin
     if target < 0:
         target = 0
-    best = kf_list[0]
-    for k in kf_list:
-        if k <= target:
-            best = k
-        else:
-            break
-    return best
+    return index.floor(target, index[0])
     
 
 ###############################################################################
@@ -581,7 +638,8 @@ def encode_closedgop(
     crf=None,       # read from config; no default 12
     width=None,
     preset=None,
-    bitrate_mbps=None
+    bitrate_mbps=None,
+    total_duration=None
 ):
     enc_name, mode = determine_encoder(encoder, hw_encode)
     real_preset = preset
@@ -640,7 +698,7 @@ def encode_closedgop(
     cmd+= [outname]
     print("ENCODE_CLOSEDGOP:", " ".join(cmd))
     #subprocess.run(cmd, check=True)
-    run_command_gui(cmd, log_func=print)  # oder deine GUI-Logfunktion
+    run_command_gui(cmd, log_func=print, total_duration=total_duration)  # oder deine GUI-Logfunktion
     
 
 ###############################################################################
@@ -650,71 +708,63 @@ def encode_closedgop(
 import re
 
 def get_keyframes(src):
+    # MP4/MOV: direkt aus stss/stts, ffprobe nur als Fallback
+    times = read_mp4_keyframes(src)
+    if times is not None:
+        print(f"Total Keyframes found: {len(times)} (MP4 index)\n")
+        return times
+
     print(f"\nIndexing Keyframes in [may take a while - stay tuned ] {src} ...")
-    pattern= re.compile(r'"best_effort_timestamp_time"\s*:\s*"')
+    # CSV => eine Zeit pro Zeile, wird direkt beim Lesen geparst
+    # (kein komplettes JSON mehr im Speicher)
     cmd=[
-        "ffprobe","-hide_banner",
+        "ffprobe","-hide_banner","-v","error",
         "-select_streams","v:0",
         "-skip_frame","nokey",
         "-show_frames",
         "-show_entries","frame=best_effort_timestamp_time",
-        "-print_format","json",
+        "-of","csv=p=0",
         "-i", src
     ]
     p= subprocess.Popen(cmd,stdout=subprocess.PIPE,stderr=subprocess.PIPE,text=True)
-    lines=[]
-    count=0
-    spinner = ['|', '/', '-', '\\']
-    while True:
-        line= p.stdout.readline()
-        if not line: break
-        lines.append(line)
-        if pattern.search(line):
-            count+=1
-            m = re.search(r'"best_effort_timestamp_time"\s*:\s*"([^"]+)"', line)
-            t_str = m.group(1) if m else "?"
-            
-            if count % 50 == 0:
-                print(f"\rKeyframes found: {count} => Time: {t_str}", end='', flush=True)
-            
+    times=[]
+    for line in p.stdout:
+        t_str = line.strip().split(",", 1)[0]
+        try:
+            times.append(float(t_str))
+        except ValueError:
+            continue  # N/A
+        if len(times) % 50 == 0:
+            print(f"\rKeyframes found: {len(times)} => Time: {t_str}", end='', flush=True)
+
+    err = p.stderr.read()
     p.wait()
     print()
-    data= json.loads("".join(lines))
-    frames_data= data.get("frames",[])
-    times=[]
-    for fr in frames_data:
-        t= float(fr.get("best_effort_timestamp_time","0"))
-        times.append(t)
+    if p.returncode != 0:
+        raise subprocess.CalledProcessError(p.returncode, cmd, stderr=err)
     times.sort()
     print(f"Total Keyframes found: {len(times)}\n")
     
     #for i, t in enumerate(times, start=1):
     #    print(f" - Keyframe {i} bei {t:.3f}s")
     return times        
-def get_kf_le(kf_list,t):
-    if not kf_list:
+def get_kf_le(kf_index,t):
+    index = _require_kf_index(kf_index)
+    if not index:
         return 0.0
-    best=kf_list[0]
-    for k in kf_list:
-        if k<=t:
-            best=k
-        else:
-            break
-    return best
+    return index.floor(t, index[0])
 
-def get_kf_ge(kf_list,t):
-    if not kf_list:
+def get_kf_ge(kf_index,t):
+    index = _require_kf_index(kf_index)
+    if not index:
         return t
-    for k in kf_list:
-        if k>=t:
-            return k
-    return kf_list[-1]
+    return index.ceil(t, index[-1])
 
 ###############################################################################
 # 9) COPY_CUT / CROSSFADE
 ###############################################################################
 
-def copy_cut(src,start,end,outfile):
+def copy_cut(src,start,end,outfile,log_func=print):
     dur= end-start
     if dur<=0:
         raise ValueError("invalid cut dur => start={start},end={end}")
@@ -727,9 +777,9 @@ def copy_cut(src,start,end,outfile):
         "-c","copy",
         outfile
     ]
-    print("COPY_CUT:", " ".join(cmd))
+    log_func(f"COPY_CUT: {' '.join(cmd)}")
     #subprocess.run(cmd,check=True)
-    run_command_gui(cmd, log_func=print)
+    run_command_gui(cmd, log_func=log_func, total_duration=dur)
     
 def crossfade_2(
     inA,inB,outname,
@@ -738,7 +788,8 @@ def crossfade_2(
     crf=23,
     fps=None,width=None,preset=None,
     overlap=2,
-    bitrate_mbps=None
+    bitrate_mbps=None,
+    log_func=print
 ):
     enc_name, mode= determine_encoder(encoder,hw_encode)
     real_preset= preset
@@ -773,7 +824,7 @@ def crossfade_2(
         if bitrate_mbps:
             br = f"{bitrate_mbps}M"
             cmd += ["-b:v", br, "-maxrate", br, "-bufsize", f"{bitrate_mbps * 2}M"]
-        print(f"[DEBUG] CROSSFADE => CPU => CRF={crf}")
+        log_func(f"[DEBUG] CROSSFADE => CPU => CRF={crf}")
     else:
         # GPU => pseudo CRF => vbr_hq -cq crf
         qv= clamp_crf(crf)
@@ -785,19 +836,21 @@ def crossfade_2(
         if bitrate_mbps:
             br = f"{bitrate_mbps}M"
             cmd += ["-b:v", br, "-maxrate", br, "-bufsize", f"{bitrate_mbps * 2}M"]
-        print(f"[DEBUG] CROSSFADE => GPU => -cq={qv}")
+        log_func(f"[DEBUG] CROSSFADE => GPU => -cq={qv}")
 
     if fps:
         cmd+=["-r",str(fps)]
     cmd+=["-pix_fmt","yuv420p","-an", outname]
-    print("CROSSFADE_2:", " ".join(cmd))
+    log_func(f"CROSSFADE_2: {' '.join(cmd)}")
     #subprocess.run(cmd,check=True)
-    run_command_gui(cmd, log_func=print)
+    run_command_gui(cmd, log_func=log_func)
 ###############################################################################
 # 10) FINAL CONCAT
 ###############################################################################
 
-def final_concat_copy(parts,outfile):
+def final_concat_copy(parts,outfile,tag=None):
+    # tag: z.B. "avc3"/"hev1" => SPS/PPS bleiben in-band (Smart-Render:
+    # kopierte und neu encodete Teile haben unterschiedliche Parameter-Sets)
     tmp_list= os.path.splitext(outfile)[0]+"_concat.txt"
     with open(tmp_list,"w",encoding="utf-8") as f:
         for p in parts:
@@ -809,9 +862,11 @@ def final_concat_copy(parts,outfile):
         "-f","concat","-safe","0",
         "-i", tmp_list,
         "-map","0:v:0",
-        "-c","copy",
-        outfile
+        "-c","copy"
     ]
+    if tag:
+        cmd+=["-tag:v",tag]
+    cmd+=[outfile]
     print("FINAL CONCAT COPY:", " ".join(cmd))
     #subprocess.run(cmd,check=True)
     run_command_gui(cmd, log_func=print)
@@ -837,21 +892,15 @@ def overlay_segment_encode(
     seg_duration=None,scale=1.0,x=0,y=0,
     encoder="libx265",hw_encode=None,crf=23,
     fps=None,preset=None,width=None,
-    bitrate_mbps=None
+    bitrate_mbps=None,
+    log_func=print
 ):
     # => real alpha fade => RGBA => fade in/out => scale => overlay
     # => same idea as we had:
     #   fade_in => 0..fade_in => alpha=0..1
     #   fade_out => (dur-fade_out)..dur => alpha=1..0
     if seg_duration is None:
-        cmd_dur=[
-            "ffprobe","-v","error",
-            "-show_entries","format=duration",
-            "-of","default=noprint_wrappers=1:nokey=1",
-            in_segment
-        ]
-        rr=subprocess.run(cmd_dur,capture_output=True,text=True,check=True)
-        seg_duration= float(rr.stdout.strip())
+        seg_duration= media_duration(in_segment)
 
     fade_out_start= seg_duration - fade_out
     if fade_out_start<0:
@@ -905,7 +954,7 @@ def overlay_segment_encode(
         if bitrate_mbps:
             br = f"{bitrate_mbps}M"
             cmd += ["-b:v", br, "-maxrate", br, "-bufsize", f"{bitrate_mbps * 2}M"]
-        print(f"[DEBUG] overlay => CPU => CRF={crf}")
+        log_func(f"[DEBUG] overlay => CPU => CRF={crf}")
     else:
         # GPU => pseudo CRF => vbr_hq -cq
         qv= clamp_crf(crf)
@@ -917,14 +966,161 @@ def overlay_segment_encode(
         if bitrate_mbps:
             br = f"{bitrate_mbps}M"
             cmd += ["-b:v", br, "-maxrate", br, "-bufsize", f"{bitrate_mbps * 2}M"]
-        print(f"[DEBUG] overlay => GPU => -cq={qv}")
+        log_func(f"[DEBUG] overlay => GPU => -cq={qv}")
 
     if fps:
         cmd+=["-r",str(fps)]
     cmd+=["-pix_fmt","yuv420p","-an", out_segment]
 
-    print("OVERLAY_SEGMENT_ENCODE:", " ".join(cmd))
-    subprocess.run(cmd,check=True)
+    log_func(f"OVERLAY_SEGMENT_ENCODE: {' '.join(cmd)}")
+    run_command_gui(cmd, log_func=log_func, total_duration=seg_duration)
+
+###############################################################################
+# 11b) SEGMENT-JOBS => parallel ausführen
+###############################################################################
+
+class _SegmentJob:
+    """Ein ffmpeg-Schritt im Render-Plan (copy_cut, crossfade_2, overlay...)."""
+    def __init__(self, name, func, kwargs, deps=(), encode=False, on_done=None):
+        self.name = name          # = Dateiname der Ausgabe, eindeutig
+        self.func = func
+        self.kwargs = kwargs
+        self.deps = list(deps)    # Namen der Jobs, die vorher fertig sein müssen
+        self.encode = encode      # True => zählt gegen das Encoder-Limit
+        self.on_done = on_done    # z. B. Render-Cache: Temp-Datei übernehmen
+
+    def run(self, log_func=print):
+        self.func(**self.kwargs, log_func=log_func)
+        if self.on_done is not None:
+            self.on_done()
+
+
+def _cached_output(render_cache, key, temp_path):
+    """
+    Ausgabe eines fertigen Segments mit Cache-Schlüssel key.
+    Rückgabe (job_out, part_path, on_done):
+      - ohne Cache        => (temp_path, temp_path, None)
+      - Cache-Treffer     => (None, cache_datei, None) => kein Job nötig
+      - noch nicht im Cache => Job schreibt nach job_out, on_done übernimmt
+    """
+    if render_cache is None:
+        return temp_path, temp_path, None
+    ext = os.path.splitext(temp_path)[1]
+    hit = render_cache.lookup(key, ext)
+    if hit:
+        return None, hit, None
+    return render_cache.reserve(key, ext)
+
+
+class _JobLog:
+    """
+    Log-Ausgaben der Worker-Threads von run_segment_jobs.
+    Jeder Job bekommt per for_job() eine eigene log_func, die Zeilen (mit
+    Job-Präfix) in eine Queue legt; der aufrufende Thread gibt sie per
+    drain() über seine log_func aus. So fasst nur der GUI-Thread das
+    Textfeld an, und sys.stdout bleibt unangetastet.
+    """
+    def __init__(self, target):
+        self._target = target
+        self._lines = queue.Queue()
+
+    def for_job(self, name):
+        def log(*args):
+            text = " ".join(str(a) for a in args)
+            for line in text.split("\n"):
+                self._lines.put(f"[{name}] {line}")
+        return log
+
+    def drain(self):
+        while True:
+            try:
+                line = self._lines.get_nowait()
+            except queue.Empty:
+                return
+            self._target(line)
+
+
+def run_segment_jobs(jobs, max_encodes=1, max_copies=1, poll_s=0.1, log_func=print):
+    """
+    Führt die geplanten _SegmentJobs auf einem begrenzten Thread-Pool aus
+    (die eigentliche Arbeit machen die ffmpeg-Prozesse).
+    Ein Job startet erst, wenn alle deps fertig sind; Encodes laufen höchstens
+    max_encodes gleichzeitig, insgesamt höchstens max(max_copies, max_encodes).
+    Schlägt ein Job fehl, werden keine neuen mehr gestartet und der erste
+    Fehler wird nach dem Ende der laufenden Jobs weitergereicht.
+    Ausgaben der Jobs landen (im aufrufenden Thread) bei log_func.
+    """
+    workers = max(1, max_copies, max_encodes)
+    pending = list(jobs)
+    running = {}
+    done = set()
+    n_encodes = 0
+    error = None
+    print(f"[INFO] Render-Jobs: {len(jobs)}, parallel: {workers} (Encodes: {max_encodes})")
+
+    job_log = _JobLog(log_func)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            if error is None:
+                for job in list(pending):
+                    if len(running) >= workers:
+                        break
+                    if job.encode and n_encodes >= max_encodes:
+                        continue
+                    if not all(d in done for d in job.deps):
+                        continue
+                    pending.remove(job)
+                    running[pool.submit(job.run, job_log.for_job(job.name))] = job
+                    if job.encode:
+                        n_encodes += 1
+            else:
+                pending = []
+
+            if not running:
+                if pending:
+                    error = RuntimeError(
+                        "Render-Plan: unerfüllbare Abhängigkeiten: "
+                        + ", ".join(j.name for j in pending)
+                    )
+                break
+
+            finished, _ = wait(running, timeout=poll_s, return_when=FIRST_COMPLETED)
+            job_log.drain()
+            for fut in finished:
+                job = running.pop(fut)
+                if job.encode:
+                    n_encodes -= 1
+                exc = fut.exception()
+                if exc is not None:
+                    print(f"[ERROR] Job {job.name} fehlgeschlagen: {exc}")
+                    if error is None:
+                        error = exc
+                else:
+                    done.add(job.name)
+                    print(f"[INFO] Job fertig: {job.name} ({len(done)}/{len(jobs)})")
+        job_log.drain()
+
+    if error is not None:
+        raise error
+
+def _overlay_cache_params(ev, t0=0.0):
+    """Overlay-Parameter für den Cache-Schlüssel (Bild per Fingerprint, Zeiten relativ zu t0)."""
+    img = ev["image"]
+    try:
+        img_id = file_fingerprint(img)
+    except OSError:
+        img_id = img
+    return {
+        "type":     "overlay",
+        "start":    ev["start"] - t0,
+        "end":      ev["end"] - t0,
+        "fade_in":  ev["fade_in"],
+        "fade_out": ev["fade_out"],
+        "scale":    ev["scale"],
+        "x":        ev["x"],
+        "y":        ev["y"],
+        "image":    img_id,
+    }
 
 ###############################################################################
 # 12) Build skip/overlay events
@@ -933,12 +1129,31 @@ def build_segments_with_skip_and_overlay(
     merged_file, kf_list, total_duration,
     skip_instructions, overlay_instructions,
     encoder="libx265", hw_encode=None, crf=23, fps=None, width=None, preset=None,
-    temp_dir=None, bitrate_mbps=None
+    temp_dir=None, bitrate_mbps=None, render_cache=None, source_key=None
 ):
     """
     Erzeugt Segmente (normal/skip/overlay) streng aufsteigend entlang der Timeline,
     damit es keine Überschneidungen oder rückwärtslaufende Schnitte gibt.
+
+    Zuerst wird der komplette Render-Plan (Jobs + Abhängigkeiten) erstellt,
+    danach laufen die Jobs parallel (run_segment_jobs). Die Rückgabe ist erst
+    fertig, wenn alle Teile geschrieben sind => final_concat_copy kann direkt folgen.
+
+    Mit render_cache (core.render_cache.RenderCache) werden fertige Segmente
+    über ihre Eingaben wiedererkannt und nicht neu erzeugt. source_key ist
+    der Cache-Schlüssel der merged-Datei (stabil, anders als ihr Fingerprint,
+    falls die Datei neu geschrieben wird); ohne ihn zählt der Fingerprint.
     """
+    # Einmal sortieren, danach nur noch bisect-Abfragen
+    kf_list = keyframe_index(kf_list)
+
+    src_fp = None
+    if render_cache is not None:
+        src_fp = source_key or file_fingerprint(merged_file)
+    enc_settings = [encoder, hw_encode, crf, fps, width, preset, bitrate_mbps]
+
+    def _key(*parts):
+        return render_key("merged", src_fp, *parts)
 
     # 1) Events aus JSON sammeln
     events = []
@@ -966,6 +1181,7 @@ def build_segments_with_skip_and_overlay(
 
     
     segments = []
+    jobs = []
     out_count = 1
     current_pos = 0.0
 
@@ -988,8 +1204,15 @@ def build_segments_with_skip_and_overlay(
                 part_out = os.path.join(
                     temp_dir, f"part_{out_count:02d}_{int(seg_start)}_{int(seg_end)}.mp4"
                 )
-                copy_cut(merged_file, seg_start, seg_end, part_out)
-                segments.append(part_out)
+                job_out, part_path, on_done = _cached_output(
+                    render_cache, _key("copy", seg_start, seg_end), part_out)
+                if job_out:
+                    jobs.append(_SegmentJob(
+                        os.path.basename(part_out), copy_cut,
+                        dict(src=merged_file, start=seg_start, end=seg_end, outfile=job_out),
+                        on_done=on_done
+                    ))
+                segments.append(part_path)
                 debug_logs.append(
                     f"[NORMAL] JSON-Range: {current_pos:.2f}..{t1:.2f} "
                     f"=> Keyframes: {seg_start:.2f}..{seg_end:.2f}"
@@ -1018,7 +1241,6 @@ def build_segments_with_skip_and_overlay(
                 A_end = A_start
 
             skipA = os.path.join(temp_dir, f"skipA_{out_count:02d}.mp4")
-            copy_cut(merged_file, A_start, A_end, skipA)
 
             #B_start = get_kf_ge(kf_list, t2)
             B_start = get_kf_ge(kf_list, min(t2, total_duration))
@@ -1031,7 +1253,15 @@ def build_segments_with_skip_and_overlay(
                 debug_logs.append(
                     f"[SKIP] B-Segment entfällt (Start={B_start:.2f} >= End={B_end:.2f}). Nur A-Segment wird benutzt."
                 )
-                segments.append(skipA)
+                job_out, part_path, on_done = _cached_output(
+                    render_cache, _key("copy", A_start, A_end), skipA)
+                if job_out:
+                    jobs.append(_SegmentJob(
+                        os.path.basename(skipA), copy_cut,
+                        dict(src=merged_file, start=A_start, end=A_end, outfile=job_out),
+                        on_done=on_done
+                    ))
+                segments.append(part_path)
                 current_pos = max(current_pos, t2 + overlap)
                 out_count += 1
                 continue
@@ -1040,18 +1270,37 @@ def build_segments_with_skip_and_overlay(
             #    B_end = B_start
 
             skipB = os.path.join(temp_dir, f"skipB_{out_count:02d}.mp4")
-            copy_cut(merged_file, B_start, B_end, skipB)
 
-            # Crossfade beider Segmente:
+            # Crossfade beider Segmente (A/B werden nur bei Cache-Fehlschlag geschnitten):
             xf_out = os.path.join(temp_dir, f"skipX_{out_count:02d}_{int(t1)}_{int(t2)}.mp4")
-            crossfade_2(
-                inA=skipA, inB=skipB, outname=xf_out,
-                encoder=encoder, hw_encode=hw_encode, crf=crf,
-                fps=fps, width=width, preset=preset,
-                overlap=overlap,
-                bitrate_mbps=bitrate_mbps
+            job_out, part_path, on_done = _cached_output(
+                render_cache,
+                _key("xfade", A_start, A_end, B_start, B_end, overlap, enc_settings),
+                xf_out
             )
-            segments.append(xf_out)
+            if job_out:
+                jobs.append(_SegmentJob(
+                    os.path.basename(skipA), copy_cut,
+                    dict(src=merged_file, start=A_start, end=A_end, outfile=skipA)
+                ))
+                jobs.append(_SegmentJob(
+                    os.path.basename(skipB), copy_cut,
+                    dict(src=merged_file, start=B_start, end=B_end, outfile=skipB)
+                ))
+                jobs.append(_SegmentJob(
+                    os.path.basename(xf_out), crossfade_2,
+                    dict(
+                        inA=skipA, inB=skipB, outname=job_out,
+                        encoder=encoder, hw_encode=hw_encode, crf=crf,
+                        fps=fps, width=width, preset=preset,
+                        overlap=overlap,
+                        bitrate_mbps=bitrate_mbps
+                    ),
+                    deps=(os.path.basename(skipA), os.path.basename(skipB)),
+                    encode=True,
+                    on_done=on_done
+                ))
+            segments.append(part_path)
 
             debug_logs.append(
                 f"[SKIP] JSON-Bereich: {t1:.2f}..{t2:.2f}, overlap={overlap:.1f} "
@@ -1077,19 +1326,33 @@ def build_segments_with_skip_and_overlay(
                 ov_end = ov_start
 
             in_cut = os.path.join(temp_dir, f"ov_in_{out_count:02d}_{int(t1)}.mp4")
-            copy_cut(merged_file, ov_start, ov_end, in_cut)
-
             out_cut = os.path.join(temp_dir, f"ov_out_{out_count:02d}_{int(t1)}_{int(t2)}.mp4")
             seg_dur = ov_end - ov_start
-            overlay_segment_encode(
-                in_segment=in_cut, out_segment=out_cut,
-                overlay_image=ov_img, fade_in=fade_in, fade_out=fade_out,
-                seg_duration=seg_dur, scale=sc, x=xx, y=yy,
-                encoder=encoder, hw_encode=hw_encode, crf=crf,
-                fps=fps, preset=preset, width=None,
-                bitrate_mbps=bitrate_mbps
+            job_out, part_path, on_done = _cached_output(
+                render_cache,
+                _key("overlay", ov_start, ov_end, _overlay_cache_params(ev, ov_start), enc_settings),
+                out_cut
             )
-            segments.append(out_cut)
+            if job_out:
+                jobs.append(_SegmentJob(
+                    os.path.basename(in_cut), copy_cut,
+                    dict(src=merged_file, start=ov_start, end=ov_end, outfile=in_cut)
+                ))
+                jobs.append(_SegmentJob(
+                    os.path.basename(out_cut), overlay_segment_encode,
+                    dict(
+                        in_segment=in_cut, out_segment=job_out,
+                        overlay_image=ov_img, fade_in=fade_in, fade_out=fade_out,
+                        seg_duration=seg_dur, scale=sc, x=xx, y=yy,
+                        encoder=encoder, hw_encode=hw_encode, crf=crf,
+                        fps=fps, preset=preset, width=None,
+                        bitrate_mbps=bitrate_mbps
+                    ),
+                    deps=(os.path.basename(in_cut),),
+                    encode=True,
+                    on_done=on_done
+                ))
+            segments.append(part_path)
 
             debug_logs.append(
                 f"[OVERLAY] JSON-Range: {t1:.2f}..{t2:.2f} => "
@@ -1108,8 +1371,15 @@ def build_segments_with_skip_and_overlay(
             final_out = os.path.join(
                 temp_dir, f"final_{out_count:02d}_{int(seg_start)}_{int(seg_end)}.mp4"
             )
-            copy_cut(merged_file, seg_start, seg_end, final_out)
-            segments.append(final_out)
+            job_out, part_path, on_done = _cached_output(
+                render_cache, _key("copy", seg_start, seg_end), final_out)
+            if job_out:
+                jobs.append(_SegmentJob(
+                    os.path.basename(final_out), copy_cut,
+                    dict(src=merged_file, start=seg_start, end=seg_end, outfile=job_out),
+                    on_done=on_done
+                ))
+            segments.append(part_path)
             debug_logs.append(
                 f"[END] JSON-Range: {current_pos:.2f}..{total_duration:.2f} => "
                 f"{seg_start:.2f}..{seg_end:.2f}"
@@ -1120,12 +1390,640 @@ def build_segments_with_skip_and_overlay(
     for line in debug_logs:
         print(line)
     print("=================================================\n")
+    if render_cache is not None:
+        print(f"[INFO] Render-Cache: {len(segments) - len([j for j in jobs if j.on_done])} "
+              f"von {len(segments)} Segmenten wiederverwendet")
+
+    # ============= Render-Plan ausführen =============
+    run_segment_jobs(
+        jobs,
+        max_encodes=max_parallel_encodes(hw_encode),
+        max_copies=max_parallel_copies()
+    )
 
     return segments
     
     
 
 
+###############################################################################
+# 12b) SMART RENDER => nur GOPs an Übergängen neu encoden
+###############################################################################
+#
+# Statt alles per encode_closedgop neu zu encoden, werden die Originale
+# direkt zerlegt:
+#   - zwischen den Edits (Crossfade, Overlay, Trim-Grenzen) => Stream-Copy
+#     von Keyframe zu Keyframe
+#   - jede Edit-Stelle => nur die GOPs von Keyframe vor bis Keyframe nach
+#     dem Edit werden neu encodet (inkl. xfade/Overlay)
+# Die Teile werden als MPEG-TS geschrieben (Parameter-Sets in-band) und am
+# Ende wie gewohnt per final_concat_copy zusammengefügt.
+#
+# Voraussetzung: alle Quellen haben denselben Codec/Profil/Level/Auflösung/
+# FPS/yuv420p, und Export-Codec, -Breite und -FPS passen dazu. Die neu
+# encodeten Teile bekommen Profil/Level der Quelle und werden danach per
+# ffprobe geprüft, ebenso das fertige MP4 (avc3/hev1, SPS/PPS in-band). Sonst
+# _SmartRenderUnsupported => xfade_main nimmt den klassischen Weg.
+
+class _SmartRenderUnsupported(Exception):
+    """Smart-Render nicht möglich => klassischer Weg über encode_closedgop."""
+
+
+_CODEC_FAMILY = {
+    "libx264": "h264", "h264_nvenc": "h264", "h264_amf": "h264", "h264_qsv": "h264",
+    "libx265": "hevc", "hevc_nvenc": "hevc", "hevc_amf": "hevc", "hevc_qsv": "hevc",
+}
+
+# ffprobe-Profil der Quelle => -profile:v für die neu encodeten Teile
+# (nur 8 bit 4:2:0, siehe Pixelformat-Prüfung)
+_SMART_PROFILES = {
+    "h264": {"High": "high", "Main": "main",
+             "Constrained Baseline": "baseline", "Baseline": "baseline"},
+    "hevc": {"Main": "main"},
+}
+
+# MP4-Tags mit Parameter-Sets in-band (jeder Teil darf eigene SPS/PPS haben)
+_INBAND_TAG = {"h264": "avc3", "hevc": "hev1"}
+
+
+def _level_str(codec, level):
+    """ffprobe-Level (h264: 41, hevc: 153) => '4.1' bzw. '5.1'."""
+    return f"{level / (30.0 if codec == 'hevc' else 10.0):.1f}"
+
+
+def probe_video_stream(path):
+    """Codec, Größe, Pixelformat, Framerate und Dauer des ersten Videostreams."""
+    info = probe_media(path)
+    if info["video"] is None:
+        raise _SmartRenderUnsupported(f"kein Videostream in {path}")
+    return dict(info["video"], duration=info["duration"])
+
+
+def _check_smart_render_sources(infos, encoder, hw_encode, fps, width):
+    enc_name, _ = determine_encoder(encoder, hw_encode)
+    first = infos[0]
+    for info in infos[1:]:
+        for key in ("codec", "profile", "level", "width", "height", "pix_fmt", "rate"):
+            if info[key] != first[key]:
+                raise _SmartRenderUnsupported(f"Quellvideos unterscheiden sich ({key})")
+    if _CODEC_FAMILY.get(enc_name) != first["codec"]:
+        raise _SmartRenderUnsupported(f"Quell-Codec {first['codec']} != Export-Encoder {enc_name}")
+    if first["pix_fmt"] != "yuv420p":
+        raise _SmartRenderUnsupported(f"Pixelformat {first['pix_fmt']} (nur yuv420p)")
+    if first["profile"] not in _SMART_PROFILES.get(first["codec"], {}):
+        raise _SmartRenderUnsupported(f"Profil {first['profile']} wird nicht unterstützt")
+    if not first["level"] or first["level"] <= 0:
+        raise _SmartRenderUnsupported("Level der Quelle unbekannt")
+    if width and int(width) != first["width"]:
+        raise _SmartRenderUnsupported(f"Export-Breite {width} != Quelle {first['width']}")
+    if fps and abs(float(fps) - first["fps"]) > 0.01:
+        raise _SmartRenderUnsupported(f"Export-FPS {fps} != Quelle {first['fps']:.3f}")
+    if first["fps"] <= 0:
+        raise _SmartRenderUnsupported("Framerate der Quelle unbekannt")
+
+
+def _source_keyframes(path):
+    times = load_cached_keyframes(path)
+    if times is None:
+        times = get_keyframes(path)
+        store_keyframes(path, times)
+    return times
+
+
+class _SourceTimeline:
+    """Globale Zeitachse über alle Quellvideos (wie in pre_trim_input_videos)."""
+    def __init__(self, videos, durations):
+        self.videos = list(videos)
+        self.durations = list(durations)
+        self.offsets = []
+        pos = 0.0
+        for d in self.durations:
+            self.offsets.append(pos)
+            pos += d
+        self.total = pos
+
+    def chunks(self, g0, g1):
+        """[g0..g1] global => Liste (pfad, lokaler_start, lokales_ende) je Video."""
+        out = []
+        for path, off, dur in zip(self.videos, self.offsets, self.durations):
+            a = max(g0, off)
+            b = min(g1, off + dur)
+            if b > a:
+                out.append((path, a - off, b - off))
+        return out
+
+
+def _plan_passthrough(pieces, kfs, a, b, eps):
+    """[a..b] ohne Edit: Copy von Keyframe zu Keyframe, Ränder ggf. encoden."""
+    if b - a <= eps:
+        return
+    k0 = kfs.ceil(a - eps)
+    k1 = kfs.floor(b + eps)
+    if k0 is None or k1 is None or k1 - k0 <= eps:
+        pieces.append(("encode", a, b, None))
+        return
+    if k0 - a > eps:
+        pieces.append(("encode", a, k0, None))
+    pieces.append(("copy", k0, k1, None))
+    if b - k1 > eps:
+        pieces.append(("encode", k1, b, None))
+
+
+def plan_smart_render(kfs, keep_segments, skip_instructions, overlay_instructions, eps):
+    """
+    Zerlegt die behaltenen Bereiche in Copy- und Encode-Stücke (globale Zeit).
+    Rückgabe: Liste (art, g0, g1, edit) mit art "copy"/"encode",
+    edit = None (nur neu encoden) oder das Skip-/Overlay-Event.
+    """
+    edits = []
+    for s, e, val in skip_instructions:
+        if val in (-1, -2):
+            continue  # Trims stecken schon in keep_segments
+        s, e, ov = float(s), float(e), float(val)
+        edits.append({"type": "skip", "start": s, "end": e, "overlap": ov,
+                      "a": s, "b": e + ov})
+    for ov in overlay_instructions:
+        s, e = float(ov["start"]), float(ov["end"])
+        if e <= s:
+            continue
+        edits.append({
+            "type":     "overlay",
+            "start":    s,
+            "end":      e,
+            "fade_in":  float(ov.get("fade_in", 1.0)),
+            "fade_out": float(ov.get("fade_out", 1.0)),
+            "image":    ov["image"],
+            "scale":    float(ov.get("scale", 1.0)),
+            "x":        ov.get("x", 0),
+            "y":        ov.get("y", 0),
+            "a": s, "b": e,
+        })
+    edits.sort(key=lambda ed: ed["a"])
+
+    pieces = []
+    for ks, ke in keep_segments:
+        pos = ks
+        for ed in edits:
+            if ed["b"] <= ks or ed["a"] >= ke:
+                continue
+            if ed["a"] < ks or ed["b"] > ke:
+                raise _SmartRenderUnsupported(
+                    f"Edit {ed['a']:.2f}..{ed['b']:.2f} überschneidet eine Trim-Grenze")
+            if ed["a"] < pos - eps:
+                raise _SmartRenderUnsupported(
+                    f"Edits bei {ed['a']:.2f}s liegen zu dicht beieinander (gleiche GOP)")
+            g0 = max(kfs.floor(ed["a"] + eps, ks), pos)
+            g1 = min(kfs.ceil(ed["b"] - eps, ke), ke)
+            _plan_passthrough(pieces, kfs, pos, g0, eps)
+            pieces.append(("encode", g0, g1, ed))
+            pos = g1
+        _plan_passthrough(pieces, kfs, pos, ke, eps)
+    return pieces
+
+
+def _encoder_args(encoder, hw_encode, crf, preset, bitrate_mbps, label, closed_gop=True,
+                  log_func=print, profile=None, level=None):
+    enc_name, mode = determine_encoder(encoder, hw_encode)
+    if mode == "cpu":
+        args = ["-c:v", enc_name, "-crf", str(crf)]
+        if preset:
+            args += ["-preset", preset]
+        if closed_gop:
+            args += get_cpu_closedgop_params(enc_name)
+        log_func(f"[DEBUG] {label} => CPU => CRF={crf}")
+    else:
+        qv = clamp_crf(crf)
+        args = ["-c:v", enc_name, "-rc", "vbr_hq", "-cq", str(qv)]
+        real_preset = map_preset_for_gpu(preset, hw_encode)
+        if real_preset:
+            args += ["-preset", real_preset]
+        if closed_gop:
+            args += get_gpu_closedgop_params(hw_encode)
+        log_func(f"[DEBUG] {label} => GPU => -cq={qv}")
+    if bitrate_mbps:
+        br = f"{bitrate_mbps}M"
+        args += ["-b:v", br, "-maxrate", br, "-bufsize", f"{bitrate_mbps * 2}M"]
+    if profile:
+        args += ["-profile:v", profile]
+    if level:
+        if enc_name == "libx265":
+            # libx265 kennt kein -level => über die x265-params
+            if "-x265-params" in args:
+                i = args.index("-x265-params") + 1
+                args[i] += f":level-idc={level}"
+            else:
+                args += ["-x265-params", f"level-idc={level}"]
+        elif not enc_name.endswith("_qsv"):
+            # QSV will Zahlen statt Namen => Encoder-Default, die Prüfung
+            # der fertigen Teile fängt Abweichungen ab
+            args += ["-level:v", level]
+    return args
+
+
+def smart_copy_part(src, start, end, outfile, frame_dur, log_func=print):
+    """
+    Stream-Copy [start..end) zwischen zwei Keyframes nach MPEG-TS.
+    -ss minimal hinter den Keyframe, damit Rundung nicht die GOP davor
+    erwischt; -t endet vor dem Keyframe bei end (gehört zum nächsten Teil).
+    """
+    ss = start + 0.001
+    dur = end - ss - 0.25 * frame_dur
+    if dur <= 0:
+        raise ValueError(f"invalid smart copy => start={start},end={end}")
+    cmd = [
+        "ffmpeg", "-hide_banner", "-y",
+        "-ss", f"{ss:.6f}",
+        "-i", src,
+        "-t", f"{dur:.6f}",
+        "-map", "0:v:0", "-c", "copy",
+        "-f", "mpegts", outfile
+    ]
+    log_func(f"SMART_COPY: {' '.join(cmd)}")
+    run_command_gui(cmd, log_func=log_func, total_duration=dur)
+
+
+def _range_inputs(chunks, first_idx, label, frame_dur, fc, at_keyframe=True):
+    """
+    Eingaben für eine (evtl. mehrere Videos umfassende) Quellstrecke.
+    at_keyframe: Strecke endet am Keyframe des nächsten Teils => der Frame
+    dort wird weggelassen.
+    """
+    args = []
+    for path, ls, le in chunks:
+        tail = 0.25 * frame_dur if at_keyframe else 0.0
+        args += ["-ss", f"{ls:.6f}", "-t", f"{le - ls - tail:.6f}", "-i", path]
+    if len(chunks) == 1:
+        fc.append(f"[{first_idx}:v]format=yuv420p,settb=AVTB[{label}]")
+    else:
+        ins = "".join(f"[{first_idx + i}:v]" for i in range(len(chunks)))
+        fc.append(f"{ins}concat=n={len(chunks)}:v=1:a=0,format=yuv420p,settb=AVTB[{label}]")
+    return args
+
+
+def smart_encode_part(
+    timeline, g0, g1, edit, outfile, frame_dur,
+    encoder="libx265", hw_encode=None, crf=23, preset=None, bitrate_mbps=None,
+    log_func=print, profile=None, level=None
+):
+    """
+    Encodet [g0..g1] (global) neu. edit=None => 1:1, sonst Crossfade
+    (skip) bzw. Overlay an der richtigen Stelle innerhalb des Stücks.
+    """
+    fc = []
+    if edit is None or edit["type"] == "overlay":
+        in_args = _range_inputs(timeline.chunks(g0, g1), 0, "base", frame_dur, fc)
+        if edit is None:
+            fc.append("[base]null[vout]")
+        else:
+            n_in = len(timeline.chunks(g0, g1))
+            st = edit["start"] - g0
+            en = edit["end"] - g0
+            chain = ["format=rgba"]
+            if edit["fade_in"] > 0:
+                chain.append(f"fade=t=in:st={st:.3f}:d={edit['fade_in']:.3f}:alpha=1")
+            if edit["fade_out"] > 0:
+                fo_start = max(st, en - edit["fade_out"])
+                chain.append(f"fade=t=out:st={fo_start:.3f}:d={edit['fade_out']:.3f}:alpha=1")
+            chain.append(f"scale=iw*{edit['scale']}:ih*{edit['scale']}:force_original_aspect_ratio=decrease")
+            fc.append(f"[{n_in}:v]{','.join(chain)}[ov1]")
+            fc.append(
+                f"[base][ov1]overlay=x={edit['x']}:y={edit['y']}:format=auto"
+                f":enable='between(t,{st:.3f},{en:.3f})'[vout]"
+            )
+            in_args += _build_overlay_input_args(edit["image"])
+        label = "SMART_OVERLAY" if edit else "SMART_REENCODE"
+    else:
+        # skip => A=[g0..start+overlap], B=[end..g1], Crossfade ab start
+        ov = edit["overlap"]
+        chunks_a = timeline.chunks(g0, edit["start"] + ov)
+        chunks_b = timeline.chunks(edit["end"], g1)
+        in_args = _range_inputs(chunks_a, 0, "va", frame_dur, fc, at_keyframe=False)
+        in_args += _range_inputs(chunks_b, len(chunks_a), "vb", frame_dur, fc)
+        fc.append(
+            f"[va][vb]xfade=transition=fade:duration={ov}"
+            f":offset={edit['start'] - g0:.3f}[vout]"
+        )
+        label = "SMART_CROSSFADE"
+
+    out_dur = g1 - g0
+    if edit is not None and edit["type"] == "skip":
+        out_dur -= edit["end"] - edit["start"]
+
+    cmd = ["ffmpeg", "-hide_banner", "-y"] + in_args + [
+        "-filter_complex", ";".join(fc),
+        "-map", "[vout]",
+        "-t", f"{out_dur - 0.25 * frame_dur:.6f}",
+    ]
+    cmd += _encoder_args(encoder, hw_encode, crf, preset, bitrate_mbps, label,
+                         log_func=log_func, profile=profile, level=level)
+    cmd += ["-pix_fmt", "yuv420p", "-an", "-f", "mpegts", outfile]
+    log_func(f"{label}: {' '.join(cmd)}")
+    run_command_gui(cmd, log_func=log_func, total_duration=out_dur)
+
+
+def _edit_cache_params(edit, g0):
+    if edit is None:
+        return None
+    if edit["type"] == "overlay":
+        return _overlay_cache_params(edit, g0)
+    return {"type": "skip", "start": edit["start"] - g0, "end": edit["end"] - g0,
+            "overlap": edit["overlap"]}
+
+
+def smart_render_segments(
+    videos, keep_segments, skip_instructions, overlay_instructions,
+    encoder="libx265", hw_encode=None, crf=23, fps=None, width=None, preset=None,
+    temp_dir=None, bitrate_mbps=None, render_cache=None
+):
+    """
+    Smart-Render: plant Copy-/Encode-Stücke direkt auf den Originalen und
+    führt sie parallel aus (run_segment_jobs). Rückgabe: Teile in
+    Timeline-Reihenfolge für final_concat_copy.
+    Wirft _SmartRenderUnsupported, bevor irgendetwas geschrieben wird, bzw.
+    wenn die neu encodeten Teile nicht zu Profil/Level der Quelle passen.
+    Mit render_cache werden Stücke mit gleichen Eingaben (Quelldatei,
+    lokaler Bereich, Edit, Encoder) wiederverwendet.
+    """
+    enc_settings = [encoder, hw_encode, crf, preset, bitrate_mbps]
+
+    def _key(*parts):
+        return render_key("smart", *parts) if render_cache is not None else None
+
+    infos = [probe_video_stream(v) for v in videos]
+    _check_smart_render_sources(infos, encoder, hw_encode, fps, width)
+    ref = infos[0]
+    profile = _SMART_PROFILES[ref["codec"]][ref["profile"]]
+    level = _level_str(ref["codec"], ref["level"])
+    enc_settings += [profile, level]
+    frame_dur = 1.0 / infos[0]["fps"]
+    eps = 0.5 * frame_dur
+
+    timeline = _SourceTimeline(videos, [info["duration"] for info in infos])
+    all_kfs = list(timeline.offsets) + [timeline.total]
+    for v, off in zip(videos, timeline.offsets):
+        all_kfs += [off + t for t in _source_keyframes(v)]
+    kfs = KeyframeIndex(all_kfs)
+
+    pieces = plan_smart_render(kfs, keep_segments, skip_instructions, overlay_instructions, eps)
+
+    parts = []
+    encoded_parts = []
+    jobs = []
+    copied = encoded = 0.0
+    print("\n============== DEBUG SMART-RENDER PLAN ==============")
+    for i, (kind, g0, g1, edit) in enumerate(pieces, start=1):
+        if kind == "copy":
+            # Copy-Stücke je Quellvideo (Videogrenzen sind immer saubere Schnitte)
+            for j, (path, ls, le) in enumerate(timeline.chunks(g0, g1)):
+                if le - ls <= eps:
+                    continue
+                out = os.path.join(temp_dir, f"smart_{i:03d}_{j}_copy.ts")
+                job_out, part_path, on_done = _cached_output(
+                    render_cache, _key("copy", file_fingerprint(path), ls, le, frame_dur), out)
+                if job_out:
+                    jobs.append(_SegmentJob(
+                        os.path.basename(out), smart_copy_part,
+                        dict(src=path, start=ls, end=le, outfile=job_out, frame_dur=frame_dur),
+                        on_done=on_done
+                    ))
+                parts.append(part_path)
+            copied += g1 - g0
+        else:
+            tag = edit["type"] if edit else "plain"
+            out = os.path.join(temp_dir, f"smart_{i:03d}_{tag}.ts")
+            key = None
+            if render_cache is not None:
+                src = [(file_fingerprint(p), ls, le) for p, ls, le in timeline.chunks(g0, g1)]
+                key = _key("encode", src, _edit_cache_params(edit, g0), enc_settings, frame_dur)
+            job_out, part_path, on_done = _cached_output(render_cache, key, out)
+            if job_out:
+                jobs.append(_SegmentJob(
+                    os.path.basename(out), smart_encode_part,
+                    dict(
+                        timeline=timeline, g0=g0, g1=g1, edit=edit, outfile=job_out,
+                        frame_dur=frame_dur, encoder=encoder, hw_encode=hw_encode,
+                        crf=crf, preset=preset, bitrate_mbps=bitrate_mbps,
+                        profile=profile, level=level
+                    ),
+                    encode=True,
+                    on_done=on_done
+                ))
+            parts.append(part_path)
+            encoded_parts.append(part_path)
+            encoded += g1 - g0
+        print(f"[{kind.upper()}] {g0:.2f}..{g1:.2f}" + (f" ({edit['type']})" if edit else ""))
+    print(f"=> Copy: {copied:.1f}s, Re-Encode: {encoded:.1f}s")
+    print("=================================================\n")
+    if render_cache is not None:
+        print(f"[INFO] Render-Cache: {len(parts) - len(jobs)} von {len(parts)} Teilen wiederverwendet")
+
+    run_segment_jobs(
+        jobs,
+        max_encodes=max_parallel_encodes(hw_encode),
+        max_copies=max_parallel_copies()
+    )
+    _check_smart_parts(encoded_parts, ref)
+    return parts
+
+
+def _check_smart_parts(paths, ref):
+    """Neu encodete Teile müssen Codec/Profil/Level/Format der Quelle haben."""
+    for path in paths:
+        video = probe_media(path)["video"]
+        if video is None:
+            raise _SmartRenderUnsupported(f"kein Videostream in {os.path.basename(path)}")
+        for key in ("codec", "profile", "level", "width", "height", "pix_fmt"):
+            if video[key] != ref[key]:
+                raise _SmartRenderUnsupported(
+                    f"{os.path.basename(path)}: {key} {video[key]} != Quelle {ref[key]}")
+
+
+def _check_smart_output(final_out, parts):
+    """ffprobe auf das fertige MP4: Videostream da, Länge = Summe der Teile."""
+    info = probe_media(final_out)
+    expected = sum(probe_media(p)["duration"] for p in parts)
+    if info["video"] is None:
+        raise _SmartRenderUnsupported("Ergebnis ohne Videostream")
+    if abs(info["duration"] - expected) > max(1.0, 0.01 * expected):
+        raise _SmartRenderUnsupported(
+            f"Ergebnis {info['duration']:.2f}s statt {expected:.2f}s")
+
+
+###############################################################################
+# 12c) SINGLE-PROCESS => ganzer Schnitt in einem ffmpeg-Aufruf
+###############################################################################
+#
+# Alternative zu merged.mp4 + Segmenten: Keep-Bereiche, Crossfades und
+# Overlays werden zu EINEM filter_complex zusammengesetzt. Keine
+# Zwischen-Dateien, kein Prozess-Start pro Segment. Jeder Bereich ist ein
+# eigener Input mit -ss/-t (schneller Seek), danach fps/scale/format
+# vereinheitlicht, per xfade bzw. concat verkettet und zum Schluss alle
+# Overlays auf der Ausgabe-Zeitachse darübergelegt.
+
+def plan_filtergraph_pieces(keep_segments, skip_instructions):
+    """
+    Zerlegt die Keep-Bereiche an den Crossfade-Skips.
+    Rückgabe: Liste (g0, g1, xfade_zum_nächsten) in globaler Zeit.
+    Wie beim klassischen Weg: Stück A läuft bis start+overlap, das nächste
+    beginnt bei end, der Übergang dauert overlap.
+    Skips, die über einen Keep-Rand oder einen vorigen Skip hinausragen,
+    werden auf den Keep-Bereich gekürzt (ggf. mit kürzerem Übergang).
+    """
+    skips = sorted(
+        (float(s), float(e), float(v)) for s, e, v in skip_instructions
+        if v not in (-1, -2) and e > s
+    )
+    pieces = []
+    for ks, ke in keep_segments:
+        pos = ks
+        for s, e, ov in skips:
+            cs, ce = max(s, pos), min(e, ke)
+            if ce <= cs:
+                continue  # liegt nicht in diesem Keep-Bereich
+            if (cs, ce) != (s, e):
+                print(f"[INFO] Skip {s:.3f}-{e:.3f} auf {cs:.3f}-{ce:.3f} gekürzt")
+            if ce >= ke:
+                # Skip reicht bis ans Keep-Ende => dort einfach abschneiden
+                pieces.append([pos, cs, 0.0])
+                pos = ke
+                break
+            if cs <= pos:
+                # Skip am Anfang => nichts zum Überblenden davor
+                pos = ce
+                continue
+            ov = max(0.0, min(ov, ke - ce))
+            pieces.append([pos, cs + ov, ov])
+            pos = ce
+        if pos < ke:
+            pieces.append([pos, ke, 0.0])
+    return [tuple(p) for p in pieces if p[1] - p[0] > 0.01]
+
+
+def _filtergraph_output_time(pieces, t):
+    """Globale Zeit t => Zeit im fertigen Video (None, wenn t weggeschnitten ist)."""
+    out = 0.0
+    for g0, g1, ov in pieces:
+        if g0 <= t <= g1:
+            return out + (t - g0)
+        out += (g1 - g0) - ov
+    return None
+
+
+def build_filtergraph_render_cmd(
+    videos, durations, keep_segments, skip_instructions, overlay_instructions, final_out,
+    encoder="libx265", hw_encode=None, crf=23, fps=None, width=None, preset=None,
+    bitrate_mbps=None
+):
+    timeline = _SourceTimeline(videos, durations)
+    pieces = plan_filtergraph_pieces(keep_segments, skip_instructions)
+    if not pieces:
+        raise ValueError("Keine Keep-Bereiche => nichts zu exportieren.")
+
+    norm = []
+    if fps:
+        norm.append(f"fps={fps}")
+    scale = build_scale_filter(width)
+    if scale:
+        norm.append(scale)
+    norm += ["format=yuv420p", "settb=AVTB"]
+    norm_str = ",".join(norm)
+
+    in_args = []
+    fc = []
+    n_in = 0
+    lengths = []
+    for k, (g0, g1, _) in enumerate(pieces):
+        chunks = timeline.chunks(g0, g1)
+        for path, ls, le in chunks:
+            in_args += ["-ss", f"{ls:.3f}", "-t", f"{le - ls:.3f}", "-i", path]
+        if len(chunks) == 1:
+            fc.append(f"[{n_in}:v]{norm_str}[p{k}]")
+        else:
+            ins = "".join(f"[{n_in + i}:v]" for i in range(len(chunks)))
+            fc.append(f"{ins}concat=n={len(chunks)}:v=1:a=0,{norm_str}[p{k}]")
+        n_in += len(chunks)
+        lengths.append(g1 - g0)
+
+    # Stücke verketten: xfade, wo ein Skip-Übergang ist, sonst concat
+    cur = "p0"
+    cur_len = lengths[0]
+    for k in range(1, len(pieces)):
+        ov = min(pieces[k - 1][2], cur_len, lengths[k])
+        nxt = f"x{k}"
+        if ov > 0:
+            fc.append(f"[{cur}][p{k}]xfade=transition=fade:duration={ov:.3f}"
+                      f":offset={cur_len - ov:.3f}[{nxt}]")
+            cur_len += lengths[k] - ov
+        else:
+            fc.append(f"[{cur}][p{k}]concat=n=2:v=1:a=0[{nxt}]")
+            cur_len += lengths[k]
+        cur = nxt
+
+    # Overlays auf der Ausgabe-Zeitachse
+    for j, ovl in enumerate(overlay_instructions):
+        st = _filtergraph_output_time(pieces, float(ovl["start"]))
+        en = _filtergraph_output_time(pieces, float(ovl["end"]))
+        if st is None or en is None or en <= st:
+            print(f"[WARN] Overlay {ovl['start']}..{ovl['end']} liegt (teilweise) im Schnitt => ausgelassen")
+            continue
+        fade_in = float(ovl.get("fade_in", 1.0))
+        fade_out = float(ovl.get("fade_out", 1.0))
+        sc = float(ovl.get("scale", 1.0))
+        chain = ["format=rgba"]
+        if fade_in > 0:
+            chain.append(f"fade=t=in:st={st:.3f}:d={fade_in:.3f}:alpha=1")
+        if fade_out > 0:
+            chain.append(f"fade=t=out:st={max(st, en - fade_out):.3f}:d={fade_out:.3f}:alpha=1")
+        chain.append(f"scale=iw*{sc}:ih*{sc}:force_original_aspect_ratio=decrease")
+        in_args += _build_overlay_input_args(ovl["image"])
+        fc.append(f"[{n_in}:v]{','.join(chain)}[ov{j}]")
+        n_in += 1
+        nxt = f"o{j}"
+        fc.append(
+            f"[{cur}][ov{j}]overlay=x={ovl.get('x', 0)}:y={ovl.get('y', 0)}:format=auto"
+            f":enable='between(t,{st:.3f},{en:.3f})'[{nxt}]"
+        )
+        cur = nxt
+
+    cmd = ["ffmpeg", "-hide_banner", "-y"] + in_args + [
+        "-filter_complex", ";".join(fc),
+        "-map", f"[{cur}]",
+        "-t", f"{cur_len:.3f}",
+    ]
+    cmd += _encoder_args(encoder, hw_encode, crf, preset, bitrate_mbps, "FILTERGRAPH", closed_gop=False)
+    cmd += ["-pix_fmt", "yuv420p", "-an", final_out]
+    return cmd, cur_len
+
+
+def filtergraph_render(
+    videos, durations, keep_segments, skip_instructions, overlay_instructions, final_out,
+    **enc
+):
+    """Rendert den kompletten Schnitt mit einem einzigen ffmpeg-Prozess."""
+    cmd, out_len = build_filtergraph_render_cmd(
+        videos, durations, keep_segments, skip_instructions, overlay_instructions,
+        final_out, **enc
+    )
+    print(f"[INFO] Single-Process-Render: {out_len:.1f}s Ausgabe, "
+          f"{cmd.count('-i')} Inputs, ein ffmpeg-Aufruf")
+    print("FILTERGRAPH_RENDER:", " ".join(cmd))
+    run_command_gui(cmd, log_func=print, total_duration=out_len)
+
+
+def write_concat_copy_list(entries, list_file):
+    """
+    Concat-Demuxer-Liste mit inpoint/outpoint je Eintrag (pfad, start, ende).
+    Ein einziges "ffmpeg -f concat -c copy" schneidet damit alle
+    Keep-Bereiche ohne Segment-Dateien.
+    """
+    with open(list_file, "w", encoding="utf-8") as f:
+        for path, start, end in entries:
+            abspath = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{abspath}'\n")
+            f.write(f"inpoint {start:.6f}\n")
+            f.write(f"outpoint {end:.6f}\n")
+
+
 ###############################################################################
 # MAIN
 ###############################################################################
@@ -1153,6 +2051,14 @@ def xfade_main(cfg_path):
     fps = cfg.get("fps", 30)
     width = cfg.get("width", None)
     preset = cfg.get("preset", None)
+    # Reihenfolge der Backends: single_process (ein filter_complex) vor
+    # smart_render (Copy + Teil-Encodes) vor dem klassischen merged.mp4-Weg
+    single_process = cfg.get("single_process", settings.value("encoder/single_process", False, type=bool))
+    smart_render = cfg.get("smart_render", settings.value("encoder/smart_render", False, type=bool))
+    use_render_cache = cfg.get("render_cache", settings.value("encoder/render_cache", True, type=bool))
+    render_cache_gb = settings.value("encoder/render_cache_gb", DEFAULT_CACHE_GB, type=int)
+    render_cache = (RenderCache(max_bytes=render_cache_gb * 1024 ** 3)
+                    if use_render_cache else None)
 
     temp_dir = MY_GLOBAL_TMP_DIR
     os.makedirs(temp_dir, exist_ok=True)
@@ -1162,51 +2068,110 @@ def xfade_main(cfg_path):
     
    
     
-    total_duration = 0.0
-    for v in videos:
-        cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-               "-of", "default=noprint_wrappers=1:nokey=1", v]
-        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        total_duration += float(out.stdout.strip())
+    # alle Quellen auf einmal (parallel, bereits bekannte aus dem Speicher)
+    infos = probe_many(videos)
+    missing = [v for v, info in zip(videos, infos) if info is None]
+    if missing:
+        raise RuntimeError(f"ffprobe fehlgeschlagen für: {', '.join(missing)}")
+    durations = [info["duration"] for info in infos]
+    total_duration = sum(durations)
 
     keep_segments = compute_keep_segments(skip_list, total_duration)
     print("[INFO] Keep segments:", keep_segments)
 
-    trimmed_parts, timeline_map = pre_trim_input_videos(videos, keep_segments, temp_dir)
-    print("[INFO] Timeline map:", timeline_map)
+    if single_process:
+        filtergraph_render(
+            videos, durations, keep_segments, skip_list, overlay_list, final_out,
+            encoder=encoder, hw_encode=hw_encode, crf=crf, fps=fps, width=width,
+            preset=preset, bitrate_mbps=bitrate_mbps
+        )
+        print("\n== DONE == Final video:", final_out)
+        return
 
-    concat_txt = os.path.join(temp_dir, "concat_input.txt")
-    with open(concat_txt, "w", encoding="utf-8") as f:
-        for path in trimmed_parts:
-            f.write(f"file '{os.path.abspath(path)}'\n")
+    if smart_render:
+        try:
+            parts = smart_render_segments(
+                videos=videos,
+                keep_segments=keep_segments,
+                skip_instructions=skip_list,
+                overlay_instructions=overlay_list,
+                encoder=encoder,
+                hw_encode=hw_encode,
+                crf=crf,
+                fps=fps,
+                width=width,
+                preset=preset,
+                temp_dir=temp_dir,
+                bitrate_mbps=bitrate_mbps,
+                render_cache=render_cache
+            )
+            family = _CODEC_FAMILY.get(determine_encoder(encoder, hw_encode)[0])
+            final_concat_copy(parts, final_out, tag=_INBAND_TAG.get(family))
+            _check_smart_output(final_out, parts)
+        except _SmartRenderUnsupported as e:
+            print(f"[INFO] Smart-Render nicht möglich ({e}) => kompletter Re-Encode.")
+        else:
+            if render_cache is not None:
+                render_cache.prune()
+            print("\n== DONE == Final video:", final_out)
+            return
 
+    # merged-Datei: gleiche Quellen + Trims + Encoder => aus dem Render-Cache
     merged_path = os.path.join(temp_dir, merged_out)
-    encode_closedgop(
-        concat_file=concat_txt,
-        outname=merged_path,
-        encoder=encoder,
-        hw_encode=hw_encode,
-        fps=fps,
-        crf=crf,
-        width=width,
-        preset=preset,
-        bitrate_mbps=bitrate_mbps
-    )
-    print("[INFO] Cleaning up TRIM files to free space...")
-    for path in trimmed_parts:
-        try:
-            os.remove(path)
-        except Exception as e:
-            print(f"[WARN] Could not delete {path}: {e}")
-    
+    cached_merged = None
+    merged_key = None
+    if render_cache is not None:
+        merged_key = render_key(
+            "merged-file", [file_fingerprint(v) for v in videos], keep_segments,
+            [encoder, hw_encode, fps, crf, width, preset, bitrate_mbps]
+        )
+        cached_merged = render_cache.lookup(merged_key)
 
-    cmd_dur = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-               "-of", "default=noprint_wrappers=1:nokey=1", merged_path]
-    rr = subprocess.run(cmd_dur, capture_output=True, text=True, check=True)
-    new_duration = float(rr.stdout.strip())
+    if cached_merged:
+        print("[INFO] Render-Cache: merged-Datei wiederverwendet:", cached_merged)
+        _, timeline_map = pre_trim_input_videos(videos, keep_segments, temp_dir, dry_run=True)
+        print("[INFO] Timeline map:", timeline_map)
+        merged_path = cached_merged
+    else:
+        trimmed_parts, timeline_map = pre_trim_input_videos(videos, keep_segments, temp_dir)
+        print("[INFO] Timeline map:", timeline_map)
+
+        concat_txt = os.path.join(temp_dir, "concat_input.txt")
+        with open(concat_txt, "w", encoding="utf-8") as f:
+            for path in trimmed_parts:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+
+        commit_merged = None
+        if render_cache is not None:
+            encode_out, merged_path, commit_merged = render_cache.reserve(merged_key)
+        else:
+            encode_out = merged_path
+        encode_closedgop(
+            concat_file=concat_txt,
+            outname=encode_out,
+            encoder=encoder,
+            hw_encode=hw_encode,
+            fps=fps,
+            crf=crf,
+            width=width,
+            preset=preset,
+            bitrate_mbps=bitrate_mbps,
+            total_duration=sum(e - s for s, e in keep_segments)
+        )
+        if commit_merged is not None:
+            commit_merged()
+        print("[INFO] Cleaning up TRIM files to free space...")
+        for path in trimmed_parts:
+            try:
+                os.remove(path)
+            except Exception as e:
+                print(f"[WARN] Could not delete {path}: {e}")
+
+
+    new_duration = media_duration(merged_path)
     print("[INFO] Merged duration:", new_duration)
 
-    kf = get_keyframes(merged_path)
+    kf = KeyframeIndex(get_keyframes(merged_path))
     remapped_skips, remapped_overlays = remap_instructions(skip_list, overlay_list, timeline_map)
 
     parts = build_segments_with_skip_and_overlay(
@@ -1222,10 +2187,14 @@ def xfade_main(cfg_path):
         width=width,
         preset=preset,
         temp_dir=temp_dir,
-        bitrate_mbps=bitrate_mbps     
+        bitrate_mbps=bitrate_mbps,
+        render_cache=render_cache,
+        source_key=merged_key
     )
 
     final_concat_copy(parts, final_out)
+    if render_cache is not None:
+        render_cache.prune()
     print("\n== DONE == Final video:", final_out)
 
 if __name__ == "__main__":
@@ -1244,6 +2213,8 @@ if __name__ == "__main__":
 #    den final_output festlegen kann, wenn du das möchtest.
 #-----------------------------------------------------------------
 
+MAX_LOG_LINES = 5000
+
 class EncoderDialog(QDialog):
     _counter_url = "http://www.KVRouite.com/project/counter.php"
     """
@@ -1258,6 +2229,8 @@ class EncoderDialog(QDialog):
 
         self.text_edit = QPlainTextEdit(self)
         self.text_edit.setReadOnly(True)
+        # Nur die letzten Zeilen behalten (lange Renders => sonst riesiges Log)
+        self.text_edit.setMaximumBlockCount(MAX_LOG_LINES)
         layout.addWidget(self.text_edit)
 
         self.btn_close = QPushButton("Close", self)
@@ -1364,6 +2337,8 @@ class EncoderDialog(QDialog):
 
             except Exception as e:
                 print(f"[ERROR] {e}")
+                if getattr(e, "stderr", None):
+                    print(e.stderr)
         
 
     def _on_new_text(self, text: str):
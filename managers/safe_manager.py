@@ -21,7 +21,6 @@
 # managers/safe_manager.py
 
 import subprocess
-import re
 import os
 import tempfile
 
@@ -31,6 +30,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QProcess, QTimer
 
+from core.ffmpeg_runner import FFmpegProgress, LogTail, add_progress_args, format_hms
+
 class SafeManager(QDialog):
     def __init__(self, cmd_list, total_duration_s: float, parent=None):
         super().__init__(parent)
@@ -56,9 +57,12 @@ class SafeManager(QDialog):
 
         self.setLayout(layout)
 
-        self.cmd_list = cmd_list
+        # -progress pipe:1 => Fortschritt als key=value auf stdout
+        self.cmd_list = add_progress_args(cmd_list) if cmd_list else cmd_list
         self.total_duration_s = total_duration_s
         self.ffmpeg_process = None
+        self.progress = FFmpegProgress(total_duration_s)
+        self.log_tail = LogTail(200)
 
     def start_saving(self):
         if not self.cmd_list or len(self.cmd_list) < 2:
@@ -76,6 +80,7 @@ class SafeManager(QDialog):
         self.ffmpeg_process.setArguments(self.cmd_list[1:])
 
         self.ffmpeg_process.readyReadStandardError.connect(self._on_read_stderr)
+        self.ffmpeg_process.readyReadStandardOutput.connect(self._on_read_progress)
         self.ffmpeg_process.finished.connect(self._on_process_finished)
         self.ffmpeg_process.start()
         if not self.ffmpeg_process.waitForStarted(3000):
@@ -86,22 +91,25 @@ class SafeManager(QDialog):
         if not self.ffmpeg_process:
             return
         data = self.ffmpeg_process.readAllStandardError().data().decode("utf-8", errors="replace")
-        lines = data.split("\n")
-        for line in lines:
-            line = line.strip()
-            if "time=" in line:
-                m = re.search(r"time=(\d+:\d+:\d+\.\d+)", line)
-                if m:
-                    cur_time_str = m.group(1)
-                    cur_s = self._hms_to_seconds(cur_time_str)
-                    pct = 0
-                    if self.total_duration_s > 0:
-                        pct = (cur_s / self.total_duration_s) * 100
-                        if pct > 100:
-                            pct = 100
-                    self.progress_bar.setValue(int(pct))
-                    hms_total = self._seconds_to_hms(self.total_duration_s)
-                    self.label_status.setText(f"Verarbeite: {cur_time_str} / {hms_total}")
+        # nur noch echte Meldungen (-nostats), davon die letzten 200 Zeilen
+        self.log_tail.feed(data)
+
+    def _on_read_progress(self):
+        if not self.ffmpeg_process:
+            return
+        data = self.ffmpeg_process.readAllStandardOutput().data().decode("utf-8", errors="replace")
+        if not self.progress.feed(data):
+            return
+        frac = self.progress.fraction()
+        if frac is not None:
+            self.progress_bar.setValue(int(frac * 100))
+        cur_s = self.progress.out_time_s
+        hms_total = self._seconds_to_hms(self.total_duration_s)
+        text = f"Verarbeite: {format_hms(cur_s)} / {hms_total}"
+        eta = self.progress.eta_s()
+        if eta is not None:
+            text += f"  ({self.progress.speed:.1f}x, noch {format_hms(eta)})"
+        self.label_status.setText(text)
 
     def _on_process_finished(self, exit_code, exit_status):
         if exit_code == 0:
@@ -109,6 +117,8 @@ class SafeManager(QDialog):
             self.label_status.setText("Fertig!")
         else:
             self.label_status.setText(f"Fehler oder abgebrochen (exit={exit_code}).")
+            if self.log_tail.lines:
+                print("[WARN] ffmpeg:\n" + self.log_tail.text())
         QTimer.singleShot(1000, self.close)
 
     def _on_cancel_clicked(self):
@@ -48,6 +48,7 @@ Mit Folgendem Verhalten:
 """
 
 from PySide6.QtCore import QTimer
+from core.keyframe_index import KeyframeIndex
 
 class StepManager(object):
     def __init__(self, video_editor):
@@ -279,20 +280,12 @@ class StepManager(object):
         n = int(mul)
 
         EPS = 0.005
-        idx = None
-        for i, t in enumerate(kfs):
-            if t > (cur_s + EPS):
-                idx = i
-                break
-        if idx is None:
+        hit = kfs.nth_after(cur_s + EPS, n)
+        if hit is None:
             print("[DEBUG] (k-forward): bereits am letzten Keyframe.")
             return
 
-        idx_n = idx + (n - 1)
-        if idx_n >= len(kfs):
-            idx_n = len(kfs) - 1
-
-        target_s = kfs[idx_n]
+        idx_n, target_s = hit
         skip_s = self._maybe_skip_cut(target_s, forward=True)
         if skip_s is not None:
             print(f"[DEBUG] (k-forward): Keyframe {target_s:.3f} im Cut => springe {skip_s:.3f}")
@@ -316,21 +309,13 @@ class StepManager(object):
         n = int(mul)
 
         EPS = 0.005
-        idx = None
         # Rueckwaerts => den naechsten Keyframe UNTERHALB cur_s
-        for i in reversed(range(len(kfs))):
-            if kfs[i] < (cur_s - EPS):
-                idx = i
-                break
-        if idx is None:
+        hit = kfs.nth_before(cur_s - EPS, n)
+        if hit is None:
             print("[DEBUG] (k-backward): Vor erstem Keyframe.")
             return
 
-        idx_n = idx - (n - 1)
-        if idx_n < 0:
-            idx_n = 0
-
-        target_s = kfs[idx_n]
+        idx_n, target_s = hit
         skip_s = self._maybe_skip_cut(target_s, forward=False)
         if skip_s is not None:
             print(f"[DEBUG] (k-backward): Keyframe {target_s:.3f} im Cut => springe {skip_s:.3f}")
@@ -406,8 +391,8 @@ class StepManager(object):
 
     def _get_kfs_list(self):
         """
-        Aus dem MainWindow => global_keyframes
+        Aus dem MainWindow => global_keyframes (als sortierter KeyframeIndex)
         """
         if not self.mainwindow:
-            return []
-        return self.mainwindow.global_keyframes or []
+            return KeyframeIndex()
+        return self.mainwindow.global_keyframe_index
@@ -27,7 +27,22 @@ import csv
 import os
 import sys
 
+try:
+    from core.mp4_keyframes import read_mp4_keyframes
+except ImportError:
+    # direkt als Skript aus tools/ gestartet
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core.mp4_keyframes import read_mp4_keyframes
+
 def extract_keyframes(ffprobe_path, input_file):
+    # MP4/MOV: Keyframes direkt aus den stss/stts-Tabellen, ohne Demuxen
+    times = read_mp4_keyframes(input_file)
+    if times is not None:
+        return [
+            {"pts_time": f"{t:.6f}", "pict_type": "I", "key_frame": "1"}
+            for t in times
+        ]
+
     cmd = [
         ffprobe_path,
         "-v", "error",
@@ -32,6 +32,11 @@ from PySide6.QtCore import QEvent
 
 from config import TMP_KEYFRAME_DIR
 from config import MY_GLOBAL_TMP_DIR            
+from core.mp4_keyframes import read_mp4_keyframes
+from core.ffmpeg_runner import FFmpegProgress, LogTail, add_progress_args, format_hms
+
+# So viele Zeilen behalten die Log-Felder der Export-Dialoge
+MAX_LOG_LINES = 5000
 
 class _IndexingDialog(QDialog):
     indexing_extracted = Signal(str, str)  # (video_path, temp_dir)
@@ -86,8 +91,28 @@ class _IndexingDialog(QDialog):
         self.progress_bar.setValue(self._bounce_value)
 
     def start_indexing(self):
+        # MP4/MOV: Keyframes aus den Sample-Tabellen (Millisekunden statt Minuten)
+        times = read_mp4_keyframes(self.video_path)
+        if times is not None:
+            # erst nach dem Start von exec() abschließen
+            QTimer.singleShot(0, lambda: self._finish_from_times(times))
+            return
         self.run_ffprobe_direct()
 
+    def _finish_from_times(self, times):
+        """Schreibt die CSV im ffprobe-Format (key_frame,pts_time,pict_type)."""
+        self._bounce_timer.stop()
+        os.makedirs(os.path.dirname(self.output_csv), exist_ok=True)
+        with open(self.output_csv, "w", encoding="utf-8") as f:
+            for t in times:
+                f.write(f"1,{t:.6f},I\n")
+        self._line_count = len(times)
+        self.label_linecount.setText(f"Read Keyframe: {self._line_count}")
+        self.progress_bar.setValue(100)
+        print("[DEBUG] MP4-Index fertig => CSV:", self.output_csv)
+        self.indexing_extracted.emit(self.video_path, os.path.dirname(self.output_csv))
+        self.accept()
+
     def run_ffprobe_direct(self):
         cmd = [
             "ffprobe",
@@ -161,6 +186,10 @@ class _SafeExportDialog(QDialog):
     export_finished = Signal(str)
     export_canceled = Signal()
 
+    # Anteil des Concat-Schritts am Balken (Stream-Copy, läuft deutlich
+    # schneller als das Schneiden der Segmente)
+    CONCAT_SHARE = 0.1
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Exporting Video – This may take a while…")
@@ -178,6 +207,7 @@ class _SafeExportDialog(QDialog):
 
         self.text_log = QTextEdit(self)
         self.text_log.setReadOnly(True)
+        self.text_log.document().setMaximumBlockCount(MAX_LOG_LINES)
         layout.addWidget(self.text_log)
 
         row_btn = QHBoxLayout()
@@ -203,11 +233,33 @@ class _SafeExportDialog(QDialog):
         self._out_file = None
         self._cancel_requested = False
 
+        # Fortschritt über "-progress pipe:1" (stdout), Meldungen über stderr
+        self._progress = FFmpegProgress()
+        self._log_tail = LogTail(MAX_LOG_LINES)
+        self._total_s = None
+        self._done_s = 0.0
+        self._phase = "Cutting"
+
     def set_commands(self, commands_list: list, concat_cmd: list, out_file: str):
-        self._commands = commands_list
-        self._concat_cmd = concat_cmd
+        self._commands = [add_progress_args(c) for c in commands_list]
+        self._concat_cmd = add_progress_args(concat_cmd) if concat_cmd else concat_cmd
         self._out_file = out_file
 
+    def set_total_duration(self, seconds: float):
+        """Länge des fertigen Videos => echter Prozentwert + ETA statt Lauflicht."""
+        if not seconds or seconds <= 0:
+            return
+        self._total_s = seconds
+        self._bounce_timer.stop()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(0)
+
+    def _start_process(self, cmd):
+        self._progress = FFmpegProgress()
+        self._process.setProgram(cmd[0])
+        self._process.setArguments(cmd[1:])
+        self._process.start()
+
     def start_export(self):
         if not self._commands:
             self._start_concat()
@@ -222,9 +274,7 @@ class _SafeExportDialog(QDialog):
             return
         cmd = self._commands[self._current_index]
         self._append_text(f"Cut Segment #{self._current_index+1}: {cmd}")
-        self._process.setProgram(cmd[0])
-        self._process.setArguments(cmd[1:])
-        self._process.start()
+        self._start_process(cmd)
 
     def _on_process_finished(self, exit_code, exit_status):
         if self._cancel_requested:
@@ -236,6 +286,7 @@ class _SafeExportDialog(QDialog):
             self.reject()
             return
         self._append_text(f"Segment #{self._current_index+1} done!\n")
+        self._done_s += self._progress.out_time_s or 0.0
         self._current_index += 1
         self._run_next_command()
 
@@ -246,11 +297,16 @@ class _SafeExportDialog(QDialog):
             self._finish_up()
             return
         self._append_text("All segments done! Now concatenating…")
-        self._process.setProgram(self._concat_cmd[0])
-        self._process.setArguments(self._concat_cmd[1:])
+        # concat läuft noch einmal über die ganze Länge => eigene Phase,
+        # der Balken macht dort weiter, wo das Schneiden aufgehört hat
+        self._phase = "Concatenating"
+        self._done_s = 0.0
+        if self._total_s:
+            base, _share = self._phase_span()
+            self.progress_bar.setValue(int(base * 1000))
         self._process.finished.disconnect(self._on_process_finished)
         self._process.finished.connect(self._on_concat_finished)
-        self._process.start()
+        self._start_process(self._concat_cmd)
 
     def _on_concat_finished(self, exit_code, exit_status):
         if exit_code != 0:
@@ -283,13 +339,36 @@ class _SafeExportDialog(QDialog):
 
     def _on_read_stderr(self):
         data = self._process.readAllStandardError().data().decode("utf-8", "replace")
-        if data:
-            self._append_text(data.strip())
+        lines = self._log_tail.feed(data)
+        if lines:
+            self._append_text("\n".join(lines))
+
+    def _phase_span(self):
+        """(Startwert, Anteil) der aktuellen Phase auf dem Balken, je 0..1."""
+        concat_share = self.CONCAT_SHARE if self._concat_cmd else 0.0
+        if not self._commands:
+            concat_share = 1.0
+        if self._phase == "Concatenating":
+            return 1.0 - concat_share, concat_share
+        return 0.0, 1.0 - concat_share
 
     def _on_read_stdout(self):
         data = self._process.readAllStandardOutput().data().decode("utf-8", "replace")
-        if data:
-            self._append_text(data.strip())
+        if not self._progress.feed(data):
+            return
+        p = self._progress
+        if self._total_s:
+            done = min(self._total_s, self._done_s + (p.out_time_s or 0.0))
+            base, share = self._phase_span()
+            self.progress_bar.setValue(int((base + share * done / self._total_s) * 1000))
+            # ETA gilt nur für die laufende Phase
+            eta = (self._total_s - done) / p.speed if p.speed else None
+            self.label_info.setText(
+                f"{self._phase}: {format_hms(done)} / {format_hms(self._total_s)}   "
+                f"speed {p.speed or 0:.1f}x   ETA {format_hms(eta)}"
+            )
+        else:
+            self.label_info.setText(p.format())
 
     def _on_bounce(self):
         self._bounce_value = (self._bounce_value + 2) % 100
@@ -24,10 +24,12 @@ import json
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QFormLayout, QDialogButtonBox,
     QLabel, QComboBox, QSpinBox, QPushButton, QMessageBox,
-    QProgressDialog
+    QProgressDialog, QCheckBox
 )
 from PySide6.QtCore import QSettings, Qt
 
+from core.render_cache import RenderCache, DEFAULT_CACHE_GB
+
 
 # Hilfsfunktion: kurzer Test, ob ein FFmpeg-Encoder läuft
 def can_encode_with(ffmpeg_enc_name, ffmpeg_path="ffmpeg", test_duration=0.5):
@@ -118,6 +120,38 @@ class EncoderSetupDialog(QDialog):
         self.xfade_spin.setRange(0, 30)
         form_layout.addRow("X-Fade (s):", self.xfade_spin)
 
+        # (I) Smart-Render: unveränderte GOPs kopieren statt neu encoden
+        self.smart_render_check = QCheckBox("Copy unchanged parts (experimental)")
+        self.smart_render_check.setToolTip(
+            "Only re-encodes the GOPs around cuts, crossfades and overlays.\n"
+            "Needs sources matching the export settings; otherwise the\n"
+            "normal full re-encode is used."
+        )
+        form_layout.addRow("Smart render:", self.smart_render_check)
+
+        # (J) Single-Process: ganzer Export in einem ffmpeg-Aufruf
+        self.single_process_check = QCheckBox("One ffmpeg call, no segment files")
+        self.single_process_check.setToolTip(
+            "Copy export: one concat list instead of segment files.\n"
+            "Encode export: one filter graph instead of merged.mp4 + segments\n"
+            "(takes precedence over smart render)."
+        )
+        form_layout.addRow("Single process:", self.single_process_check)
+
+        # (K) Render-Cache: an/aus, Obergrenze, Ort + Größe, leeren
+        self.render_cache_check = QCheckBox("Reuse unchanged segments on re-export")
+        form_layout.addRow("Render cache:", self.render_cache_check)
+        self.render_cache_spin = QSpinBox()
+        self.render_cache_spin.setRange(1, 500)
+        self.render_cache_spin.setSuffix(" GB")
+        form_layout.addRow("Cache limit:", self.render_cache_spin)
+        self.render_cache_info = QLabel()
+        self.render_cache_info.setWordWrap(True)
+        self.render_cache_info.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        form_layout.addRow("", self.render_cache_info)
+        self.btn_clear_cache = QPushButton("Clear render cache")
+        form_layout.addRow("", self.btn_clear_cache)
+
         # Buttons (OK/Cancel + "Detect HW")
         btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
         main_layout.addWidget(btns, alignment=Qt.AlignRight)
@@ -129,6 +163,7 @@ class EncoderSetupDialog(QDialog):
         btns.accepted.connect(self.on_ok_clicked)
         btns.rejected.connect(self.reject)
         self.btn_detect_hw.clicked.connect(self.on_detect_hw_clicked)
+        self.btn_clear_cache.clicked.connect(self.on_clear_cache_clicked)
         self.container_combo.currentIndexChanged.connect(self.update_hw_options)
 
         # Erst aus QSettings laden
@@ -221,6 +256,20 @@ class EncoderSetupDialog(QDialog):
         # 6) Xfade
         xfade_val = self.settings.value("encoder/xfade", 2, type=int)
         self.xfade_spin.setValue(xfade_val)
+
+        # Smart-Render (Standard: aus)
+        self.smart_render_check.setChecked(
+            self.settings.value("encoder/smart_render", False, type=bool))
+        # Single-Process (Standard: aus), gilt für Copy- und Encode-Export
+        self.single_process_check.setChecked(
+            self.settings.value("encoder/single_process", False, type=bool))
+
+        # Render-Cache
+        self.render_cache_check.setChecked(
+            self.settings.value("encoder/render_cache", True, type=bool))
+        self.render_cache_spin.setValue(
+            self.settings.value("encoder/render_cache_gb", DEFAULT_CACHE_GB, type=int))
+        self.update_cache_info()
         
         # 7) Bitrate (Standardwerte nach Auflösung)
         bitrate_val = self.settings.value("encoder/bitrate_mbps", None)
@@ -345,6 +394,29 @@ class EncoderSetupDialog(QDialog):
         self.update_hw_options()
 
 
+    # ---------------------------
+    # Render-Cache
+    # ---------------------------
+    def update_cache_info(self):
+        """Zeigt Ort und belegten Platz des Render-Caches."""
+        cache = RenderCache()
+        used_gb = cache.total_bytes() / 1024 ** 3
+        self.render_cache_info.setText(f"{cache.cache_dir}\n{used_gb:.2f} GB used")
+
+    def on_clear_cache_clicked(self):
+        ans = QMessageBox.question(
+            self, "Clear render cache",
+            "Delete all cached segments?\nThe next export renders everything again.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if ans != QMessageBox.Yes:
+            return
+        freed = RenderCache().clear()
+        self.update_cache_info()
+        QMessageBox.information(self, "Clear render cache",
+                                f"Freed {freed / 1024 ** 3:.2f} GB.")
+
+
     def on_ok_clicked(self):
         """Speichert die Werte in QSettings und schließt."""
         # resolution
@@ -377,5 +449,9 @@ class EncoderSetupDialog(QDialog):
             return
         self.settings.setValue("encoder/xfade", xfade_val)
         self.settings.setValue("encoder/bitrate_mbps", self.bitrate_spin.value())
+        self.settings.setValue("encoder/smart_render", self.smart_render_check.isChecked())
+        self.settings.setValue("encoder/single_process", self.single_process_check.isChecked())
+        self.settings.setValue("encoder/render_cache", self.render_cache_check.isChecked())
+        self.settings.setValue("encoder/render_cache_gb", self.render_cache_spin.value())
 
         self.accept()
@@ -41,6 +41,11 @@ import hashlib
 import statistics
 import fitparse
 import gc
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 
             
@@ -98,13 +103,19 @@ from .dialogs import _IndexingDialog, _SafeExportDialog, DetachDialog
 from widgets.mini_chart_widget import MiniChartWidget
 from config import is_edit_video_enabled, set_edit_video_enabled
 from core.gpx_parser import parse_gpx, ensure_gpx_stable_ids  # <--- Achte auf diesen Import!
-from core.gpx_parser import recalc_gpx_data, get_gpx_video_shift, set_gpx_video_shift
-from tools.merge_keyframes_incremental import merge_keyframes_incremental
+from core.gpx_parser import recalc_gpx_data, recalc_range, get_gpx_video_shift, set_gpx_video_shift
+from core.track import Track, as_track, datetime_to_ns
+from core.track_stats import TrackStats
+from core.project_file import save_project_file, load_project_file
+from core.keyframe_cache import load_cached_keyframes, store_keyframes, read_ffprobe_keyframe_csv
+from core.keyframe_index import KeyframeIndex
+from core.media_probe import probe_many, media_duration
+from core.cut_index import CutIndex
 from config import APP_VERSION
 
 from path_manager import is_valid_mpv_folder
 from config import reset_config
-from managers.encoder_manager import EncoderDialog
+from managers.encoder_manager import EncoderDialog, write_concat_copy_list
 
 from datetime import datetime, timedelta
 
@@ -112,9 +123,10 @@ from datetime import datetime, timedelta
 
 
 from core.gopro_extractor import (
-    get_video_duration, extract_metadata, get_video_start_time,
-    parse_gps5_data, adjust_gpx_to_video_duration,
-    create_gpx_with_time, resample_to_1s_auto
+    get_video_duration, get_video_start_time,
+    adjust_gpx_to_video_duration,
+    create_gpx_with_time, resample_to_1s_auto,
+    init_chapter_worker, extract_chapter_job
 )
 
 
@@ -137,7 +149,8 @@ class GoProExtractorDialog(QDialog):
         layout.addWidget(self.status_label)
 
         self.progress_bar = QProgressBar()
-        self.progress_bar.setMaximum(len(video_list))
+        # Summe der Fortschritte aller Dateien (je 0..100)
+        self.progress_bar.setMaximum(len(video_list) * 100)
         layout.addWidget(self.progress_bar)
 
         self.text_edit = QTextEdit()
@@ -150,9 +163,17 @@ class GoProExtractorDialog(QDialog):
 
         self.setLayout(layout)
 
-        self.current_video_index = 0
         self.is_cancelled = False
-        self._temp_gpx_files = []  # Liste der temporären GPX-Dateien
+        self._temp_gpx_files = []  # Liste der temporären GPX-Dateien (Reihenfolge wie video_list)
+
+        # Prozess-Pool für die parallele Extraktion
+        self._executor = None
+        self._progress_queue = None
+        self._futures = {}        # Future -> Index in video_list
+        self._results = {}        # Index -> temp GPX (oder None)
+        self._file_progress = [0.0] * len(video_list)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.timeout.connect(self._poll_workers)
 
     def start_extraction(self):
         self.text_append("Starting GoPro GPS extraction...")
@@ -162,168 +183,101 @@ class GoProExtractorDialog(QDialog):
         QTimer.singleShot(100, self.process_next_video)
 
     def process_next_video(self):
+        """
+        Startet alle Videos (Kapitel) parallel in einem Prozess-Pool.
+        Jeder Worker extrahiert + resampled ein Kapitel in eine eigene
+        temporäre GPX-Datei; _poll_workers sammelt Fortschritt und Ergebnisse.
+        """
         if self.is_cancelled:
             self.text_append("\nProcess cancelled by user")
             self.set_finished_state()
             return
 
-        if self.current_video_index >= len(self.video_list):
-            # Alle Videos fertig -> kombinieren
-            self._combine_all_temp_files()
-            return
-
-        video_path = self.video_list[self.current_video_index]
-        self.status_label.setText(
-            f"Processing {self.current_video_index + 1}/{len(self.video_list)}: {os.path.basename(video_path)}"
+        n = len(self.video_list)
+        workers = max(1, min(n, os.cpu_count() or 1))
+        self.text_append(f"Using {workers} parallel worker(s)")
+
+        # spawn: kein fork eines Prozesses mit laufendem Qt
+        ctx = multiprocessing.get_context("spawn")
+        self._progress_queue = ctx.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=init_chapter_worker,
+            initargs=(self._progress_queue,),
         )
-        self.progress_bar.setValue(self.current_video_index + 1)
+        for idx, video_path in enumerate(self.video_list):
+            temp_path = self._chapter_temp_path(idx)
+            future = self._executor.submit(extract_chapter_job, idx, video_path, temp_path)
+            self._futures[future] = idx
 
-        self.text_append(f"\n--- Processing: {os.path.basename(video_path)} ---")
-        QApplication.processEvents()
+        self._update_extraction_status()
+        self._poll_timer.start(100)
 
-        try:
-            # Extrahiere und speichere als temporäre Datei
-            temp_gpx_path = self._process_single_video(video_path)
+    def _poll_workers(self):
+        # Fortschritt der laufenden Worker
+        while True:
+            try:
+                idx, fraction = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._file_progress[idx] = max(self._file_progress[idx], fraction)
+
+        # Fertige Dateien
+        for future in [f for f in self._futures if f.done()]:
+            idx = self._futures.pop(future)
+            name = os.path.basename(self.video_list[idx])
+            self.text_append(f"\n--- Processed {idx + 1}/{len(self.video_list)}: {name} ---")
+            try:
+                _, temp_gpx_path, log = future.result()
+            except Exception as e:
+                temp_gpx_path, log = None, [f"✗ Error in extraction: {e}"]
+            for line in log:
+                self.text_append(line)
             if temp_gpx_path:
-                self._temp_gpx_files.append(temp_gpx_path)
                 self.text_append(f"✓ Saved temporary GPX: {os.path.basename(temp_gpx_path)}")
             else:
-                self.text_append(f"✗ No GPS data for {os.path.basename(video_path)}")
-        except Exception as e:
-            import traceback
-            self.text_append(f"✗ Error in extraction: {e}")
-            self.text_append(traceback.format_exc())
+                self.text_append(f"✗ No GPS data for {name}")
+            self._results[idx] = temp_gpx_path
+            self._file_progress[idx] = 1.0
 
-        # nächstes Video
-        self.current_video_index += 1
-        QTimer.singleShot(400, self.process_next_video)
+        self._update_extraction_status()
 
-    
-    def _process_single_video(self, video_path: str):
-        """Verarbeitet ein einzelnes Video und speichert es als temporäre GPX-Datei"""
-        try:
-            import gc
-            video_duration = get_video_duration(video_path)
-            if not video_duration:
-                self.text_append("✗ Could not get video duration")
-                return None
-    
-            metadata = extract_metadata(video_path)
-            if not metadata:
-                self.text_append("✗ No GPS metadata found in video")
-                return None
-    
-            # Rohpunkte extrahieren (Liste von Tuples (lat,lon,alt,datetime))
-            points = parse_gps5_data(metadata)
-            if not points:
-                self.text_append("✗ No GPS points extracted")
-                return None
-    
-            # -------------------------------------------------------
-            # 1) Sofort in Temp JSON speichern (RAM entlasten)
-            #    save_temp_points kommt aus core.gopro_extractor
-            # -------------------------------------------------------
-            try:
-                from core.gopro_extractor import save_temp_points, load_temp_points
-                temp_json_path = save_temp_points(points, video_path)
-            except Exception as e:
-                temp_json_path = None
-                self.text_append(f"⚠ Could not save temp JSON: {e}")
-    
-            # RAM freigeben (Metadata + raw points)
-            try:
-                del metadata
-                del points
-            except Exception:
-                pass
-            gc.collect()
-    
-            # -------------------------------------------------------
-            # 2) Lade die Punkte (als dicts mit datetime) - nur jetzt
-            # -------------------------------------------------------
-            if temp_json_path:
-                points_dict = load_temp_points(temp_json_path)
-            else:
-                # Fallback: falls save fehlgeschlagen, versuche nochmal parse direkt
-                points = parse_gps5_data(extract_metadata(video_path))
-                points_dict = [
-                    {"lat": lat, "lon": lon, "ele": alt, "time": timestamp}
-                    for (lat, lon, alt, timestamp) in points
-                ]
-    
-            if not points_dict:
-                self.text_append("✗ No GPS points after loading temp JSON")
-                return None
-    
-            # -------------------------------------------------------
-            # 3) Video-Dauer grob anpassen (>0,5s)
-            # -------------------------------------------------------
-            points_adjusted = adjust_gpx_to_video_duration(points_dict, video_duration)
-    
-            # -------------------------------------------------------
-            # 4) Resample auf 1 Hz (import lokal, bereits vorhanden)
-            # -------------------------------------------------------
-            try:
-                from core.gopro_extractor import resample_to_1s_auto
-                points_final = resample_to_1s_auto(points_adjusted)
-                self.text_append(f"→ Resampled to {len(points_final)} points (1s grid)")
-            except Exception as e:
-                self.text_append(f"⚠ Resample skipped due to error: {e}")
-                points_final = points_adjusted
-    
-            # -------------------------------------------------------
-            # 5) Letzten Punkt exakt auf Videolänge bringen (ms auffüllen)
-            # -------------------------------------------------------
-            points_final = self.extend_last_point_to_video(points_final, video_duration)
-    
-            # -------------------------------------------------------
-            # 6) Temporäre GPX-Datei erstellen
-            # -------------------------------------------------------
-            temp_filename = f"KVR_GOPRO_{self.current_video_index:04d}.tmp.gpx"
-            temp_path = os.path.join(MY_GLOBAL_TMP_DIR, temp_filename)
-    
-            from core.gopro_extractor import create_gpx_with_time
-            create_gpx_with_time(points_final, temp_path)
-    
-            # -------------------------------------------------------
-            # 7) Aufräumen: Lösche optional die Temp-JSON-Datei
-            # -------------------------------------------------------
-            try:
-                if temp_json_path and os.path.exists(temp_json_path):
-                    os.remove(temp_json_path)
-                    self.text_append(f"✓ Deleted temp JSON: {os.path.basename(temp_json_path)}")
-            except Exception as e:
-                self.text_append(f"⚠ Could not delete temp JSON: {e}")
-    
-            return temp_path
-    
-        except Exception as e:
-            import traceback
-            self.text_append(f"✗ Extraction error: {e}")
-            self.text_append(traceback.format_exc())
-            return None
-    
-    
-    def extend_last_point_to_video(self, points, video_duration):
-        """
-        Stellt sicher, dass die letzte GPX-Zeit dem Video entspricht.
-        Fügt die Differenz in Millisekunden nur dem letzten Punkt hinzu.
-        Keine Interpolation von lat/lon/ele.
-        """
-        if not points or len(points) < 1:
-            return points
+        if not self._futures:
+            self._shutdown_pool()
+            # Deterministische Reihenfolge: wie in video_list, egal wer zuerst fertig war
+            self._temp_gpx_files = [self._results[i] for i in sorted(self._results)
+                                    if self._results[i]]
+            self._combine_all_temp_files()
 
-        gpx_start = points[0]["time"]
-        gpx_end = points[-1]["time"]
-        gpx_duration = (gpx_end - gpx_start).total_seconds()
-        diff = video_duration - gpx_duration
+    @staticmethod
+    def _chapter_temp_path(idx):
+        return os.path.join(MY_GLOBAL_TMP_DIR, f"KVR_GOPRO_{idx:04d}.tmp.gpx")
 
-        if diff <= 0 or diff < 0.001:  # Kleine Differenz ignorieren
-            return points
+    @staticmethod
+    def _remove_quiet(path):
+        # läuft ggf. im Callback-Thread des Pools => kein Qt hier
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
-        points[-1]["time"] += timedelta(seconds=diff)
-        return points
-        
+    def _update_extraction_status(self):
+        n = len(self.video_list)
+        self.progress_bar.setValue(int(sum(self._file_progress) * 100))
+        running = [os.path.basename(self.video_list[i])
+                   for i, p in enumerate(self._file_progress) if 0.0 < p < 1.0]
+        text = f"Processed {len(self._results)}/{n} videos"
+        if running:
+            text += f" - running: {', '.join(running)}"
+        self.status_label.setText(text)
+
+    def _shutdown_pool(self, cancel=False):
+        self._poll_timer.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=cancel)
+            self._executor = None
+        self._futures = {}
 
     def _combine_all_temp_files(self):
         """Kombiniert alle temporären GPX-Dateien mit korrekter Zeitfortführung"""
@@ -419,8 +373,9 @@ class GoProExtractorDialog(QDialog):
         """Löscht alle temporären Dateien"""
         try:
             # Lösche kombinierte Datei
-            os.remove(combined_path)
-            self.text_append("✓ Combined temp file deleted")
+            if combined_path:
+                os.remove(combined_path)
+                self.text_append("✓ Combined temp file deleted")
             
             # Lösche einzelne temporäre Dateien
             for temp_path in self._temp_gpx_files:
@@ -440,8 +395,16 @@ class GoProExtractorDialog(QDialog):
 
     def cancel_process(self):
         self.is_cancelled = True
+        pending = dict(self._futures)
+        self._shutdown_pool(cancel=True)
         self.text_append("\nProcess cancelled by user")
-        # Aufräumen der temporären Dateien
+        # Aufräumen der temporären Dateien: fertige sofort, laufende Worker
+        # schreiben evtl. noch => deren Datei erst löschen, wenn sie fertig
+        # sind (noch nicht gestartete sind abgebrochen, Callback kommt sofort)
+        self._temp_gpx_files = [p for p in self._results.values() if p]
+        for future, idx in pending.items():
+            future.add_done_callback(
+                lambda _f, path=self._chapter_temp_path(idx): self._remove_quiet(path))
         self._cleanup_temp_files(None)
         self.set_finished_state()
 
@@ -831,6 +794,11 @@ class MainWindow(QMainWindow):
         action_set_mapbox_key.triggered.connect(self._on_set_mapbox_key)
         mapviews_menu.addAction(action_set_mapbox_key)
 
+        # --> lokaler Terrain-RGB-Ordner (z/x/y.png) für "Get Elevation"
+        action_set_ele_tile_dir = QAction("Set Elevation Tile Folder...", self)
+        action_set_ele_tile_dir.triggered.connect(self._on_set_elevation_tile_dir)
+        mapviews_menu.addAction(action_set_ele_tile_dir)
+
         # --> Set Mapillary Key
         action_set_mapillary_key = QAction("Set Mapillary Key...", self)
         action_set_mapillary_key.triggered.connect(self._on_set_mapillary_key)
@@ -1241,10 +1209,9 @@ class MainWindow(QMainWindow):
 
         # map_page.html aufrufen
         if self.map_widget and self.map_widget.view:
-            page = self.map_widget.view.page()
             js_bool = "true" if checked else "false"
             code = f"setDirectionsEnabled({js_bool});"
-            page.runJavaScript(code)
+            self.map_widget.run_js(code)
 
         print(f"[DEBUG] Directions enabled => {checked}")
         
@@ -1273,7 +1240,7 @@ class MainWindow(QMainWindow):
         self.chart.show()
         self.bottom_right_widget.show()
 
-        self.map_widget.view.page().runJavaScript("enableVideoMapMode(false);")
+        self.map_widget.run_js("enableVideoMapMode(false);")
 
         # Update the check state and call handler of "sync all with video" and "directions"
         self.action_new_pts_video_time.setChecked(False)
@@ -1290,7 +1257,7 @@ class MainWindow(QMainWindow):
         self.bottom_right_widget.hide()
 
         self.right_v_layout.addWidget(self.map_widget, stretch=1)
-        self.map_widget.view.page().runJavaScript("enableVideoMapMode(true);")
+        self.map_widget.run_js("enableVideoMapMode(true);")
         self.right_v_layout.update()
 
         # Update the check state and call handler of "sync all with video" and "directions"
@@ -1455,19 +1422,18 @@ class MainWindow(QMainWindow):
         if not self.map_widget or not self.map_widget.view:
             return
 
-        page = self.map_widget.view.page()
         # JS-Aufrufe
         js_mt = f"setMapTilerKey('{self._maptiler_key}')"
-        page.runJavaScript(js_mt)
+        self.map_widget.run_js(js_mt)
 
         js_bi = f"setBingKey('{self._bing_key}')"
-        page.runJavaScript(js_bi)
+        self.map_widget.run_js(js_bi)
 
         js_mb = f"setMapboxKey('{self._mapbox_key}')"
-        page.runJavaScript(js_mb)
+        self.map_widget.run_js(js_mb)
 
         if self._mapillary_key:
-            page.runJavaScript(f"setMapillaryKey('{self._mapillary_key}')")   
+            self.map_widget.run_js(f"setMapillaryKey('{self._mapillary_key}')")   
 
 
     def _on_set_maptiler_key(self):
@@ -1482,6 +1448,17 @@ class MainWindow(QMainWindow):
     def _on_set_mapillary_key(self):
         self._show_key_dialog("mapillary", self._mapillary_key)
 
+    def _on_set_elevation_tile_dir(self):
+        """
+        Lokaler Ordner mit Terrain-RGB-Tiles (<zoom>/<x>/<y>.png), wird bei
+        "Get Elevation" vor Mapbox gefragt. Abbrechen => Ordner entfernen.
+        """
+        s = QSettings("KVRouite", "KVRouite")
+        current = s.value("elevation/tileDir", "", str)
+        folder = QFileDialog.getExistingDirectory(self, "Elevation Tile Folder (z/x/y)", current)
+        s.setValue("elevation/tileDir", folder or "")
+        print(f"[DEBUG] Elevation tile folder => {folder or '(none)'}")
+
     def _show_key_dialog(self, provider_name: str, current_val: str):
         """
         Generischer Dialog zum Eingeben des neuen Keys.
@@ -1574,13 +1551,14 @@ class MainWindow(QMainWindow):
         # NEU: Directions-Status an JS geben
         js_bool = "true" if self._directions_enabled else "false"
         js_code = f"setDirectionsEnabled({js_bool});"
-        self.map_widget.view.page().runJavaScript(js_code)
+        self.map_widget.run_js(js_code)
 
     def _apply_map_sizes_from_settings(self):
         """
         Liest aus QSettings *nur noch* "black", "red", "blue", "yellow"
         und setzt fallback=4 für black/red/blue, fallback=6 für yellow.
-        Anschließend wird colorSizeMap[...] in JavaScript aktualisiert.
+        Anschließend wird colorSizeMap[...] in JavaScript aktualisiert
+        (über updateAllPointsByColor, damit auch die WebGL-Punkte folgen).
         """
         s = QSettings("KVRouite", "KVRouite")
 
@@ -1594,8 +1572,8 @@ class MainWindow(QMainWindow):
         for color_name, default_size in defaults.items():
             size_val = s.value(f"mapSize/{color_name}", default_size, type=int)
             # An JS: colorSizeMap['black']=4 etc.
-            js_code = f"colorSizeMap['{color_name}'] = {size_val};"
-            self.map_widget.view.page().runJavaScript(js_code)
+            js_code = f"updateAllPointsByColor('{color_name}', {size_val});"
+            self.map_widget.run_js(js_code, key=("mapSize", color_name))
 
         print("[DEBUG] colorSizeMap updated in JS with QSettings (color names).")
 
@@ -1626,8 +1604,9 @@ class MainWindow(QMainWindow):
         s.sync()
 
         # Jetzt JS-Funktion anstoßen: updateAllPointsByColor("black", new_val)
-        self.map_widget.view.page().runJavaScript(
-            f"updateAllPointsByColor('{color_str}', {new_val});"
+        self.map_widget.run_js(
+            f"updateAllPointsByColor('{color_str}', {new_val});",
+            key=("mapSize", color_str)
         )
     
         QMessageBox.information(
@@ -1657,7 +1636,7 @@ class MainWindow(QMainWindow):
 
         # Dann direkt mit dem Farbnamen ins JS
         js_code = f"updateAllPointsByColor('{color_lower}', {new_size});"
-        self.map_widget.view.page().runJavaScript(js_code)
+        self.map_widget.run_js(js_code, key=("mapSize", color_lower))
 
         
         
@@ -2022,6 +2001,7 @@ class MainWindow(QMainWindow):
                 set_gpx_video_shift(0.0)
     
                 # Metriken neu berechnen
+                new_gpx = Track.from_points(new_gpx)
                 recalc_gpx_data(new_gpx)
                 self.gpx_widget.set_gpx_data(new_gpx)
                 self._gpx_data = new_gpx
@@ -2032,8 +2012,7 @@ class MainWindow(QMainWindow):
                 if self.mini_chart_widget:
                     self.mini_chart_widget.set_gpx_data(new_gpx)
                 
-                route_geojson = self._build_route_geojson_from_gpx(new_gpx)
-                self.map_widget.loadRoute(route_geojson, do_fit=False)
+                self.map_widget.sync_route(new_gpx, do_fit=False)
     
         else:
             # Nur Video-Cut (kein AutoSync)
@@ -2059,6 +2038,7 @@ class MainWindow(QMainWindow):
             # Entferne den vorhandenen Cut am Anfang
             if existing_begin_cut:
                 self.cut_manager._cut_intervals.remove(existing_begin_cut)
+                self.cut_manager.invalidate_cut_index()
                  # Timeline aktualisieren, indem wir alle Cuts löschen und neu hinzufügen
                 self.timeline.clear_all_cuts()
                 for cut in self.cut_manager._cut_intervals:
@@ -2308,8 +2288,7 @@ class MainWindow(QMainWindow):
             self.mini_chart_widget.set_gpx_data(gpx_data)
 
         # Map neu laden
-        route_geojson = self._build_route_geojson_from_gpx(gpx_data)
-        self.map_widget.loadRoute(route_geojson, do_fit=False)
+        self.map_widget.sync_route(gpx_data, do_fit=False)
         
 
         print(f"[INFO] Inserted new GPX point (DirectionsEnabled={self._directions_enabled}); total now {len(gpx_data)} pts.")
@@ -2330,8 +2309,7 @@ class MainWindow(QMainWindow):
         self._gpx_data = copy.deepcopy(gpx_snapshot)
         self.gpx_widget.set_gpx_data(self._gpx_data)
         self.chart.set_gpx_data(self._gpx_data)
-        geojson = self._build_route_geojson_from_gpx(self._gpx_data)
-        self.map_widget.loadRoute(geojson, do_fit=False)
+        self.map_widget.sync_route(self._gpx_data, do_fit=False)
         if self.mini_chart_widget:
             self.mini_chart_widget.set_gpx_data(self._gpx_data)
         self._update_gpx_overview() 
@@ -2543,6 +2521,7 @@ class MainWindow(QMainWindow):
                 return
     
             # Metriken neu berechnen
+            new_gpx = Track.from_points(new_gpx)
             if recalc_gpx_data is not None:
                 recalc_gpx_data(new_gpx)
             else:
@@ -2557,8 +2536,7 @@ class MainWindow(QMainWindow):
             if self.mini_chart_widget:
                 self.mini_chart_widget.set_gpx_data(new_gpx)
             
-            route_geojson = self._build_route_geojson_from_gpx(new_gpx)
-            self.map_widget.loadRoute(route_geojson, do_fit=False)
+            self.map_widget.sync_route(new_gpx, do_fit=False)
     
             print(f"[DEBUG] End-Cut abgeschlossen: GPX von {len(gpx_data)} auf {len(new_gpx)} Punkte gekürzt")
         ###    
@@ -2663,6 +2641,7 @@ class MainWindow(QMainWindow):
                 return
             
             # 4) Recalc metrics & set new GPX data
+            new_gpx = Track.from_points(new_gpx)
             if recalc_gpx_data is not None:
                 recalc_gpx_data(new_gpx)
             else:
@@ -2677,8 +2656,7 @@ class MainWindow(QMainWindow):
             if self.mini_chart_widget:
                 self.mini_chart_widget.set_gpx_data(new_gpx)
             
-            route_geojson = self._build_route_geojson_from_gpx(new_gpx)
-            self.map_widget.loadRoute(route_geojson, do_fit=False)
+            self.map_widget.sync_route(new_gpx, do_fit=False)
         
         # Clear any red-marked range in GPX list (we've applied the change)
         self.gpx_widget.gpx_list.clear_marked_range()
@@ -2757,7 +2735,7 @@ class MainWindow(QMainWindow):
         print(f"[DEBUG] _on_sync_point_video_time_toggled {checked}")
         self._autoSyncNewPointsWithVideoTime = checked
         self.action_new_pts_video_time.setChecked(checked)
-        self.map_widget.view.page().runJavaScript(f"enableVSyncMode({str(checked).lower()});")
+        self.map_widget.run_js(f"enableVSyncMode({str(checked).lower()});")
         
         if hasattr(self, "_active_gpx_slot") and self._active_gpx_slot in self._gpx_slots:
             self._gpx_slots[self._active_gpx_slot]["sync_enabled"] = checked
@@ -2804,40 +2782,21 @@ class MainWindow(QMainWindow):
             from datetime import timedelta
             effective_start_t = effective_start_t + timedelta(seconds=abs(_shift))
 
+        # Alle Summen/Min/Max kommen aus dem Statistik-Index (Präfixsummen)
+        stats = TrackStats.for_track(data)
+        last_idx = len(data) - 1
+
         # Index des ersten Punkts, der im "sichtbaren" (nicht-grauen) Bereich liegt
         start_idx = 0
         if effective_start_t:
-            for _i, _pt in enumerate(data):
-                _ti = _pt.get("time")
-                if _ti and _ti >= effective_start_t:
-                    start_idx = _i
-                    break
-
-        
+            start_idx = stats.first_index_at_or_after(datetime_to_ns(effective_start_t)) or 0
 
         # 1) Länge in km (ggf. ab "grauem" Start trimmen)
-        
-        total_dist_m = 0.0
-        for i in range(max(1, start_idx + 1), len(data)):
-            total_dist_m += data[i].get("delta_m", 0.0)
-        length_km = total_dist_m / 1000.0
-
+        length_km = stats.distance_m(start_idx, last_idx) / 1000.0
 
-        
-        ####
-    
         # 2) Höhengewinn
-        
-        elev_gain = 0.0
-        for i in range(max(1, start_idx + 1), len(data)):
-            dh = data[i].get("ele", 0.0) - data[i-1].get("ele", 0.0)
-            if dh > 0:
-                elev_gain += dh
-
-
-        
+        elev_gain = stats.climb_m(start_idx, last_idx)
 
-                
         # 3) GPX-Dauer berechnen (ggf. ab "grauem" Start)
         start_t = data[0].get("time")
         end_t   = data[-1].get("time")
@@ -2880,33 +2839,18 @@ class MainWindow(QMainWindow):
         video_time_str = self._format_duration_with_ms(final_dur)
         # 5) Weitere Werte wie slope_max/min etc.
         # 5) Slope/Gradient (ab start_idx)
-        slope_vals = [pt.get("gradient", 0.0) for pt in data[start_idx:]]
-        slope_max = max(slope_vals) if slope_vals else 0.0
-        slope_min = min(slope_vals) if slope_vals else 0.0
+        slope_max = stats.max_value("gradient", start_idx, last_idx)
+        slope_min = stats.min_value("gradient", start_idx, last_idx)
 
-    
         zero_thr = self.chart.zero_speed_threshold()
-        zero_speed_count = 0
-        for i in range(max(1, start_idx + 1), len(data)):
-            if data[i].get("speed_kmh", 0.0) < zero_thr:
-                zero_speed_count += 1
+        zero_speed_count = stats.count_below("speed_kmh", zero_thr, start_idx, last_idx)
 
-    
         # Pausen/Lücken (ab start_idx)
-        paused_count = 0
-        t0 = data[start_idx].get("time")
-        if t0:
-            for i in range(max(1, start_idx + 1), len(data)):
-                t_prev = data[i-1].get("time")
-                t_cur  = data[i].get("time")
-                if t_prev and t_cur:
-                    dt = (t_cur - t_prev).total_seconds()
-                    if dt > 1.0:
-                        paused_count += 1
+        if data[start_idx].get("time"):
+            paused_count = stats.pause_count(start_idx, last_idx)
         else:
             paused_count = len(data) - start_idx
 
-    
         # 6) An Dein gpx_control_widget übergeben
         self.gpx_control.update_info_line(
             video_time_str=video_time_str,     # Das ist Deine Video-Dauer
@@ -3019,7 +2963,7 @@ class MainWindow(QMainWindow):
             self._gpx_data[index]["lat"] = lat
             self._gpx_data[index]["lon"] = lon
             
-            recalc_gpx_data(self._gpx_data)
+            self._partial_recalc_gpx(index)
             
 
             # Falls du Distanz/Speed neu berechnen willst => optional
@@ -3039,69 +2983,6 @@ class MainWindow(QMainWindow):
 
     
 
-    def _build_route_geojson_from_gpx(self, data):
-        """
-        data: Liste von Dicts => [{'lat':..., 'lon':...}, ...]
-        Gibt FeatureCollection mit 1x Linestring + Nx Points zurück,
-        wobei jeder Point => properties.index = i hat.
-        """
-        features = []
-        positive_time = data[0].get("time") or 0.0
-        if get_gpx_video_shift() < 0: #extra points at begin
-            positive_time = positive_time + timedelta(seconds = abs(get_gpx_video_shift()))
-
-        # Linestring-Koords
-        coords_line = []
-        outside_line = []
-        for i, pt in enumerate(data):
-            if pt.get("time") or 0.0 >= positive_time:
-                coords_line.append([pt["lon"], pt["lat"]])
-            else:
-                outside_line.append([pt["lon"], pt["lat"]])
-
-        line_feat = {
-            "type": "Feature",
-            "geometry": {
-                "type": "LineString",
-                "coordinates": coords_line
-            },
-            "properties": { "color":"#000000"  }
-        }
-        features.append(line_feat)
-
-        if outside_line:
-            outside_line.append(coords_line[0])
-            outside_line_feat = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": outside_line
-                },
-                "properties": { "color":"grey" }
-            }
-            features.append(outside_line_feat)
-
-        # Einzelne Punkt-Features
-        for i, pt in enumerate(data):
-            point_feat = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [pt["lon"], pt["lat"]]
-                },
-                "properties": {
-                    "index": i,
-                    "color": "#000000" if (pt.get("time") or 0.0) >= positive_time else "grey", 
-                }
-            }
-            features.append(point_feat)
-
-        return {
-            "type": "FeatureCollection",
-            "features": features
-        }
-
-    
     # -----------------------------------------------------------------------
     # Methoden und Slots (weitgehend unverändert)
     # -----------------------------------------------------------------------
@@ -3379,7 +3260,11 @@ class MainWindow(QMainWindow):
    
     # Im MainWindow (oder ImportExportManager, wo du es hast)
     def start_indexing_process(self, video_path):
-       
+        # Schon einmal indiziert (gleicher Inhalt)? => sofort aus dem Cache
+        cached = load_cached_keyframes(video_path)
+        if cached is not None:
+            self._apply_video_keyframes(video_path, cached)
+            return
 
         dlg = _IndexingDialog(video_path, parent=self)
         dlg.indexing_extracted.connect(self.on_extract_finished)
@@ -3405,22 +3290,46 @@ class MainWindow(QMainWindow):
     def on_extract_finished(self, video_path, temp_dir):
         """
         Wird aufgerufen, wenn das Indexing-Tool die CSV-Datei erstellt hat.
-        Hier rufen wir dann self.run_merge(...) auf.
+        Die Keyframes landen im dauerhaften Cache und direkt in global_keyframes.
         """
-        print("[DEBUG] on_extract_finished => rufe run_merge an ...")
-    
-        
         base_name = os.path.splitext(os.path.basename(video_path))[0]
     
         # BAUE den CSV-Dateinamen
         csv_path = os.path.join(temp_dir, f"keyframes_{base_name}_ffprobe.csv")
+        try:
+            local_times = read_ffprobe_keyframe_csv(csv_path)
+        except OSError as e:
+            print("[DEBUG] Keyframe-CSV nicht lesbar:", e)
+            QMessageBox.warning(self, "Merge Error", "Merge step failed.")
+            return
     
-        # Jetzt run_merge aufrufen
-        self.run_merge(
-            video_path=video_path,
-            csv_file=csv_path,     # <-- Hier definieren wir csv_path
-            temp_dir=temp_dir
-        )
+        store_keyframes(video_path, local_times)
+        self._apply_video_keyframes(video_path, local_times)
+
+    def _apply_video_keyframes(self, video_path, local_times):
+        """Übernimmt die Keyframes eines Videos (lokale Zeiten) in global_keyframes."""
+        offset_value = self._get_offset_for_filepath(video_path)
+        self.global_keyframes.extend(round(t + offset_value, 6) for t in local_times)
+        self.global_keyframes = sorted(set(self.global_keyframes))
+        print("[DEBUG] %d Keyframes global geladen (gesamt)." % len(self.global_keyframes))
+
+    @property
+    def global_keyframes(self):
+        return self._global_keyframes
+
+    @global_keyframes.setter
+    def global_keyframes(self, times):
+        # Jede neue Liste => Index neu bauen (lazy). Änderungen bitte immer
+        # per Zuweisung, nicht nur per extend()/append() in place.
+        self._global_keyframes = times
+        self._global_keyframe_index = None
+
+    @property
+    def global_keyframe_index(self) -> KeyframeIndex:
+        """Sortierter Index über global_keyframes (für Keyframe-Stepping)."""
+        if self._global_keyframe_index is None:
+            self._global_keyframe_index = KeyframeIndex(self._global_keyframes or [])
+        return self._global_keyframe_index
     
     # -----------------------------------------------------------------------
     # Detach-Funktionen Video
@@ -3668,8 +3577,7 @@ class MainWindow(QMainWindow):
         if self.mini_chart_widget:
             self.mini_chart_widget.set_gpx_data(gpx_data)
 
-        route_geojson = self._build_route_geojson_from_gpx(gpx_data)
-        self.map_widget.loadRoute(route_geojson, do_fit=True)
+        self.map_widget.sync_route(gpx_data, do_fit=True)
         self._apply_map_sizes_from_settings()
         self._update_gpx_overview()
         self.check_gpx_errors(gpx_data)
@@ -3696,8 +3604,7 @@ class MainWindow(QMainWindow):
             self.mini_chart_widget.set_gpx_data(data)
 
         # 4) Map zuletzt – sie benutzt nun den korrekten Shift
-        route_geojson = self._build_route_geojson_from_gpx(data)
-        self.map_widget.loadRoute(route_geojson, do_fit=True)
+        self.map_widget.sync_route(data, do_fit=True)
 
         # 5) Slot-spezifische B/E-Markierungen wiederherstellen
         lw = self.gpx_widget.gpx_list
@@ -3836,18 +3743,11 @@ class MainWindow(QMainWindow):
         self.save_recent_file(file_path)
     
     def process_open_gpx(self, file_path, mode="new"):
-        self.map_widget.view.page().runJavaScript("showLoading('Loading GPX...');")
+        self.map_widget.run_js("showLoading('Loading GPX...');", flush=True)
         QApplication.processEvents()
     
         # parse, ensureIDs, etc.
-        new_data = parse_gpx(file_path)
-        
-        for pt in new_data:
-            if isinstance(pt.get("time"), str):
-                try:
-                    pt["time"] = datetime.fromisoformat(pt["time"].replace("Z", "+00:00"))
-                except Exception:
-                    pass
+        new_data = parse_gpx(file_path, progress_callback=self._on_gpx_parse_progress)
 
         # Prüfen ob Resample nötig ist
         if self._check_gpx_step_intervals(new_data):
@@ -3855,7 +3755,7 @@ class MainWindow(QMainWindow):
         
         if not new_data:
             QMessageBox.warning(self, "Load GPX", "File is empty or invalid.")
-            self.map_widget.view.page().runJavaScript("hideLoading();")
+            self.map_widget.run_js("hideLoading();", flush=True)
             return
     
         if mode == "new":
@@ -3885,7 +3785,7 @@ class MainWindow(QMainWindow):
             if not self._gpx_data:
                 # --- Append ausschließlich in Slot 1 ---
                 base = self._gpx_slots[1]["gpx_data"] or []
-                merged = (base + new_data) if base else list(new_data)
+                merged = (base + new_data) if base else new_data.copy()
                 self._gpx_slots[1]["gpx_data"] = merged
                 # Slot-1 UI nur aktualisieren, wenn Slot 1 aktiv ist
                 if self._active_gpx_slot == 1:
@@ -3905,17 +3805,22 @@ class MainWindow(QMainWindow):
                 shift_dt = gap_start - new_data[0]["time"]
     
                 shift_s = shift_dt.total_seconds()
-                for pt in new_data:
-                    pt["time"] = pt["time"] + shift_dt
+                new_data.shift_time(shift_dt)
     
                 merged_data = old_data + new_data
                 recalc_gpx_data(merged_data)
                 self._set_gpx_data(merged_data)
                 QMessageBox.information(self, "Load GPX", "GPX appended successfully.")
     
-        self.map_widget.view.page().runJavaScript("hideLoading();")
+        self.map_widget.run_js("hideLoading();", flush=True)
         self.proposeVideoGpxSync()
     
+    def _on_gpx_parse_progress(self, bytes_read: int, total_bytes: int):
+        """Fortschritt von parse_gpx im Lade-Hinweis der Karte anzeigen."""
+        pct = int(100 * bytes_read / total_bytes) if total_bytes else 100
+        self.map_widget.run_js(f"setLoadingText('Loading GPX... {pct}%');", flush=True)
+        QApplication.processEvents()
+
     def update_timeline_marker(self):
         
         self.check_and_handle_video_end()        
@@ -4058,10 +3963,13 @@ class MainWindow(QMainWindow):
     
     
     def rebuild_timeline(self):
+        # Ein ffprobe pro neuer Datei, parallel; bekannte Videos kommen
+        # aus dem Speicher von core.media_probe.
+        infos = probe_many(self.playlist)
         self.video_durations = []
         offset = 0.0
-        for path in self.playlist:
-            dur = self.get_video_length_ffprobe(path)
+        for info in infos:
+            dur = info["duration"] if info is not None and info["duration"] > 0 else 0.0
             self.video_durations.append(dur)
             offset += dur
         self.real_total_duration = offset
@@ -4080,66 +3988,14 @@ class MainWindow(QMainWindow):
         self._update_gpx_overview()
 
     def get_video_length_ffprobe(self, filepath):
-        cmd = [
-            "ffprobe", "-v", "quiet", "-of", "csv=p=0",
-            "-show_entries", "format=duration", filepath
-        ]
         try:
-            out = subprocess.check_output(cmd, stderr=subprocess.STDOUT)
-            val = float(out.strip())
+            val = media_duration(filepath)
             if val > 0:
                 return val
             return 0.0
         except:
             return 0.0
 
-    def run_merge(self, video_path, csv_file, temp_dir):
-        print("[DEBUG] run_merge => direkt merge_keyframes_incremental aufrufen ...")
-        offset_value = self._get_offset_for_filepath(video_path)
-        label = os.path.basename(video_path)
-        json_file = os.path.join(temp_dir, "merged_keyframes.json")
-    
-        try:
-            merge_keyframes_incremental(
-                csv_file=csv_file,
-                json_file=json_file,
-                label=label,
-                offset=offset_value,
-                do_sort=True
-            )
-            # Danach ggf. self.on_indexing_finished(temp_dir) aufrufen
-            self.on_indexing_finished(temp_dir)
-
-        except Exception as e:
-            print("Fehler beim Merge:", e)
-            QMessageBox.warning(self, "Merge Error", "Merge step failed.")
-
-    def on_indexing_finished(self, temp_dir):
-        merged_json = os.path.join(temp_dir, "merged_keyframes.json")
-        if not os.path.exists(merged_json):
-            print("[DEBUG] merged_keyframes.json nicht gefunden in", temp_dir)
-            return
-
-        try:
-            with open(merged_json, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            new_kfs = []
-            for entry in data:
-                try:
-                    gt = float(entry.get("global_time", 0.0))
-                    new_kfs.append(gt)
-                except:
-                    pass
-            new_kfs.sort()
-
-            self.global_keyframes.extend(new_kfs)
-            self.global_keyframes = sorted(set(self.global_keyframes))
-            print("[DEBUG] %d Keyframes global geladen (gesamt)." % len(self.global_keyframes))
-
-        except Exception as e:
-            print("[DEBUG] Fehler beim Laden der JSON:", e)
-
     # -----------------------------------------------------------------------
     # Marker- und Player-Funktionen ...
     # -----------------------------------------------------------------------
@@ -4529,52 +4385,78 @@ class MainWindow(QMainWindow):
 
        
         tmp_dir = MY_GLOBAL_TMP_DIR  # denselben Ordner nutzen
-        
+        os.makedirs(tmp_dir, exist_ok=True)
 
         # 2) Statt direkt ffmpeg aufzurufen => wir bauen eine Liste an Commands
         segment_commands = []
         segment_files = []
         seg_index = 0
 
-        for (global_start, global_end) in keep_intervals:
-            partials = self._resolve_partial_intervals(global_start, global_end)
-            for (vid_idx, local_st, local_en) in partials:
-                source_path = self.playlist[vid_idx]
-                seg_len = local_en - local_st
-                if seg_len <= 0.01:
-                    continue
-                out_segment = os.path.join(tmp_dir, f"segment_{seg_index:03d}.mp4")
-                segment_files.append(out_segment)
-
-                cmd = [
-                    "ffmpeg", "-y",
-                    "-ss", f"{local_st:.3f}",
-                    "-to", f"{local_en:.3f}",
-                    "-i", source_path,
-                    "-c", "copy",
-                    out_segment
-                ]
-                segment_commands.append(cmd)
-                seg_index += 1
+        # Single-Process: alle Keep-Bereiche per inpoint/outpoint in EINER
+        # Concat-Liste => ein ffmpeg-Aufruf, keine segment_XXX.mp4.
+        # Gleicher Schalter + Default wie beim Encoder-Export (aus),
+        # einstellbar im Encoder-Setup ("Single process").
+        single_process = QSettings("KVRouite", "KVRouite").value(
+            "encoder/single_process", False, type=bool)
+        if single_process:
+            entries = []
+            for (global_start, global_end) in keep_intervals:
+                for (vid_idx, local_st, local_en) in self._resolve_partial_intervals(global_start, global_end):
+                    if local_en - local_st > 0.01:
+                        entries.append((self.playlist[vid_idx], local_st, local_en))
+            concat_file = os.path.join(tmp_dir, "concat_list.txt")
+            write_concat_copy_list(entries, concat_file)
+            final_cmd = [
+                "ffmpeg", "-y",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", concat_file,
+                "-c", "copy",
+                out_file
+            ]
+            print(f"[INFO] Single-Process-Export: {len(entries)} Bereiche, ein ffmpeg-Aufruf")
+        else:
+            for (global_start, global_end) in keep_intervals:
+                partials = self._resolve_partial_intervals(global_start, global_end)
+                for (vid_idx, local_st, local_en) in partials:
+                    source_path = self.playlist[vid_idx]
+                    seg_len = local_en - local_st
+                    if seg_len <= 0.01:
+                        continue
+                    out_segment = os.path.join(tmp_dir, f"segment_{seg_index:03d}.mp4")
+                    segment_files.append(out_segment)
+
+                    cmd = [
+                        "ffmpeg", "-y",
+                        "-ss", f"{local_st:.3f}",
+                        "-to", f"{local_en:.3f}",
+                        "-i", source_path,
+                        "-c", "copy",
+                        out_segment
+                    ]
+                    segment_commands.append(cmd)
+                    seg_index += 1
 
         # 3) Concat-File
-        concat_file = os.path.join(tmp_dir, "concat_list.txt")
-        with open(concat_file, "w") as f:
-            for segpath in segment_files:
-                f.write(f"file '{segpath}'\n")
-
-        final_cmd = [
-            "ffmpeg", "-y",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", concat_file,
-            "-c", "copy",
-            out_file
-        ]
+        if not single_process:
+            concat_file = os.path.join(tmp_dir, "concat_list.txt")
+            with open(concat_file, "w") as f:
+                for segpath in segment_files:
+                    f.write(f"file '{segpath}'\n")
+
+            final_cmd = [
+                "ffmpeg", "-y",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", concat_file,
+                "-c", "copy",
+                out_file
+            ]
 
         # 4) Nun unser asynchroner Dialog
         dlg = _SafeExportDialog(self)
         dlg.set_commands(segment_commands, final_cmd, out_file)
+        dlg.set_total_duration(final_duration_s)
         dlg.start_export()  # startet direkt den ersten ffmpeg-Aufruf
         dlg.exec()
 
@@ -4598,30 +4480,9 @@ class MainWindow(QMainWindow):
     def _compute_keep_intervals(self, cut_intervals, total_duration):
         if not cut_intervals:
             return [(0.0, total_duration)]
-
-        sorted_cuts = sorted(cut_intervals, key=lambda x: x[0])
-        merged = []
-        current_start, current_end = sorted_cuts[0]
-        for i in range(1, len(sorted_cuts)):
-            (st, en) = sorted_cuts[i]
-            if st <= current_end:
-                if en > current_end:
-                    current_end = en
-            else:
-                merged.append((current_start, current_end))
-                current_start, current_end = st, en
-        merged.append((current_start, current_end))
-
-        keep_list = []
-        pos = 0.0
-        for (cst, cen) in merged:
-            if cst > pos:
-                keep_list.append((pos, cst))
-            pos = cen
-        if pos < total_duration:
-            keep_list.append((pos, total_duration))
-
-        return keep_list
+        if cut_intervals is self.cut_manager._cut_intervals:
+            return list(self.cut_manager.cut_index(total_duration).keeps)
+        return list(CutIndex(cut_intervals, total_duration).keeps)
 
     def _resolve_partial_intervals(self, global_start, global_end):
         results = []
@@ -4688,24 +4549,8 @@ class MainWindow(QMainWindow):
         if not cut_intervals:
             return min(global_s, total_dur)
 
-        keep_list = self._compute_keep_intervals(cut_intervals, total_dur)
-        final_time = 0.0
-        EPS = 1e-9
-
-        for (kstart, kend) in keep_list:
-            seg_len = (kend - kstart)
-            if global_s < (kstart - EPS):
-                break
-            elif abs(global_s - kstart) <= EPS:
-                # exact Start => final bleibt am Ende des letzten
-                return final_time
-            elif kstart <= global_s < (kend - EPS):
-                final_time += (global_s - kstart)
-                return final_time
-            else:
-                final_time += seg_len
-
-        return final_time
+        # CutIndex wird nur bei geänderten Cuts neu gebaut => O(log n) pro Tick
+        return self.cut_manager.cut_index(total_dur).global_to_final(global_s)
         
         
     def get_global_time_for_final(self, final_s: float) -> float:
@@ -4718,22 +4563,7 @@ class MainWindow(QMainWindow):
         if not cut_intervals:
             return min(final_s, total_dur)
 
-        keep_list = self._compute_keep_intervals(cut_intervals, total_dur)
-        remaining = final_s
-        EPS = 1e-9
-
-        for (seg_start, seg_end) in keep_list:
-            seg_len = (seg_end - seg_start)
-
-            if remaining < seg_len - EPS:
-                return seg_start + remaining
-            elif abs(remaining - seg_len) <= EPS:
-                # exakt Segmentende => Skip in den Anfang des nächsten Keep
-                remaining = 0.0
-            else:
-                remaining -= seg_len
-
-        return total_dur    
+        return self.cut_manager.cut_index(total_dur).final_to_global(final_s)
 
     def on_set_video_gpx_sync_clicked(self):
         """
@@ -4777,8 +4607,7 @@ class MainWindow(QMainWindow):
                 self._on_sync_point_video_time_toggled(True)
             
             if(get_gpx_video_shift() < 0): # color negative points in grey
-                route_geojson = self._build_route_geojson_from_gpx(self._gpx_data)
-                self.map_widget.loadRoute(route_geojson, do_fit=False)
+                self.map_widget.sync_route(self._gpx_data, do_fit=False)
             if self._edit_mode != "off":
                 self.video_control.set_editing_mode(True,True) #to refresh the button state
             self._update_gpx_overview()
@@ -5272,12 +5101,8 @@ class MainWindow(QMainWindow):
     
             # (1) Compute the total 2D distance from b_idx.. e_idx
             #     Summation of each segment's distance in [b_idx.. e_idx-1].
-            total_2d = 0.0
-            for i in range(b_idx, e_idx):
-                la1, lo1 = gpx_data[i]["lat"], gpx_data[i]["lon"]
-                la2, lo2 = gpx_data[i+1]["lat"], gpx_data[i+1]["lon"]
-                dist_2d = self._haversine_m(la1, lo1, la2, lo2)
-                total_2d += dist_2d
+            stats = TrackStats.for_track(gpx_data)
+            total_2d = stats.distance_2d_m(b_idx, e_idx)
     
             if total_2d < 0.01:
                 QMessageBox.warning(self, "Zero Distance",
@@ -5339,16 +5164,11 @@ class MainWindow(QMainWindow):
             #     Keep ele[b_idx] as it is, 
             #     then for each i in [b_idx+1.. e_idx], 
             #     compute the cumulative distance from b_idx to i.
-            def cumulative_distance(b_i, i_i):
-                dist_sum = 0.0
-                for x in range(b_i, i_i):
-                    la1, lo1 = gpx_data[x]["lat"], gpx_data[x]["lon"]
-                    la2, lo2 = gpx_data[x+1]["lat"], gpx_data[x+1]["lon"]
-                    dist_sum += self._haversine_m(la1, lo1, la2, lo2)
-                return dist_sum
+            #     (einmal holen: die ele-Änderungen unten ändern den Track)
+            cum_dist = TrackStats.for_track(gpx_data).cumulative_2d(b_idx, e_idx).tolist()
     
             for i in range(b_idx+1, e_idx+1):
-                dist_i = cumulative_distance(b_idx, i)
+                dist_i = cum_dist[i - b_idx]
                 # slope-based new altitude
                 new_ele_i = ele_b + (new_slope / 100.0) * dist_i
                 gpx_data[i]["ele"] = new_ele_i
@@ -5385,7 +5205,7 @@ class MainWindow(QMainWindow):
     def _partial_recalc_gpx(self, i: int):
         """
         Neuberechnung nur für index i und i+1 
-        (sowie i-1.. i, falls i>0)
+        (delta_m/speed/gradient hängen nur vom Vorgänger ab)
         """
        
         gpx = self.gpx_widget.gpx_list._gpx_data
@@ -5393,22 +5213,10 @@ class MainWindow(QMainWindow):
         if n < 2:
             return
 
-        start_i = max(0, i-1)
-        end_i   = min(n-1, i+1)
-
-        # => Einfacher Weg: extrahiere Subarray, recalc, schreibe zurück
-        sub = gpx[start_i:end_i+1]
-
-        # recalc_gpx_data kann das gesamte Array => wir machen 
-        # --> Variante A) sub
-        # --> Variante B) In-Place code (selber berechnen).
-
-        # Hier der "grosse" Weg: wir rufen recalc_gpx_data auf ALLE, 
-        # ist simpler & kein Performanceproblem
-       
-        recalc_gpx_data(gpx)
-
-        # Falls du nur sub recalc willst, ist das aufwändiger.
+        if isinstance(gpx, Track):
+            recalc_range(gpx, i, i + 1)
+        else:
+            recalc_gpx_data(gpx)
         
         
     
@@ -5419,7 +5227,7 @@ class MainWindow(QMainWindow):
         """
         js_code = (f"addOrUpdatePoint('{stable_id}', {lat}, {lon}, "
                 f"'{color}', {size});")
-        self.map_widget.view.page().runJavaScript(js_code)
+        self.map_widget.run_js(js_code)
 
     def remove_point_on_map(self, stable_id: str):
         """
@@ -5428,7 +5236,7 @@ class MainWindow(QMainWindow):
         
 
         js_code = f"removePoint('{stable_id}');"
-        self.map_widget.view.page().runJavaScript(js_code)
+        self.map_widget.run_js(js_code)
 
     
     def _on_new_project_triggered(self):
@@ -5494,6 +5302,7 @@ class MainWindow(QMainWindow):
         # --- 3) Timeline & Cuts vollständig zurücksetzen ---
         try:
             self.cut_manager._cut_intervals.clear()
+            self.cut_manager.invalidate_cut_index()
             self.cut_manager.markB_time_s = -1.0
             self.cut_manager.markE_time_s = -1.0
 
@@ -5543,7 +5352,7 @@ class MainWindow(QMainWindow):
                 )
                 # Optional: Directions/Profile-Buttons verstecken
                 try:
-                    self.map_widget.view.page().runJavaScript("setDirectionsEnabled(false);")
+                    self.map_widget.run_js("setDirectionsEnabled(false);")
                 except Exception:
                     pass
             except Exception:
@@ -5899,11 +5708,11 @@ class MainWindow(QMainWindow):
     def _on_map_plus(self):
         # Angenommen, du hast in map_page.html JS-Funktionen "mapZoomIn()"
         js_code = "mapZoomIn();"
-        self.map_widget.view.page().runJavaScript(js_code)
+        self.map_widget.run_js(js_code)
     
     def _on_map_minus(self):
         js_code = "mapZoomOut();"
-        self.map_widget.view.page().runJavaScript(js_code)
+        self.map_widget.run_js(js_code)
 
     def ordered_insert_new_point(self,lat: float, lon: float, video_time: float) -> int:
         print(f"[DEBUG] ordered_insert_new_point => video_time={video_time}")
@@ -5969,8 +5778,7 @@ class MainWindow(QMainWindow):
             self.chart.set_gpx_data(gpx_snapshot)
             if self.mini_chart_widget:
                 self.mini_chart_widget.set_gpx_data(gpx_snapshot)
-            route_geojson = self._build_route_geojson_from_gpx(gpx_snapshot)
-            self.map_widget.loadRoute(route_geojson, do_fit=False)
+            self.map_widget.sync_route(gpx_snapshot, do_fit=False)
 
         self._undo_stack.append(undo)
 
@@ -5979,6 +5787,7 @@ class MainWindow(QMainWindow):
 
         def undo():
             self.cut_manager._cut_intervals = copy.deepcopy(snapshot)
+            self.cut_manager.invalidate_cut_index()
             self.timeline.clear_all_cuts()
             for (start, end) in snapshot:
                 self.timeline.add_cut_interval(start, end)
@@ -6008,7 +5817,7 @@ class MainWindow(QMainWindow):
 
     def save_project(self):
         """
-        Speichert das aktuelle Projekt in eine JSON-Datei.
+        Speichert das aktuelle Projekt (Binärformat, siehe core/project_file.py).
         """
         filename, _ = QFileDialog.getSaveFileName(self, "Save Project", "", "KVRouite Project (*.KVRouiteproj)")
         if not filename:
@@ -6019,7 +5828,7 @@ class MainWindow(QMainWindow):
             "playlist": self.playlist,
             "video_durations": self.video_durations,
             "global_keyframes": self.global_keyframes,
-            "gpx_data": self.gpx_widget.gpx_list._gpx_data,
+            "gpx_data": as_track(self.gpx_widget.gpx_list._gpx_data),
             "cut_intervals": self.cut_manager._cut_intervals,
             "gpx_markers": {
                 "markB_idx": self.gpx_widget.gpx_list._markB_idx,
@@ -6031,8 +5840,7 @@ class MainWindow(QMainWindow):
             project_data["gpx_video_shift"]= get_gpx_video_shift() 
     
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(project_data, f, indent=2, default=str)
+            save_project_file(filename, project_data)
             QMessageBox.information(self, "Project Saved", f"Project saved to:\n{filename}")
             self.save_recent_file(filename)
         except Exception as e:
@@ -6083,8 +5891,8 @@ class MainWindow(QMainWindow):
     
     def process_open_project(self, filename: str):
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                project_data = json.load(f)
+            # Binärformat (memory-mapped) oder altes JSON-Format
+            project_data = load_project_file(filename)
 
             # 1. Playlist und Videolängen
             self.playlist = project_data.get("playlist", [])
@@ -6098,20 +5906,15 @@ class MainWindow(QMainWindow):
             self.video_durations = project_data.get("video_durations", [])
             self.rebuild_timeline()
 
-            # 2. GPX-Daten laden + reparieren (datetime aus String machen)
-            gpx_data = project_data.get("gpx_data", [])
-            for pt in gpx_data:
-                if "time" in pt and isinstance(pt["time"], str):
-                    try:
-                        pt["time"] = datetime.fromisoformat(pt["time"])
-                    except Exception:
-                        pass  # Falls Zeit kaputt, bleibt String
+            # 2. GPX-Daten (bereits als Track)
+            gpx_data = project_data["gpx_data"]
 
             self._gpx_data = gpx_data
             self.gpx_widget.gpx_list._gpx_data = gpx_data
 
             # 3. Cuts laden
             self.cut_manager._cut_intervals = project_data.get("cut_intervals", [])
+            self.cut_manager.invalidate_cut_index()
             if self.video_durations:
                 total_duration = sum(self.video_durations)
                 self.timeline.set_total_duration(total_duration)
@@ -6164,8 +5967,7 @@ class MainWindow(QMainWindow):
             if self.mini_chart_widget:
                 self.mini_chart_widget.set_gpx_data(gpx_data)
 
-            route_geojson = self._build_route_geojson_from_gpx(gpx_data)
-            self.map_widget.loadRoute(route_geojson, do_fit=True)
+            self.map_widget.sync_route(gpx_data, do_fit=True)
 
             self._update_gpx_overview()
 
@@ -6604,53 +6406,26 @@ class MainWindow(QMainWindow):
         
     
     
-    def _resample_to_1s(self, gpx_data: list[dict]) -> list[dict]:
+    def _resample_to_1s(self, gpx_data):
         
 
         if not gpx_data or len(gpx_data) < 2:
             return gpx_data
 
         # Schritt 1: Alle Punkte in Sekunden ab Start
-        base_time = gpx_data[0]["time"]
-        for pt in gpx_data:
-            pt["abs_s"] = (pt["time"] - base_time).total_seconds()
-
-        new_data = []
-        target_s = 0
-        total_s = int((gpx_data[-1]["time"] - gpx_data[0]["time"]).total_seconds())
-
-        i = 0
-        while target_s <= total_s and i < len(gpx_data) - 1:
-            while i < len(gpx_data) - 2 and gpx_data[i + 1]["abs_s"] < target_s:
-                i += 1
-
-            pt1 = gpx_data[i]
-            pt2 = gpx_data[i + 1]
-            s1 = pt1["abs_s"]
-            s2 = pt2["abs_s"]
-
-            if s2 == s1:
-                ratio = 0
-            else:
-                ratio = (target_s - s1) / (s2 - s1)
-
-            # Interpolation entlang der Strecke
-            lat = pt1["lat"] + ratio * (pt2["lat"] - pt1["lat"])
-            lon = pt1["lon"] + ratio * (pt2["lon"] - pt1["lon"])
-            ele = pt1.get("ele", 0.0) + ratio * (pt2.get("ele", 0.0) - pt1.get("ele", 0.0))
-
-            new_pt = {
-                "lat": lat,
-                "lon": lon,
-                "ele": ele,
-                "time": base_time + timedelta(seconds=target_s),
-                "delta_m": 0.0,
-                "speed_kmh": 0.0,
-                "gradient": 0.0
-            }
-            new_data.append(new_pt)
-            target_s += 1
-
+        track = as_track(gpx_data)
+        t_ns = track.time_ns()
+        abs_s = (t_ns - t_ns[0]) / 1e9
+        total_s = int(abs_s[-1])
+
+        # Schritt 2: lineare Interpolation entlang der Strecke auf volle Sekunden
+        target_s = np.arange(total_s + 1, dtype=np.float64)
+        lat = np.interp(target_s, abs_s, track.column("lat"))
+        lon = np.interp(target_s, abs_s, track.column("lon"))
+        ele = np.interp(target_s, abs_s, np.nan_to_num(track.column("ele"), nan=0.0))
+        new_times = t_ns[0] + np.arange(total_s + 1, dtype=np.int64) * 1_000_000_000
+
+        new_data = Track.from_columns(lat, lon, ele, new_times, tzinfo=track.tzinfo)
         recalc_gpx_data(new_data)
         return new_data
 
@@ -6722,8 +6497,7 @@ class MainWindow(QMainWindow):
         set_gpx_video_shift(0)
 
         # Route IMMER neu laden, damit grau sofort verschwindet
-        route_geojson = self._build_route_geojson_from_gpx(self._gpx_data)
-        self.map_widget.loadRoute(route_geojson, do_fit=False)
+        self.map_widget.sync_route(self._gpx_data, do_fit=False)
     
         # GPX-Liste & Controls refreshen
         self.gpx_widget.gpx_list.set_gpx_data(self._gpx_data)
@@ -6807,7 +6581,7 @@ class MainWindow(QMainWindow):
     
     def process_open_fit(self, file_path, mode="new"):
         """Verarbeitet die FIT-Datei und konvertiert sie zu GPX-Daten"""
-        self.map_widget.view.page().runJavaScript("showLoading('Loading FIT...');")
+        self.map_widget.run_js("showLoading('Loading FIT...');", flush=True)
         QApplication.processEvents()
     
         try:
@@ -6816,7 +6590,7 @@ class MainWindow(QMainWindow):
             
             if not fit_data:
                 QMessageBox.warning(self, "Load FIT", "File is empty or invalid.")
-                self.map_widget.view.page().runJavaScript("hideLoading();")
+                self.map_widget.run_js("hideLoading();", flush=True)
                 return
     
             # In GPX-Daten konvertieren
@@ -6824,7 +6598,7 @@ class MainWindow(QMainWindow):
             
             if not gpx_data:
                 QMessageBox.warning(self, "Load FIT", "No valid track data found in FIT file.")
-                self.map_widget.view.page().runJavaScript("hideLoading();")
+                self.map_widget.run_js("hideLoading();", flush=True)
                 return
     
             # Prüfen ob Resample nötig ist
@@ -6857,7 +6631,7 @@ class MainWindow(QMainWindow):
                 if not self._gpx_data:
                         # --- Append ausschließlich in Slot 1 ---
                     base = self._gpx_slots[1]["gpx_data"] or []
-                    merged = (base + gpx_data) if base else list(gpx_data)
+                    merged = (base + gpx_data) if base else gpx_data.copy()
                     self._gpx_slots[1]["gpx_data"] = merged
                     if self._active_gpx_slot == 1:
                         self._apply_slot_to_ui()
@@ -6872,8 +6646,7 @@ class MainWindow(QMainWindow):
                     gap_start = old_end_time + timedelta(seconds=1)
                     shift_dt = gap_start - gpx_data[0]["time"]
     
-                    for pt in gpx_data:
-                        pt["time"] = pt["time"] + shift_dt
+                    gpx_data.shift_time(shift_dt)
     
                     merged_data = old_data + gpx_data
                     recalc_gpx_data(merged_data)
@@ -6883,7 +6656,7 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load FIT file:\n{str(e)}")
         finally:
-            self.map_widget.view.page().runJavaScript("hideLoading();")
+            self.map_widget.run_js("hideLoading();", flush=True)
     
         self.proposeVideoGpxSync()
     
@@ -6935,6 +6708,7 @@ class MainWindow(QMainWindow):
                 "gradient": 0.0,   # Wird später berechnet
             }
             gpx_data.append(gpx_point)
+        gpx_data = Track.from_points(gpx_data)
         
         # Metriken berechnen
         if len(gpx_data) > 1:
@@ -7265,8 +7039,7 @@ class MainWindow(QMainWindow):
             self.mini_chart_widget.set_gpx_data(self._gpx_data)
         
         # 2. Lade die Route in die Map
-        route_geojson = self._build_route_geojson_from_gpx(self._gpx_data)
-        self.map_widget.loadRoute(route_geojson, do_fit=True)
+        self.map_widget.sync_route(self._gpx_data, do_fit=True)
         
         # 3. Aktiviere die Auto-Sync-Funktionalität falls möglich
         if is_gpx_video_shift_set():
@@ -18,12 +18,48 @@
 # along with KVRouite. If not, see <https://www.gnu.org/licenses/>.
 #
 
+import numpy as np
+
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt, QPoint, Signal, QPointF
+from PySide6.QtCore import Qt, QPoint, Signal, QPointF, QLineF, QRect
 from PySide6.QtGui import (
-    QPainter, QPen, QBrush, QColor, QWheelEvent, QPolygonF, QFont
+    QPainter, QPen, QBrush, QColor, QWheelEvent, QPolygonF, QFont, QPixmap
 )
-                           
+
+from core.track import as_track, NAT
+
+
+def minmax_decimate(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    Ausdünnung für Liniendiagramme (M4): pro Pixelspalte floor(x) bleiben
+    erster, letzter, kleinster und größter Punkt übrig. Die gezeichnete
+    Linie sieht danach pixelgenau gleich aus, hat aber höchstens ~4 Punkte
+    pro Spalte. xs muss aufsteigend sein. Rückgabe: sortierte Indizes.
+    """
+    n = len(xs)
+    if n <= 2:
+        return np.arange(n)
+    cols = np.floor(xs).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+    if len(starts) * 4 >= n:
+        return np.arange(n)  # lohnt sich nicht
+    ends = np.r_[starts[1:], n] - 1
+
+    # innerhalb jeder Spalte nach y sortieren => erster/letzter Eintrag
+    # der Gruppe sind Minimum/Maximum
+    order = np.lexsort((ys, np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))))
+    return np.unique(np.concatenate((starts, ends, order[starts], order[ends])))
+
+
+def _polyline_segments(xs: np.ndarray, ys: np.ndarray) -> list:
+    """
+    Linienzug als Einzelsegmente für QPainter.drawLines(). Bei tausenden
+    Zickzack-Punkten ist das ein Vielfaches schneller als drawPath/
+    drawPolyline, die jede Ecke als Linienverbindung berechnen.
+    """
+    x = xs.tolist()
+    y = ys.tolist()
+    return [QLineF(x[i], y[i], x[i + 1], y[i + 1]) for i in range(len(x) - 1)]
 
 
 class ChartWidget(QWidget):
@@ -35,6 +71,7 @@ class ChartWidget(QWidget):
         self.setFocusPolicy(Qt.StrongFocus)
 
         self._gpx_data = []
+        self._track = as_track([])
         self._speed_cap = 70.0
 
         # Ausschnitt/Zoom
@@ -63,6 +100,13 @@ class ChartWidget(QWidget):
         # **NEU**: Schwellenwert für Stops
         self._stop_threshold = 1.0   # z.B. Default 1 Sekunde
 
+        # Zeichen-Caches (siehe paintEvent)
+        self._series = None
+        self._series_key = None
+        self._layer = None
+        self._layer_key = None
+        self._marker_extent = 200  # Breite Marker + Texte (px), für Teil-Updates
+
         self.setAttribute(Qt.WA_OpaquePaintEvent, True)
         self.setAutoFillBackground(True)
         
@@ -95,6 +139,7 @@ class ChartWidget(QWidget):
 
     def set_gpx_data(self, data):
         self._gpx_data = data if data else []
+        self._track = as_track(self._gpx_data)
         self._marker_index = 0
         self._zoom_factor = 1.0
         self._horizontal_offset = 0.0
@@ -108,9 +153,12 @@ class ChartWidget(QWidget):
             index = 0
         if index >= len(self._gpx_data):
             index = len(self._gpx_data) - 1
+        old_index, old_offset = self._marker_index, self._horizontal_offset
         self._marker_index = index
         self._keep_marker_visible()
-        self.update()
+        if index == old_index and self._horizontal_offset == old_offset:
+            return  # Timer-Tick ohne neuen Punkt
+        self._update_marker(old_index, old_offset)
 
     def _keep_marker_visible(self):
         """
@@ -151,8 +199,9 @@ class ChartWidget(QWidget):
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             idx = self._index_for_x(event.pos().x())
+            old_index = self._marker_index
             self._marker_index = idx
-            self.update()
+            self._update_marker(old_index, self._horizontal_offset)
             self.markerClicked.emit(idx)
             event.accept()
         elif event.button() == Qt.RightButton:
@@ -233,15 +282,100 @@ class ChartWidget(QWidget):
     # -----------------------------------------------------
     # Painting
     # -----------------------------------------------------
+    # Statische Ebene (Legende, Kurven, Null-Linien, Langsam-/Stop-Marker)
+    # wird als QPixmap gemerkt, Schlüssel: Track-Version, Größe, Zoom, Offset
+    # und Einstellungen. paintEvent legt nur noch den Marker darüber.
+
+    def _data_key(self):
+        track = self._track
+        return (id(track), track.version, len(track))
+
+    def _chart_series(self):
+        """Gecappte Werte und Skalierung des ganzen Tracks (nur bei neuen Daten neu)."""
+        key = (self._data_key(), self._speed_cap, self._stop_threshold)
+        if self._series is not None and self._series_key == key:
+            return self._series
+
+        track = self._track
+        ele_arr = np.nan_to_num(track.column("ele"), nan=0.0)
+        spd_arr = np.minimum(np.nan_to_num(track.column("speed_kmh"), nan=0.0), self._speed_cap)
+
+        min_ele, max_ele = float(ele_arr.min()), float(ele_arr.max())
+        min_spd, max_spd = float(spd_arr.min()), float(spd_arr.max())
+        if abs(max_ele - min_ele) < 0.1:
+            max_ele += 0.1
+            min_ele -= 0.1
+        if abs(max_spd - min_spd) < 0.1:
+            max_spd += 0.1
+            min_spd -= 0.1
+
+        t_ns = track.time_ns()
+        dt_s = np.diff(t_ns).astype(np.float64) / 1e9
+        dt_s[(t_ns[1:] == NAT) | (t_ns[:-1] == NAT)] = 0.0
+
+        self._series = {
+            "ele": ele_arr,
+            "spd": spd_arr,
+            "min_ele": min_ele, "max_ele": max_ele,
+            "min_spd": min_spd, "max_spd": max_spd,
+            "stops": np.flatnonzero(dt_s > self._stop_threshold) + 1,
+        }
+        self._series_key = key
+        return self._series
+
+    def _x_for_index(self, i: int) -> float:
+        count = len(self._track)
+        if count < 2:
+            return 0.0
+        chart_width = self.width() * self._zoom_factor
+        return i / (count - 1) * chart_width - self._horizontal_offset
+
+    def _marker_rect(self, index: int) -> QRect:
+        x = int(self._x_for_index(index))
+        return QRect(x - 3, 0, self._marker_extent + 8, self.height())
+
+    def _update_marker(self, old_index: int, old_offset: float):
+        """Neu zeichnen nach Markerwechsel: nur die Marker-Streifen, solange
+        der Ausschnitt gleich bleibt (die Kurven kommen aus dem Pixmap)."""
+        if self._layer is None or self._horizontal_offset != old_offset:
+            self.update()
+            return
+        self.update(self._marker_rect(old_index))
+        self.update(self._marker_rect(self._marker_index))
+
     def paintEvent(self, event):
         super().paintEvent(event)
+        w = self.width()
+        h = self.height()
+        dpr = self.devicePixelRatioF()
+
+        key = (self._data_key(), w, h, dpr, self._zoom_factor, self._horizontal_offset,
+               self._speed_cap, self._zero_speed_threshold, self._stop_threshold)
+        if self._layer is None or self._layer_key != key:
+            self._layer = self._render_layer(w, h, dpr)
+            self._layer_key = key
+
         painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._layer)
+        if len(self._track) >= 2:
+            painter.setRenderHint(QPainter.Antialiasing)
+            self._paint_marker(painter, w, h)
+        painter.end()
+
+    def _render_layer(self, w: int, h: int, dpr: float) -> QPixmap:
+        pixmap = QPixmap(max(1, int(w * dpr)), max(1, int(h * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        painter = QPainter(pixmap)
+        painter.setFont(self.font())
+        try:
+            self._paint_static(painter, w, h)
+        finally:
+            painter.end()
+        return pixmap
+
+    def _paint_static(self, painter, w: int, h: int):
         painter.setRenderHint(QPainter.Antialiasing)
-    
-        rect_ = self.rect()
-        w = rect_.width()
-        h = rect_.height()
-        painter.fillRect(rect_, QColor("#222222"))
+        painter.fillRect(QRect(0, 0, w, h), QColor("#222222"))
 
         # ------------------------------------------------------
         # LEGENDE (oben links)
@@ -287,42 +421,25 @@ class ChartWidget(QWidget):
         # ------------------------------------------------------
         # GPX-Daten prüfen
         # ------------------------------------------------------
-        count = len(self._gpx_data)
+        count = len(self._track)
         if count < 2:
             painter.setPen(QColor("white"))
             painter.drawText(10, 60, "No GPX data for chart.")
             return
 
         chart_width = w * self._zoom_factor
+        offset = self._horizontal_offset
     
         # ------------------------------------------------------
-        # ELE / SPEED ermitteln und skalieren
+        # ELE / SPEED (gecacht) und Skalierung
         # ------------------------------------------------------
-        ele_vals = [pt.get("ele", 0.0) for pt in self._gpx_data]
-    
-        speed_vals = []
-        for pt in self._gpx_data:
-            raw_spd = pt.get("speed_kmh", 0.0)
-            capped_spd = min(raw_spd, self._speed_cap)
-            speed_vals.append(capped_spd)
-    
-        min_ele, max_ele = min(ele_vals), max(ele_vals)
-        min_spd, max_spd = min(speed_vals), max(speed_vals)
-    
-        if abs(max_ele - min_ele) < 0.1:
-            max_ele += 0.1
-            min_ele -= 0.1
-        if abs(max_spd - min_spd) < 0.1:
-            max_spd += 0.1
-            min_spd -= 0.1
+        series = self._chart_series()
+        min_ele, max_ele = series["min_ele"], series["max_ele"]
+        min_spd, max_spd = series["min_spd"], series["max_spd"]
     
         top_height = int(self._chart_height_top * h)
         bottom_height = int(self._chart_height_bottom * h)
     
-        def x_for_index(i: int) -> float:
-            ratio = i / (count - 1)
-            return ratio * chart_width - self._horizontal_offset
-    
         def y_for_ele(e: float) -> float:
             frac = (e - min_ele) / (max_ele - min_ele)
             return top_height - (frac * (top_height - 20))
@@ -332,31 +449,28 @@ class ChartWidget(QWidget):
             speed_range = bottom_height - 20
             y0 = top_height + 10
             return y0 + (bottom_height - 20) - (frac * speed_range)
-    
-        # Pfade für Elevation/Speed
-        path_ele = []
-        path_spd = []
-        for i in range(count):
-            x_ = x_for_index(i)
-            path_ele.append((x_, y_for_ele(ele_vals[i])))
-            path_spd.append((x_, y_for_speed(speed_vals[i])))
+
+        # Nur der sichtbare Bereich (+50px wie bisher) plus je ein Punkt
+        # davor/danach, damit die Linien bis an den Rand gehen
+        px_per_point = chart_width / (count - 1)
+        i0 = max(0, int(np.floor((offset - 50) / px_per_point)) - 1)
+        i1 = min(count - 1, int(np.ceil((offset + w + 50) / px_per_point)) + 1)
+        spd_vis = series["spd"][i0:i1 + 1]
+        xs = np.arange(i0, i1 + 1) / (count - 1) * chart_width - offset
+        ys_ele = top_height - ((series["ele"][i0:i1 + 1] - min_ele) / (max_ele - min_ele)) * (top_height - 20)
+        ys_spd = (top_height + 10 + (bottom_height - 20)
+                  - ((spd_vis - min_spd) / (max_spd - min_spd)) * (bottom_height - 20))
+
+        # Min/Max pro Pixelspalte => höchstens ~4 Punkte je Spalte
+        sel_ele = minmax_decimate(xs, ys_ele)
+        sel_spd = minmax_decimate(xs, ys_spd)
     
         # ------------------------------------------------------
         # Linien zeichnen (Elevation = gelb, Speed = cyan)
         # ------------------------------------------------------
-        def draw_polyline(painter, pts, color, thickness=2):
-            painter.setPen(QPen(color, thickness))
-            for idx in range(len(pts) - 1):
-                x1, y1 = pts[idx]
-                x2, y2 = pts[idx + 1]
-                if (x1 < -50 and x2 < -50):
-                    continue
-                if (x1 > w + 50 and x2 > w + 50):
-                    continue
-                painter.drawLine(x1, y1, x2, y2)
-
         # 1) Elevation-Linie (gelb, 2px)
-        draw_polyline(painter, path_ele, QColor(255, 255, 0), thickness=2)
+        painter.setPen(QPen(QColor(255, 255, 0), 2))
+        painter.drawLines(_polyline_segments(xs[sel_ele], ys_ele[sel_ele]))
 
         # --- NEU: 0-Meter-Linie im Höhenbereich --------------------------------
         # Fälle:
@@ -376,7 +490,7 @@ class ChartWidget(QWidget):
             pen = QPen(QColor(140, 140, 140), 1, Qt.DashLine)  # dezent
 
         painter.setPen(pen)
-        painter.drawLine(0, zero_y, w, zero_y)
+        painter.drawLine(QPointF(0, zero_y), QPointF(w, zero_y))
         
         try:
             lab_font = QFont(self.font().family(), max(4, int(h * 0.025)))
@@ -387,7 +501,8 @@ class ChartWidget(QWidget):
         # ------------------------------------------------------------------------
 
         # 2) Speed-Linie (cyan, 1px)
-        draw_polyline(painter, path_spd, QColor(0, 255, 255), thickness=1)
+        painter.setPen(QPen(QColor(0, 255, 255), 1))
+        painter.drawLines(_polyline_segments(xs[sel_spd], ys_spd[sel_spd]))
     
         
         # ------------------------------------------------------
@@ -396,80 +511,73 @@ class ChartWidget(QWidget):
         
         painter.setPen(QPen(QColor("white"), 1))
         zero_speed_y = y_for_speed(0.0)
-        painter.drawLine(0, zero_speed_y, w, zero_speed_y)
+        painter.drawLine(QPointF(0, zero_speed_y), QPointF(w, zero_speed_y))
     
         # ------------------------------------------------------
         # Bereich für Geschwindigkeiten < zero_speed_threshold rot markieren
         # ------------------------------------------------------
         zst = self._zero_speed_threshold  # z.B. 1 km/h
         y_axis_speed = y_for_speed(0)     # x-Achse für Speed
+
+        below = spd_vis < zst
+        if i0 == 0:
+            below[0] = False  # Ersten Punkt überspringen
     
         # Wir nutzen ein "Füll-Polygon" für jede zusammenhängende Unterschreitung.
         painter.setBrush(QColor(255, 0, 0, 100))  # halbtransparentes Rot
         painter.setPen(Qt.NoPen)
-    
-        sub_threshold_polygon = []
-        in_segment = False
-    
-        for i in range(count):
-            if i == 0:
-                continue  # Ersten Punkt überspringen
-            x_, y_ = path_spd[i]
-            spd_ = speed_vals[i]
-    
-            # Unterhalb Schwelle?
-            if spd_ < zst:
-                # Segment anfangen, falls wir noch nicht "drin" sind
-                if not in_segment:
-                    sub_threshold_polygon.append((x_, y_axis_speed))
-                    in_segment = True
-                sub_threshold_polygon.append((x_, y_))
-            else:
-                # Falls wir gerade ein "rotes" Segment hatten, jetzt schließen
-                if in_segment:
-                    sub_threshold_polygon.append((x_, y_axis_speed))
-                    # Zeichnen der Polygonfläche
-                    poly = QPolygonF()
-                    for (px, py) in sub_threshold_polygon:
-                        poly.append(QPointF(px, py))
-                    painter.drawPolygon(poly)
-                    sub_threshold_polygon.clear()
-                    in_segment = False
-    
-        # Falls Segment bis zum letzten Punkt offen
-        if in_segment and len(sub_threshold_polygon) > 0:
-            sub_threshold_polygon.append((path_spd[-1][0], y_axis_speed))
-            poly = QPolygonF()
-            for (px, py) in sub_threshold_polygon:
-                poly.append(QPointF(px, py))
-            painter.drawPolygon(poly)
+
+        edges = np.diff(np.r_[0, below.astype(np.int8), 0])
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1) - 1
+        last = len(xs) - 1
+        if len(run_starts) <= w:
+            for a, b in zip(run_starts.tolist(), run_ends.tolist()):
+                # Punkte des Segments (ausgedünnt wie die Linie), Abschluss
+                # an der x-Position des nächsten Punkts über der Schwelle
+                inner = sel_spd[np.searchsorted(sel_spd, a):np.searchsorted(sel_spd, b, side="right")]
+                close_i = min(b + 1, last)
+                poly = QPolygonF()
+                poly.append(QPointF(xs[a], y_axis_speed))
+                poly.append(QPointF(xs[a], ys_spd[a]))
+                for k in inner.tolist():
+                    poly.append(QPointF(xs[k], ys_spd[k]))
+                poly.append(QPointF(xs[b], ys_spd[b]))
+                poly.append(QPointF(xs[close_i], y_axis_speed))
+                painter.drawPolygon(poly)
+        else:
+            # Mehr Segmente als Pixel => pro Pixelspalte ein Balken bis zum
+            # höchsten Wert unter der Schwelle
+            bx = np.floor(xs[below])
+            by = ys_spd[below]
+            col_starts = np.flatnonzero(np.r_[True, bx[1:] != bx[:-1]])
+            tops = np.minimum.reduceat(by, col_starts)
+            painter.setPen(QPen(QColor(255, 0, 0, 100), 1))
+            painter.drawLines([QLineF(x + 0.5, y_axis_speed, x + 0.5, y)
+                               for x, y in zip(bx[col_starts].tolist(), tops.tolist())])
     
         # ------------------------------------------------------
         # Rote Marker an der x-Achse für alle Punkte < zst
         # ------------------------------------------------------
         painter.setPen(QPen(QColor(255, 0, 0), 4))
-        for i in range(count):
-            if i == 0:
-                continue
-            x_, y_ = path_spd[i]
-            spd_ = speed_vals[i]
-            if spd_ < zst:
-                # Kleiner senkrechter Strich nach unten (5px)
-                painter.drawLine(x_, y_axis_speed, x_, y_axis_speed + 15)
+        tick_xs = np.unique(np.round(xs[below]))
+        if len(tick_xs):
+            # Kleiner senkrechter Strich nach unten (5px)
+            painter.drawLines([QLineF(x_, y_axis_speed, x_, y_axis_speed + 15)
+                               for x_ in tick_xs.tolist()])
     
         # ------------------------------------------------------
         # **NEU**: Blaue Marker für "Stops"
         # wenn Zeitdifferenz > self._stop_threshold
         # ------------------------------------------------------
         painter.setPen(QPen(QColor(255, 165, 0), 4))  # Blau, Dicke=2
-        for i in range(1, count):
-            # Zeitdifferenz zwischen Punkt i-1 und i:
-            dt = (self._gpx_data[i]["time"] - self._gpx_data[i-1]["time"]).total_seconds() if self._gpx_data[i]["time"] else 0
-            if dt > self._stop_threshold:
-                # x_-Koordinate des Punktes i (bereits in path_spd gespeichert)
-                x_ = path_spd[i][0]
-                # Hier zeichnen wir einen Strich nach oben (15px) vom zero_speed_y:
-                painter.drawLine(x_, zero_speed_y, x_, zero_speed_y + 15)
+        stops = series["stops"]
+        stops = stops[(stops >= i0) & (stops <= i1)] - i0
+        stop_xs = np.unique(np.round(xs[stops]))
+        if len(stop_xs):
+            # Hier zeichnen wir einen Strich nach oben (15px) vom zero_speed_y:
+            painter.drawLines([QLineF(x_, zero_speed_y, x_, zero_speed_y + 15)
+                               for x_ in stop_xs.tolist()])
     
         # ------------------------------------------------------
         # Kreise auf den Datenpunkten (Elevation = gelb, Speed = cyan)
@@ -479,14 +587,14 @@ class ChartWidget(QWidget):
         # Elevation-Kreise
         painter.setBrush(QBrush(QColor(255, 255, 0)))
         ele_radius = 1
-        for (xx, yy) in path_ele:
+        for xx, yy in zip(xs[sel_ele].tolist(), ys_ele[sel_ele].tolist()):
             if -10 < xx < w + 10:
                 painter.drawEllipse(QPointF(xx, yy), ele_radius, ele_radius)
     
         # Speed-Kreise
         painter.setBrush(QBrush(QColor(0, 255, 255)))
         speed_radius = 0.7
-        for (xx, yy) in path_spd:
+        for xx, yy in zip(xs[sel_spd].tolist(), ys_spd[sel_spd].tolist()):
             if -10 < xx < w + 10:
                 painter.drawEllipse(QPointF(xx, yy), speed_radius, speed_radius)
         
@@ -503,13 +611,6 @@ class ChartWidget(QWidget):
         painter.setPen(QColor(180, 180, 180))
         painter.drawText(6, y0_spd - 2, "0 km/h")
 
-        
-        # ------------------------------------------------------
-        # Marker-Linie und Info-Texte
-        # ------------------------------------------------------
-        m_x = x_for_index(self._marker_index)
-        # ... dein bestehender Marker-Zeichencode ...
-
         # === NEU: Warn-Badge "unter 0 m" einblenden, wenn min_ele < 0 ===
         if min_ele < 0.0:
             # Text & Style
@@ -542,36 +643,41 @@ class ChartWidget(QWidget):
             painter.setPen(QColor(255, 160, 160))
             painter.drawText(x_left + pad_x, y_top + pad_y + fm.ascent(), badge_text)
 
-        
-        
-        
+    def _paint_marker(self, painter, w: int, h: int):
         # ------------------------------------------------------
         # Marker-Linie und Info-Texte
         # ------------------------------------------------------
-        m_x = x_for_index(self._marker_index)
-        if -50 < m_x < w + 50:
-            painter.setPen(QPen(QColor(255, 255, 255), 2))
-            painter.drawLine(m_x, 0, m_x, h)
-            pt_ = self._gpx_data[self._marker_index]
-    
-            ele_val = pt_['ele']
-            spd_val = speed_vals[self._marker_index]  # gecappter Wert
-            grad_val = pt_.get("gradient", 0.0)
-    
-            line1 = f"{ele_val:.1f}".replace(".", ",") + "m"
-            line2 = f"{spd_val:.1f}".replace(".", ",") + "km/h"
-            line3 = f"{grad_val:.1f}".replace(".", ",") + "%"
-    
-            y_start = 40
-            y_step = 15
-    
-            painter.setPen(QPen(QColor("white"), 1))
-            painter.drawText(m_x + 5, y_start, line1)
-            painter.drawText(m_x + 5, y_start + y_step, line2)
-            painter.drawText(m_x + 5, y_start + 2 * y_step, line3)
-    
-                
-     
+        idx = min(max(self._marker_index, 0), len(self._track) - 1)
+        m_x = self._x_for_index(idx)
+        if not (-50 < m_x < w + 50):
+            return
+
+        painter.setPen(QPen(QColor(255, 255, 255), 2))
+        painter.drawLine(QPointF(m_x, 0), QPointF(m_x, h))
+
+        ele_val = float(self._track.column("ele")[idx])
+        spd_val = float(self._chart_series()["spd"][idx])  # gecappter Wert
+        # fehlende Steigung => 0 (wie früher .get("gradient", 0.0)), nicht "nan%"
+        grad_val = float(np.nan_to_num(self._track.column("gradient")[idx]))
+
+        line1 = f"{ele_val:.1f}".replace(".", ",") + "m"
+        line2 = f"{spd_val:.1f}".replace(".", ",") + "km/h"
+        line3 = f"{grad_val:.1f}".replace(".", ",") + "%"
+
+        y_start = 40
+        y_step = 15
+
+        try:
+            painter.setFont(QFont(self.font().family(), max(8, int(h * 0.025))))
+        except Exception:
+            pass
+        fm = painter.fontMetrics()
+        self._marker_extent = 5 + max(fm.horizontalAdvance(t) for t in (line1, line2, line3))
+
+        painter.setPen(QPen(QColor("white"), 1))
+        painter.drawText(QPointF(m_x + 5, y_start), line1)
+        painter.drawText(QPointF(m_x + 5, y_start + y_step), line2)
+        painter.drawText(QPointF(m_x + 5, y_start + 2 * y_step), line3)
 
     # -----------------------------------------------------
     # Hilfsfunktion: x->Index
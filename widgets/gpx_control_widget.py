@@ -26,20 +26,25 @@ import math
 import urllib.request
 import urllib.error
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 from PySide6.QtWidgets import (
     QWidget, QHBoxLayout, QPushButton, QStyle,
     QVBoxLayout, QLabel, QSizePolicy, QFrame,
     QMenu, QDialog, QRadioButton, QButtonGroup,
     QDoubleSpinBox, QMessageBox, QFileDialog,
-    QLineEdit
+    QLineEdit, QProgressDialog
 )
 
-from PySide6.QtCore import Qt, Signal, QPoint
+from PySide6.QtCore import Qt, Signal, QPoint, QSettings, QEventLoop, QTimer
 from PySide6.QtGui import QIcon
 
 from datetime import timedelta
 from core.gpx_parser import recalc_gpx_data, get_gpx_video_shift, set_gpx_video_shift
+from core.elevation_tiles import ElevationTileCache, tiles_for_points
+from core.track_stats import TrackStats
 
 
 class GPXControlWidget(QWidget):
@@ -493,89 +498,117 @@ class GPXControlWidget(QWidget):
         dlg.exec()
     
     
+    def _elevation_tile_cache(self, token: str):
+        """
+        ElevationTileCache für den aktuellen Mapbox-Key und Tile-Ordner
+        (QSettings "elevation/tileDir"); bleibt erhalten, solange sich
+        beides nicht ändert => Speicher-Cache gilt über mehrere Aufrufe.
+        """
+        local_dir = QSettings("KVRouite", "KVRouite").value("elevation/tileDir", "", str)
+        cache = getattr(self, "_ele_tile_cache", None)
+        if cache is None or cache.token != token or cache.local_dir != local_dir:
+            cache = ElevationTileCache(token=token, local_dir=local_dir)
+            self._ele_tile_cache = cache
+        return cache
+
+    def _fetch_elevation_tiles(self, cache, needed_tiles):
+        """
+        cache.fetch() in einem Worker-Thread; die GUI bleibt bedienbar
+        (modaler Fortschrittsdialog, erst nach kurzer Zeit sichtbar).
+        Rückgabe wie fetch(), bei Abbruch None.
+        """
+        progress = QProgressDialog("Loading elevation tiles...", "Cancel",
+                                   0, len(needed_tiles), self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setWindowTitle("Please wait...")
+        progress.setMinimumDuration(400)
+
+        state = [0]  # fertige Tiles (aus dem Worker geschrieben)
+
+        def on_progress(done, total):
+            state[0] = done
+
+        pool = ThreadPoolExecutor(max_workers=1)
+        future = pool.submit(cache.fetch, needed_tiles, on_progress)
+        pool.shutdown(wait=False)
+
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.setInterval(50)
+
+        def poll():
+            progress.setValue(state[0])
+            if future.done() or progress.wasCanceled():
+                loop.quit()
+
+        timer.timeout.connect(poll)
+        timer.start()
+        poll()
+        if not future.done() and not progress.wasCanceled():
+            loop.exec()
+        timer.stop()
+        canceled = progress.wasCanceled() and not future.done()
+        progress.close()
+        if canceled:
+            # Worker läuft zu Ende und füllt den Cache weiter
+            print("[INFO] Elevation tile loading canceled")
+            return None
+        return future.result()
+
     def update_elevation_from_mapbox(self, latlon_list):
         """
         Holt Elevation für latlon_list via Mapbox Terrain-RGB Tiles.
         latlon_list: [(gpx_idx, lat, lon), ...]
         Gibt zurück: (successful_points, tile_count)
-        """
-        import math
-        from PIL import Image
-        import io
 
+        Tiles kommen aus dem Höhen-Cache (core/elevation_tiles.py) bzw.
+        einem lokalen Tile-Ordner; nur fehlende werden (parallel) geladen.
+        """
         mw = self._mainwindow
-        if not mw:
+        if not mw or not latlon_list:
             return (0, 0)
-        
+
         token = mw._mapbox_key.strip()
-        if not token:
+        cache = self._elevation_tile_cache(token)
+        if not cache.has_source:
             print("[INFO] No Mapbox key – skipping elevation update")
             #QMessageBox.warning(self, "No Mapbox Key", "No Mapbox API key found. Please set it in Config > Map Keys.")
             return (0, 0)
 
         gpx_data = mw.gpx_widget.gpx_list._gpx_data
-        ZOOM = 14
+        indices = [gpx_i for gpx_i, _, _ in latlon_list]
+        lats = np.array([lat for _, lat, _ in latlon_list], dtype=np.float64)
+        lons = np.array([lon for _, _, lon in latlon_list], dtype=np.float64)
 
-        # Hilfsfunktionen
-        def latlon_to_tile(lat, lon, zoom):
-            n = 2 ** zoom
-            x_tile = int((lon + 180.0) / 360.0 * n)
-            y_tile = int((1.0 - math.log(math.tan(math.radians(lat)) + 1 / math.cos(math.radians(lat))) / math.pi) / 2.0 * n)
-            return x_tile, y_tile
+        # Schritt 1: alle benötigten Tiles ermitteln
+        needed_tiles = tiles_for_points(lats, lons, cache.zoom)
 
-        def latlon_to_pixel(lat, lon, zoom, tile_size):
-            n = 2 ** zoom * tile_size
-            x = (lon + 180.0) / 360.0 * n
-            y = (1.0 - math.log(math.tan(math.radians(lat)) + 1 / math.cos(math.radians(lat))) / math.pi) / 2.0 * n
-            return int(x), int(y)
+        # Schritt 2: Tiles laden (Cache, lokaler Ordner, Netz)
+        net_before = cache.network_fetches
+        result = self._fetch_elevation_tiles(cache, needed_tiles)
+        if result is None:
+            return (0, 0)
+        tiles, errors = result
+        print(f"[DEBUG] Elevation tiles: {len(tiles)}/{len(needed_tiles)} loaded, "
+              f"{cache.network_fetches - net_before} from network")
+        if errors:
+            (xtile, ytile), e = next(iter(errors.items()))
+            QMessageBox.warning(self, "Tile Load Error",
+                f"Could not load tile {xtile},{ytile}:\n{e}")
+            return (0, 0)
 
-        # Schritt 1: alle benötigten Tiles ermitteln
-        needed_tiles = set()
-        for _, lat, lon in latlon_list:
-            xt, yt = latlon_to_tile(lat, lon, ZOOM)
-            needed_tiles.add((xt, yt))
-
-        # Schritt 2: Tiles herunterladen
-        tile_images = {}
-        tile_size = 256  # Standard
-        tile_count = 0
-
-        for (xtile, ytile) in needed_tiles:
-            url = f"https://api.mapbox.com/v4/mapbox.terrain-rgb/{ZOOM}/{xtile}/{ytile}.pngraw?access_token={token}"
-            try:
-                with urllib.request.urlopen(url) as response:
-                    img_bytes = response.read()
-                    img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-                    tile_images[(xtile, ytile)] = img
-                    tile_size = img.size[0]  # z. B. 256
-                    tile_count += 1
-            except Exception as e:
-                QMessageBox.warning(self, "Tile Load Error",
-                    f"Could not load tile {xtile},{ytile}:\n{e}")
-                return (0, 0)
-    
+        tile_count = len(tiles)
         if tile_count == 0:
             return (0, 0)
 
-        # Schritt 3: Höhenwerte extrahieren
+        # Schritt 3: Höhenwerte extrahieren (bilinear, alle Punkte auf einmal)
+        elevations = cache.sample(lats, lons, tiles)
         successful_points = 0
-    
-        for gpx_i, lat, lon in latlon_list:
-            x_pix, y_pix = latlon_to_pixel(lat, lon, ZOOM, tile_size)
-            xtile, ytile = x_pix // tile_size, y_pix // tile_size
-            x_in_tile, y_in_tile = x_pix % tile_size, y_pix % tile_size
-
-            img = tile_images.get((xtile, ytile))
-            if img is None:
+        for gpx_i, elevation in zip(indices, elevations.tolist()):
+            if math.isnan(elevation):
                 continue
-
-            if 0 <= x_in_tile < img.width and 0 <= y_in_tile < img.height:
-                r, g, b = img.getpixel((x_in_tile, y_in_tile))
-                elevation = -10000 + ((r * 256 * 256 + g * 256 + b) * 0.1)
-                gpx_data[gpx_i]["ele"] = elevation
-                successful_points += 1
-            else:
-                print(f"[WARN] Out-of-bounds pixel: {x_in_tile},{y_in_tile} in tile {xtile},{ytile}")
+            gpx_data[gpx_i]["ele"] = elevation
+            successful_points += 1
 
         return (successful_points, tile_count)
 
@@ -844,8 +877,7 @@ class GPXControlWidget(QWidget):
         mw.chart.set_gpx_data(gpx_data)
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(gpx_data)
-        route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(gpx_data, do_fit=False)
     
         # Finale Info
         QMessageBox.information(
@@ -1034,18 +1066,17 @@ class GPXControlWidget(QWidget):
         
         mw.register_gpx_undo_snapshot()
         
-        mw.map_widget.view.page().runJavaScript("showLoading('Deleting GPX-Range...');")
+        mw.map_widget.run_js("showLoading('Deleting GPX-Range...');", flush=True)
         mw.gpx_widget.gpx_list.delete_selected_range(shift_next)
         mw._update_gpx_overview()
         mw._gpx_data = mw.gpx_widget.gpx_list._gpx_data
-        route_geojson = mw._build_route_geojson_from_gpx(mw._gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(mw._gpx_data, do_fit=False)
         mw.chart.set_gpx_data(mw._gpx_data)
         
         if mw.mini_chart_widget and mw._gpx_data:
             mw.mini_chart_widget.set_gpx_data(mw._gpx_data)
         
-        mw.map_widget.view.page().runJavaScript("hideLoading();")
+        mw.map_widget.run_js("hideLoading();", flush=True)
         
                 # --- NEU: Falls manuell in grau geschnitten wurde -> Sync verwerfen + ggf. neu syncen ---
         if hit_grey:
@@ -1062,8 +1093,7 @@ class GPXControlWidget(QWidget):
             set_gpx_video_shift(0)
 
             # Route IMMER neu laden, damit Grau sofort verschwindet
-            route_geojson = mw._build_route_geojson_from_gpx(mw._gpx_data)
-            mw.map_widget.loadRoute(route_geojson, do_fit=False)
+            mw.map_widget.sync_route(mw._gpx_data, do_fit=False)
 
             # UI auffrischen
             mw.gpx_widget.gpx_list.set_gpx_data(mw._gpx_data)
@@ -1133,7 +1163,7 @@ class GPXControlWidget(QWidget):
 
         # --- Undo + Busy ---
         mw.register_gpx_undo_snapshot()
-        mw.map_widget.view.page().runJavaScript("showLoading('Deleting GPX-Range...');")
+        mw.map_widget.run_js("showLoading('Deleting GPX-Range...');", flush=True)
 
         # --- Head-Cut erkennen (nur für Remove / shift_next == False) ---
         headcut = False
@@ -1209,21 +1239,20 @@ class GPXControlWidget(QWidget):
                     mw.chart.set_gpx_data(data_after)
                 if getattr(mw, "mini_chart_widget", None):
                     mw.mini_chart_widget.set_gpx_data(data_after)
-                mw.map_widget.loadRoute(mw._build_route_geojson_from_gpx(data_after), do_fit=False)
+                mw.map_widget.sync_route(data_after, do_fit=False)
 
-                mw.map_widget.view.page().runJavaScript("hideLoading();")
+                mw.map_widget.run_js("hideLoading();", flush=True)
                 # Headcut-Fall ist vollständig behandelt → früh raus
                 return
 
         # --- Standard-Updates (alle anderen Fälle unverändert) ---
         mw._update_gpx_overview()
         mw._gpx_data = mw.gpx_widget.gpx_list._gpx_data
-        route_geojson = mw._build_route_geojson_from_gpx(mw._gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(mw._gpx_data, do_fit=False)
         mw.chart.set_gpx_data(mw._gpx_data)
         if mw.mini_chart_widget and mw._gpx_data:
             mw.mini_chart_widget.set_gpx_data(mw._gpx_data)
-        mw.map_widget.view.page().runJavaScript("hideLoading();")
+        mw.map_widget.run_js("hideLoading();", flush=True)
 
         # --- Graubereich-Dialog (wie gehabt) ---
         if hit_grey:
@@ -1237,8 +1266,7 @@ class GPXControlWidget(QWidget):
                 QMessageBox.Yes
             )
             set_gpx_video_shift(0)
-            route_geojson = mw._build_route_geojson_from_gpx(mw._gpx_data)
-            mw.map_widget.loadRoute(route_geojson, do_fit=False)
+            mw.map_widget.sync_route(mw._gpx_data, do_fit=False)
             mw.gpx_widget.gpx_list.set_gpx_data(mw._gpx_data)
             mw.video_control.activate_controls()
             if hasattr(mw.video_control, "update_set_sync_highlight"):
@@ -1273,17 +1301,16 @@ class GPXControlWidget(QWidget):
         im gpx_control_widget geklickt wurde.
         => Leitet an die gpx_list weiter.
         """
-        mw.map_widget.view.page().runJavaScript("showLoading('Undo GPX-Range...');")
+        mw.map_widget.run_js("showLoading('Undo GPX-Range...');", flush=True)
         mw.gpx_widget.gpx_list.undo_delete()
         mw._update_gpx_overview()
         mw._gpx_data = mw.gpx_widget.gpx_list._gpx_data
-        route_geojson = mw._build_route_geojson_from_gpx(mw._gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(mw._gpx_data, do_fit=False)
         mw.chart.set_gpx_data(mw._gpx_data)
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(mw._gpx_data)
 
-        mw.map_widget.view.page().runJavaScript("hideLoading();")    
+        mw.map_widget.run_js("hideLoading();", flush=True)    
         
         
     def _on_show_max_slope(self):
@@ -1295,8 +1322,8 @@ class GPXControlWidget(QWidget):
         data = mw.gpx_widget.gpx_list._gpx_data
         if not data:
             return
-        slopes = [pt["gradient"] for pt in data]
-        idx_max = slopes.index(max(slopes))  # index des Max-Wertes
+        stats = TrackStats.for_track(data)
+        idx_max = stats.max_index("gradient", 0, len(data) - 1)  # index des Max-Wertes
 
         # 2) Markieren in Chart, Map, GpxList, MiniChart
         mw._highlight_index_everywhere(idx_max)    
@@ -1306,8 +1333,8 @@ class GPXControlWidget(QWidget):
         data = mw.gpx_widget.gpx_list._gpx_data
         if not data:
             return
-        slopes = [pt["gradient"] for pt in data]
-        idx_min = slopes.index(min(slopes))
+        stats = TrackStats.for_track(data)
+        idx_min = stats.min_index("gradient", 0, len(data) - 1)
 
         mw._highlight_index_everywhere(idx_min)    
         
@@ -1367,12 +1394,8 @@ class GPXControlWidget(QWidget):
             return
     
         # 2) Distanz summieren
-        total_dist_m = 0.0
-        for i in range(b_idx, e_idx):
-            lat1, lon1 = gpx_data[i]["lat"],   gpx_data[i]["lon"]
-            lat2, lon2 = gpx_data[i+1]["lat"], gpx_data[i+1]["lon"]
-            d2 = self._haversine_m(lat1, lon1, lat2, lon2)
-            total_dist_m += d2
+        stats = TrackStats.for_track(gpx_data)
+        total_dist_m = stats.distance_2d_m(b_idx, e_idx)
         if total_dist_m < 0.001:
             QMessageBox.warning(self, "Zero Distance",
                 f"Range {b_idx}..{e_idx} has almost no distance => speed meaningless.")
@@ -1406,15 +1429,7 @@ class GPXControlWidget(QWidget):
         self.register_gpx_undo_snapshot()
         
         # 5) partial-dist array
-        partial_dist = [0.0]
-        cum = 0.0
-        for i in range(b_idx, e_idx):
-            d2 = self._haversine_m(
-                gpx_data[i]["lat"], gpx_data[i]["lon"],
-                gpx_data[i+1]["lat"], gpx_data[i+1]["lon"]
-            )
-            cum += d2
-            partial_dist.append(cum)
+        partial_dist = stats.cumulative_2d(b_idx, e_idx).tolist()
     
         # 6) Verteilen => time[i] = t_start + frac*total_s
         for k in range(1, e_idx - b_idx + 1):
@@ -1477,13 +1492,7 @@ class GPXControlWidget(QWidget):
                 f"Time in the range {b_idx}..{e_idx} is zero or reversed.")
             return
 
-        total_dist_m = 0.0
-        for i in range(b_idx, e_idx):
-            lat1 = gpx_data[i]["lat"]
-            lon1 = gpx_data[i]["lon"]
-            lat2 = gpx_data[i+1]["lat"]
-            lon2 = gpx_data[i+1]["lon"]
-            total_dist_m += self._haversine_m(lat1, lon1, lat2, lon2)
+        total_dist_m = TrackStats.for_track(gpx_data).distance_2d_m(b_idx, e_idx)
 
         if total_dist_m < 0.001:
             QMessageBox.information(self, "Zero Distance", "This range has almost no distance.")
@@ -1530,10 +1539,9 @@ class GPXControlWidget(QWidget):
         if not gpx_data:
             return  # or show a warning
 
-        # Liste der Geschwindigkeiten
-        speeds = [pt.get("speed_kmh", 0.0) for pt in gpx_data]
-        max_val = max(speeds)
-        idx_max = speeds.index(max_val)
+        # Index der höchsten Geschwindigkeit
+        stats = TrackStats.for_track(gpx_data)
+        idx_max = stats.max_index("speed_kmh", 0, len(gpx_data) - 1)
 
         # "Springen" => Map, Chart, Table
         mw._go_to_gpx_index(idx_max)    
@@ -1553,18 +1561,9 @@ class GPXControlWidget(QWidget):
             # Kein "echter" Punkt außer Index 0
             return
 
-        # Erstelle eine Liste (speed, index), beginnend ab Index 1
-        # => so wird der erste Punkt (Index 0) ausgeschlossen.
-        spd_idx_pairs = [
-            (pt.get("speed_kmh", 0.0), i)
-            for i, pt in enumerate(gpx_data)
-            if i > 0  # ab Index 1
-        ]
-        if not spd_idx_pairs:
-            return
-
-        # min(...) mit key=lambda x: x[0] => vergleicht speed
-        min_speed, idx_min = min(spd_idx_pairs, key=lambda x: x[0])
+        # ab Index 1 => der erste Punkt (Index 0) wird ausgeschlossen
+        stats = TrackStats.for_track(gpx_data)
+        idx_min = stats.min_index("speed_kmh", 1, len(gpx_data) - 1)
 
         mw._go_to_gpx_index(idx_min)
 
@@ -1829,8 +1828,7 @@ class GPXControlWidget(QWidget):
             mw.chart.set_gpx_data(gpx_data)
             if mw.mini_chart_widget:
                 mw.mini_chart_widget.set_gpx_data(gpx_data)
-            route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-            mw.map_widget.loadRoute(route_geojson, do_fit=False)
+            mw.map_widget.sync_route(gpx_data, do_fit=False)
             
             mw.gpx_widget.gpx_list.clear_marked_range()
             mw.map_widget.clear_marked_range()
@@ -1925,8 +1923,7 @@ class GPXControlWidget(QWidget):
             mw.chart.set_gpx_data(gpx_data)
             if mw.mini_chart_widget:
                 mw.mini_chart_widget.set_gpx_data(gpx_data)
-            route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-            mw.map_widget.loadRoute(route_geojson, do_fit=False)
+            mw.map_widget.sync_route(gpx_data, do_fit=False)
             
             
             if hasattr(mw, "_autoSyncVideoEnabled") and mw._autoSyncVideoEnabled:
@@ -2406,12 +2403,8 @@ class GPXControlWidget(QWidget):
     
             # (1) Compute the total 2D distance from b_idx.. e_idx
             #     Summation of each segment's distance in [b_idx.. e_idx-1].
-            total_2d = 0.0
-            for i in range(b_idx, e_idx):
-                la1, lo1 = gpx_data[i]["lat"], gpx_data[i]["lon"]
-                la2, lo2 = gpx_data[i+1]["lat"], gpx_data[i+1]["lon"]
-                dist_2d = self._haversine_m(la1, lo1, la2, lo2)
-                total_2d += dist_2d
+            stats = TrackStats.for_track(gpx_data)
+            total_2d = stats.distance_2d_m(b_idx, e_idx)
     
             if total_2d < 0.01:
                 QMessageBox.warning(self, "Zero Distance",
@@ -2473,16 +2466,11 @@ class GPXControlWidget(QWidget):
             #     Keep ele[b_idx] as it is, 
             #     then for each i in [b_idx+1.. e_idx], 
             #     compute the cumulative distance from b_idx to i.
-            def cumulative_distance(b_i, i_i):
-                dist_sum = 0.0
-                for x in range(b_i, i_i):
-                    la1, lo1 = gpx_data[x]["lat"], gpx_data[x]["lon"]
-                    la2, lo2 = gpx_data[x+1]["lat"], gpx_data[x+1]["lon"]
-                    dist_sum += self._haversine_m(la1, lo1, la2, lo2)
-                return dist_sum
+            #     (einmal holen: die ele-Änderungen unten ändern den Track)
+            cum_dist = TrackStats.for_track(gpx_data).cumulative_2d(b_idx, e_idx).tolist()
     
             for i in range(b_idx+1, e_idx+1):
-                dist_i = cumulative_distance(b_idx, i)
+                dist_i = cum_dist[i - b_idx]
                 # slope-based new altitude
                 new_ele_i = ele_b + (new_slope / 100.0) * dist_i
                 gpx_data[i]["ele"] = new_ele_i
@@ -2767,8 +2755,7 @@ class GPXControlWidget(QWidget):
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(gpx_data)
 
-        route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(gpx_data, do_fit=False)
 
         QMessageBox.information(
             self,
@@ -2846,8 +2833,7 @@ class GPXControlWidget(QWidget):
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(gpx_data)
 
-        route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(gpx_data, do_fit=False)
 
         QMessageBox.information(
             self, "Done",
@@ -2929,8 +2915,7 @@ class GPXControlWidget(QWidget):
     
         # 5) Tabellen/Charts/Map etc. neu aufbauen
         mw._update_gpx_overview()
-        route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(gpx_data, do_fit=False)
         mw.chart.set_gpx_data(gpx_data)
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(gpx_data)
@@ -2952,8 +2937,7 @@ class GPXControlWidget(QWidget):
             )
 
             set_gpx_video_shift(0)
-            route_geojson = mw._build_route_geojson_from_gpx(mw._gpx_data)
-            mw.map_widget.loadRoute(route_geojson, do_fit=False)
+            mw.map_widget.sync_route(mw._gpx_data, do_fit=False)
 
             mw.gpx_widget.gpx_list.set_gpx_data(mw._gpx_data)
             mw.video_control.activate_controls()
@@ -3038,8 +3022,7 @@ class GPXControlWidget(QWidget):
         mw._gpx_data = gpx_data
         
         mw._update_gpx_overview()
-        route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(gpx_data, do_fit=False)
         mw.chart.set_gpx_data(gpx_data)
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(gpx_data)
@@ -3125,8 +3108,7 @@ class GPXControlWidget(QWidget):
         mw.chart.set_gpx_data(gpx_data)
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(gpx_data)
-        route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(gpx_data, do_fit=False)
         
         mw.gpx_widget.gpx_list.clear_marked_range()
         mw.map_widget.clear_marked_range()
@@ -3315,8 +3297,7 @@ class GPXControlWidget(QWidget):
         mw.chart.set_gpx_data(gpx_data)
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(gpx_data)
-        route_geojson = mw._build_route_geojson_from_gpx(gpx_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(gpx_data, do_fit=False)
         
         mw.gpx_widget.gpx_list.clear_marked_range()
         mw.map_widget.clear_marked_range()
@@ -3351,8 +3332,7 @@ class GPXControlWidget(QWidget):
             mw.chart.set_gpx_data(snapshot)
             if mw.mini_chart_widget:
                 mw.mini_chart_widget.set_gpx_data(snapshot)
-            route_geojson = mw._build_route_geojson_from_gpx(snapshot)
-            mw.map_widget.loadRoute(route_geojson, do_fit=False) 
+            mw.map_widget.sync_route(snapshot, do_fit=False) 
         mw._undo_stack.append(undo)
         
     def _format_duration_with_ms(self, total_seconds: float) -> str:
@@ -3388,14 +3368,8 @@ class GPXControlWidget(QWidget):
         # Verwende die neue Formatierung mit Millisekunden
         duration_str = self._format_duration_with_ms(duration_s)
 
-        dist_m = sum(
-            self._haversine_m(
-                gpx_data[i]["lat"], gpx_data[i]["lon"],
-                gpx_data[i+1]["lat"], gpx_data[i+1]["lon"]
-            )
-            for i in range(n_points - 1)
-        )
-        
+        stats = TrackStats.for_track(gpx_data)
+
         # Distanz aus dem Label lesen (wie bisher)
         label_text = self.label_length.text()  # z.B. "Length(GPX): 66.12 km"
         try:
@@ -3413,9 +3387,8 @@ class GPXControlWidget(QWidget):
             elev_gain = 0.0
     
         # Geschwindigkeiten
-        speeds = [pt.get("speed_kmh", 0.0) for pt in gpx_data if "speed_kmh" in pt]
-        max_speed = max(speeds) if speeds else 0.0
-        min_speed = min(speeds) if speeds else 0.0
+        max_speed = stats.max_value("speed_kmh", 0, n_points - 1)
+        min_speed = stats.min_value("speed_kmh", 0, n_points - 1)
     
         # Video-Dauer berechnen (mit Millisekunden)
         if mw and hasattr(mw, 'real_total_duration') and hasattr(mw.cut_manager, 'get_total_cuts'):
@@ -3494,8 +3467,7 @@ class GPXControlWidget(QWidget):
         mw._gpx_data = new_data
         mw.gpx_widget.set_gpx_data(new_data)
         mw._update_gpx_overview()
-        route_geojson = mw._build_route_geojson_from_gpx(new_data)
-        mw.map_widget.loadRoute(route_geojson, do_fit=False)
+        mw.map_widget.sync_route(new_data, do_fit=False)
         mw.chart.set_gpx_data(new_data)
         if mw.mini_chart_widget:
             mw.mini_chart_widget.set_gpx_data(new_data)
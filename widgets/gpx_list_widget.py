@@ -23,15 +23,19 @@ from datetime import datetime, timedelta
 import platform
 import re
 
-from PySide6.QtCore import Qt, Signal, QTimer
+import numpy as np
+
+from PySide6.QtCore import Qt, Signal, QTimer, QAbstractTableModel, QModelIndex
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QTableView,
     QHeaderView, QAbstractItemView, QStyledItemDelegate, QStyle,
     QAbstractScrollArea
 )
 from PySide6.QtGui import QColor
 
 from core.gpx_parser import get_gpx_video_shift, is_gpx_video_shift_set, set_gpx_video_shift
+from core.track import Track, as_track, NAT
+from core.time_index import TimeIndex
 
 
 class MarkColumnDelegate(QStyledItemDelegate):
@@ -47,6 +51,178 @@ class MarkColumnDelegate(QStyledItemDelegate):
         super().paint(painter, option, index)
 
 
+def format_hhmmss_milli(secs: float) -> str:
+    sign = '-' if secs < 0 else ''
+    secs_abs = abs(secs)
+    ms_total = int(round(secs_abs * 1000))
+    hh = ms_total // 3600000
+    rest = ms_total % 3600000
+    mm = rest // 60000
+    rest = rest % 60000
+    ss = rest // 1000
+    ms = rest % 1000
+    return f"{sign}{hh:02d}:{mm:02d}:{ss:02d}.{ms:03d}"
+
+
+class GPXTableModel(QAbstractTableModel):
+    """
+    Tabellenmodell direkt über den Track-Spalten (numpy, keine Kopie).
+    Zelltexte entstehen erst in data(), also nur für sichtbare Zeilen.
+    Mark-Spalte (rot) und gelbe Zeile sind Index-Bereiche statt Item-Farben.
+    """
+    # Zeile, neuer Text in Spalte 0 (Zeit) nach dem Editieren
+    timeEdited = Signal(int, str)
+
+    HEADERS = ["Time(GPX)", "Lat", "Lon", "Step (s)",
+               "m", "km/h", "Height", "%Slope", "Mark"]
+    MARK_COL = 8
+    # Format der Spalten 1..7 (Spalte 0 = Zeit, Spalte 8 = Mark)
+    FORMATS = ["{:.6f}", "{:.6f}", "{:.3f}", "{:.2f}", "{:.2f}", "{:.2f}", "{:.1f}"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._n = 0
+        self._rel = np.zeros(0)
+        self._cols = []
+        self._mark_ranges = []      # disjunkte (start, end), inklusive, sortiert
+        self._highlight_row = None
+
+    def set_columns(self, rel, cols):
+        """rel: relative Sekunden, cols: 7 Arrays für die Spalten 1..7."""
+        self.beginResetModel()
+        self._n = len(rel)
+        self._rel = rel
+        self._cols = cols
+        self._mark_ranges = []
+        self._highlight_row = None
+        self.endResetModel()
+
+    def swap_columns(self, cols):
+        """Gleiche Werte in neuen Arrays (nach Track.release_mapping) => kein Reset."""
+        self._cols = cols
+
+    # -------------------------------------------------
+    # Qt-Schnittstelle
+    # -------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._n
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 0:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.cell_text(row, col)
+        if role == Qt.BackgroundRole:
+            if col == self.MARK_COL:
+                return QColor("red") if self.is_marked(row) else None
+            return QColor(Qt.yellow) if row == self._highlight_row else None
+        if role == Qt.ForegroundRole:
+            if col != self.MARK_COL and self._rel[row] < 0:
+                return QColor(Qt.gray)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() != 0:
+            return False
+        text = str(value)
+        if text == self.cell_text(index.row(), 0):
+            return False
+        self.timeEdited.emit(index.row(), text)
+        return True
+
+    def cell_text(self, row: int, col: int) -> str:
+        if col == 0:
+            return format_hhmmss_milli(float(self._rel[row]))
+        if col == self.MARK_COL:
+            return ""
+        val = float(self._cols[col - 1][row])
+        if val != val:  # NaN
+            val = 0.0
+        return self.FORMATS[col - 1].format(val)
+
+    # -------------------------------------------------
+    # Markierungen
+    # -------------------------------------------------
+    def is_marked(self, row: int) -> bool:
+        for start, end in self._mark_ranges:
+            if row < start:
+                return False
+            if row <= end:
+                return True
+        return False
+
+    def mark_range(self, start: int, end: int):
+        ranges = []
+        for a, b in self._mark_ranges:
+            if b < start - 1 or a > end + 1:
+                ranges.append((a, b))
+            else:
+                start, end = min(a, start), max(b, end)
+        ranges.append((start, end))
+        self._mark_ranges = sorted(ranges)
+        self._rows_changed(start, end, self.MARK_COL, self.MARK_COL)
+
+    def unmark_range(self, start: int, end: int):
+        ranges = []
+        for a, b in self._mark_ranges:
+            if b < start or a > end:
+                ranges.append((a, b))
+                continue
+            if a < start:
+                ranges.append((a, start - 1))
+            if b > end:
+                ranges.append((end + 1, b))
+        self._mark_ranges = ranges
+        self._rows_changed(start, end, self.MARK_COL, self.MARK_COL)
+
+    def set_highlight_row(self, row):
+        old = self._highlight_row
+        if old == row:
+            return
+        self._highlight_row = row
+        for r in (old, row):
+            if r is not None:
+                self._rows_changed(r, r, 0, self.MARK_COL - 1)
+
+    def _rows_changed(self, start, end, col0, col1):
+        start = max(0, start)
+        end = min(self._n - 1, end)
+        if end < start:
+            return
+        self.dataChanged.emit(self.index(start, col0), self.index(end, col1),
+                              [Qt.BackgroundRole])
+
+
+class GPXTableView(QTableView):
+    """
+    QTableView mit den QTableWidget-Methoden, die MainWindow und
+    GPXControlWidget noch benutzen (currentRow, rowCount).
+    """
+    def currentRow(self) -> int:
+        idx = self.currentIndex()
+        return idx.row() if idx.isValid() else -1
+
+    def rowCount(self) -> int:
+        model = self.model()
+        return model.rowCount() if model is not None else 0
+
 
 class GPXListWidget(QWidget):
     # Signal, wenn der Nutzer im Pause-Modus in der Tabelle auf eine Zeile klickt
@@ -63,26 +239,29 @@ class GPXListWidget(QWidget):
         self._markB_idx = None
         self._markE_idx = None
         
-        self.table = QTableWidget(self)
+        self._model = GPXTableModel(self)
+        self.table = GPXTableView(self)
+        self.table.setModel(self._model)
         layout.addWidget(self.table)
 
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-            "Time(GPX)", "Lat", "Lon", "Step (s)",
-            "m", "km/h", "Height", "%Slope", "Mark"
-        ])
         header = self.table.horizontalHeader()
         
         
+        # ResizeToContents würde bei jedem Laden alle Zeilen vermessen =>
+        # stattdessen nach set_gpx_data einmal anhand der sichtbaren Zeilen
+        header.setResizeContentsPrecision(0)
+        self._fit_columns_on_load = False
         if platform.system().startswith("Windows"):
             header.setSectionResizeMode(QHeaderView.Stretch)
         elif platform.system().startswith("Darwin"):        
-            header.setSectionResizeMode(QHeaderView.ResizeToContents)
+            header.setSectionResizeMode(QHeaderView.Interactive)
+            self._fit_columns_on_load = True
         else:
             # Für Linux/sonstige OS ggf. was anderes
-            header.setSectionResizeMode(QHeaderView.ResizeToContents)
+            header.setSectionResizeMode(QHeaderView.Interactive)
+            self._fit_columns_on_load = True
         
        
         
@@ -94,6 +273,8 @@ class GPXListWidget(QWidget):
         self.table.setSizeAdjustPolicy(QAbstractScrollArea.AdjustToContents)
         
         self.table.verticalHeader().setDefaultSectionSize(24)
+        # feste Zeilenhöhe => Qt muss keine Zeilen vermessen
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
        
         self.table.setItemDelegateForColumn(8, MarkColumnDelegate(self.table))
 
@@ -117,25 +298,20 @@ class GPXListWidget(QWidget):
         self._markB_idx = None
         self._markE_idx = None
         
-        self._marked_rows = set()
         
-        
-        self._gpx_times = []
+        self._gpx_times = np.zeros(0)
+        self._time_index = TimeIndex()
         self._last_video_row = None
         self._video_is_playing = False
-        # Bulk update guards and previous state holders
-        self._updating_table = False
-        self._prev_resize_modes = None
-        self._prev_sorting_enabled = None
 
         # Wenn die Auswahl (Selektion) geändert wird
-        self.table.itemSelectionChanged.connect(self._on_table_selection_changed)
+        self.table.selectionModel().selectionChanged.connect(self._on_table_selection_changed)
         
         #time edit functionality 
         self.table.setEditTriggers(QAbstractItemView.DoubleClicked)
-        self.table.itemChanged.connect(self._on_item_changed) 
-        self._original_value = None
-        self.table.itemDoubleClicked.connect(self._on_item_double_clicked)
+        # queued: set_gpx_data setzt das Modell zurück, das darf nicht
+        # mitten im Commit des Editors passieren
+        self._model.timeEdited.connect(self._on_time_edited, Qt.QueuedConnection)
         
     # ---------------------------------------------------
     # markB markE und Deselect
@@ -167,7 +343,7 @@ class GPXListWidget(QWidget):
         if old_b is None and old_e is None:
             self.clear_marked_range()
             self._markB_idx = new_b
-            self._color_mark_cell(new_b, QColor("red"))
+            self._mark_range(new_b, new_b)
             print(f"[DEBUG] set_markB_row => B={new_b} (no E yet)")
             self.markBSet.emit(new_b)
             return
@@ -188,9 +364,9 @@ class GPXListWidget(QWidget):
             # (C1) E=None => B -> B
             if old_e is None:
                 # => wir ersetzen den alten B
-                self._color_mark_cell(old_b, QColor("white"))
+                self._unmark_range(old_b, old_b)
                 self._markB_idx = new_b
-                self._color_mark_cell(new_b, QColor("red"))
+                self._mark_range(new_b, new_b)
                 print(f"[DEBUG] set_markB_row => replaced old B={old_b} => new B={new_b} (E=None)")
                 self.markBSet.emit(new_b)
                 return
@@ -245,7 +421,7 @@ class GPXListWidget(QWidget):
             # E "erstmalig" ohne B
             self.clear_marked_range()  # Sicherheit: alles weg
             self._markE_idx = new_e
-            self._color_mark_cell(new_e, QColor("red"))  # E allein = rote Zelle
+            self._mark_range(new_e, new_e)  # E allein = rote Zelle
             print(f"[DEBUG] set_markE_row => E={new_e} (only E set, no B yet)")
             self.markESet.emit(new_e)
             return
@@ -269,10 +445,10 @@ class GPXListWidget(QWidget):
             if old_b is None:
                 # => wir hatten E allein, jetzt kommt "neuer" E => 
                 # => Farbe in alter E-Zelle zurücksetzen
-                self._color_mark_cell(old_e, QColor("white"))
+                self._unmark_range(old_e, old_e)
                 # => neue E
                 self._markE_idx = new_e
-                self._color_mark_cell(new_e, QColor("red"))
+                self._mark_range(new_e, new_e)
                 self.markESet.emit(new_e)
                 print(f"[DEBUG] set_markE_row => replaced old E={old_e} with new E={new_e}, B=None")
                 return
@@ -310,7 +486,7 @@ class GPXListWidget(QWidget):
             self._unmark_range(b, e)
         elif self._markB_idx is not None:
             # Falls nur B existiert
-            self._color_mark_cell(self._markB_idx, QColor("white"))
+            self._unmark_range(self._markB_idx, self._markB_idx)
         
         self._markB_idx = None
         self._markE_idx = None
@@ -324,48 +500,22 @@ class GPXListWidget(QWidget):
         """
         Färbt Zeilen row_start..row_end (Spalte 8) rot
         """
-        for r in range(row_start, row_end+1):
-            self._color_mark_cell(r, QColor("red"))
+        self._model.mark_range(row_start, row_end)
 
     def _unmark_range(self, row_start: int, row_end: int):
         """
         Färbt Zeilen row_start..row_end (Spalte 8) wieder weiß
         """
-        for r in range(row_start, row_end+1):
-            self._color_mark_cell(r, QColor("white"))
-        
-    
-    
-    def _color_mark_cell(self, row: int, color: QColor):
-        col_mark = 8
-        item = self.table.item(row, col_mark)
-        if not item:
-            item = QTableWidgetItem("")
-            self.table.setItem(row, col_mark, item)
-        item.setBackground(color)
-        
-    def _mark_row_bg_except_markcol(self, row: int, color):
+        self._model.unmark_range(row_start, row_end)
+
+    def _set_highlight_row(self, row):
         """
-        Färbt Spalten 0..7 von `row` in `color`,
-        ohne Spalte 8 (Mark) zu verändern.
+        Färbt Spalten 0..7 von `row` gelb (die vorherige gelbe Zeile wird
+        wieder weiß), ohne Spalte 8 (Mark) zu verändern. None => keine.
         """
-        col_count = self.table.columnCount()  # meist 9
-        for col in range(col_count):
-            if col == 8:
-                continue  # Spalte 8 bleibt, wie sie ist (rot/weiß)
-            item = self.table.item(row, col)
-            if not item:
-                item = QTableWidgetItem("")
-                self.table.setItem(row, col, item)
-            item.setBackground(color)
-    
-    def _set_row_foreground(self, row: int, color):
-        col_count = self.table.columnCount()
-        for col in range(col_count):
-            if col != 8:
-                item = self.table.item(row, col)
-                item.setForeground(color)
-        
+        self._model.set_highlight_row(row)
+        self._last_video_row = row
+
 
     # ---------------------------------------------------
     # 1) Play/Pause
@@ -376,9 +526,10 @@ class GPXListWidget(QWidget):
         """
         if playing and is_gpx_video_shift_set():
             # Beim Umschalten auf Play -> vorhandene manuelle Auswahl entfernen
-            self.table.blockSignals(True)
+            sel_model = self.table.selectionModel()
+            sel_model.blockSignals(True)
             self.table.clearSelection()
-            self.table.blockSignals(False)
+            sel_model.blockSignals(False)
         self._video_is_playing = playing
 
     # ---------------------------------------------------
@@ -393,43 +544,37 @@ class GPXListWidget(QWidget):
         """
         self._video_is_playing = is_playing
 
-        # Alte gelbe Zeile (Spalten 0..7) ggf. weiß
-        if self._last_video_row is not None:
-            self._mark_row_bg_except_markcol(self._last_video_row, Qt.white)
-
-        if not self._gpx_times:
+        if len(self._gpx_times) == 0:
+            # Alte gelbe Zeile (Spalten 0..7) ggf. weiß
+            self._set_highlight_row(None)
             return
 
         # Index mit minimaler Zeitdifferenz
         best_idx = self.get_closest_index_for_time(current_s)
 
-        # Neue Markierung (Spalten 0..7 = gelb)
-        self._mark_row_bg_except_markcol(best_idx, Qt.yellow)
-        self._last_video_row = best_idx
+        # Neue Markierung (Spalten 0..7 = gelb), alte wird weiß
+        self._set_highlight_row(best_idx)
 
         # Scroll-Logik
-        
-        item = self.table.item(best_idx, 0)
-        if not item:
+        index = self._model.index(best_idx, 0)
+        if not index.isValid():
             return
 
         viewport_rect = self.table.viewport().rect()
         if is_playing:
             row_scroll = min(best_idx + 2, self.table.rowCount() - 1)
-            item2 = self.table.item(row_scroll, 0)
-            if item2:
-                item2_rect = self.table.visualItemRect(item2)
-                if not viewport_rect.contains(item2_rect):
-                    self.table.scrollToItem(item2, QAbstractItemView.PositionAtBottom)
+            index2 = self._model.index(row_scroll, 0)
+            if index2.isValid():
+                if not viewport_rect.contains(self.table.visualRect(index2)):
+                    self.table.scrollTo(index2, QAbstractItemView.PositionAtBottom)
         else:
-            item_rect = self.table.visualItemRect(item)
-            if not viewport_rect.contains(item_rect):
-                self.table.scrollToItem(item, QAbstractItemView.PositionAtCenter)
+            if not viewport_rect.contains(self.table.visualRect(index)):
+                self.table.scrollTo(index, QAbstractItemView.PositionAtCenter)
 
     # ---------------------------------------------------
     # 3) Manuelles Klicken im Pause-Modus
     # ---------------------------------------------------
-    def _on_table_selection_changed(self):
+    def _on_table_selection_changed(self, *_):
         """
         Wird aufgerufen, wenn der Nutzer eine Zeile in der Tabelle anklickt
         (im Pause-Modus). Wir wollen verhindern, dass ein bereits
@@ -449,90 +594,62 @@ class GPXListWidget(QWidget):
 
         new_idx = selected[0].row()
 
-        # 1) Alte Zeile 0..7 -> zurück auf weiß (nur, wenn sie nicht in B..E liegt)
-        if self._last_video_row is not None and self._last_video_row != new_idx:
-            # Prüfen, ob _last_video_row in B..E
-            if self._markB_idx is not None and self._markE_idx is not None:
-                b = min(self._markB_idx, self._markE_idx)
-                e = max(self._markB_idx, self._markE_idx)
-                if b <= self._last_video_row <= e:
-                    # => NICHT Spalte 8 ändern, NICHT 0..7 "komplett" weißfärben?
-                    # Wir wollen aber evtl. 0..7 trotzdem auf weiß, 
-                    # damit nicht 2 Zeilen gelb sind.
-                    # => Wir nehmen die Hilfsmethode => except Mark:
-                    self._mark_row_bg_except_markcol(self._last_video_row, Qt.white)
-                else:
-                    # alter Punkt außerhalb B..E => normal auf weiß
-                    self._mark_row_bg_except_markcol(self._last_video_row, Qt.white)
-            else:
-                # kein B..E => normal
-                self._mark_row_bg_except_markcol(self._last_video_row, Qt.white)
-
+        # 1) Alte Zeile 0..7 -> zurück auf weiß, Spalte 8 (B..E) bleibt unberührt
         # 2) Neue Zeile 0..7 => gelb
-        self._mark_row_bg_except_markcol(new_idx, Qt.yellow)
-        self._last_video_row = new_idx
+        self._set_highlight_row(new_idx)
 
         # 3) Jetzt erst das Signal -> MainWindow
         self.rowClickedInPause.emit(new_idx)
         self.rowSelected.emit(new_idx)
 
-    def _on_item_changed(self, item):
-        if self._updating_table or item.column() != 0 or self._original_value is None or self._original_value == item.text():
-            return
-
-        row = item.row()
-        column = item.column()
-        value = item.text()
+    def _on_time_edited(self, row: int, value: str):
+        """Spalte 0 (Zeit) wurde editiert => GPX-Zeit von Zeile row setzen."""
         # Update your internal GPX data
-        print(f"[DEBUG] Item at row {row}, column {column} changed to {value}")
-
-        self._original_value = None
-
-        match column:
-            case 0: 
-                 # Parse relative time and update GPX datetime
-                base_dt = self._gpx_data[0].get("time") - timedelta(seconds=get_gpx_video_shift())
-                if base_dt is None:
-                    return  # Can't apply relative update
-
-                try:
-                    rel_s = self._parse_hhmmss_milli(value)
-                    new_dt = base_dt + timedelta(seconds=rel_s) 
-                    next_dt = self._get_time_of_row(row + 1)  
-                    print(f"[DEBUG] Setting new time for row {row}: {new_dt} (base={base_dt}, rel_s={rel_s})")
-
-                    if next_dt and new_dt >= next_dt:
-                        from PySide6.QtWidgets import QMessageBox
-                        QMessageBox.warning(
-                            self.table,  # parent widget
-                            "Invalid Range",
-                            "New time must be earlier than the next time"
-                        )
-                        self.set_gpx_data(self._gpx_data) # Reset to original value
-                        return
-                    prev_dt = self._get_time_of_row(row -1) 
-
-                    if prev_dt and new_dt <= prev_dt:
-                        from PySide6.QtWidgets import QMessageBox
-                        QMessageBox.warning(
-                            self.table,  # parent widget
-                            "Invalid Range",
-                            f"New time must be later than the previous time"
-                        )
-                        self.set_gpx_data(self._gpx_data) # Reset to original value
-                        return
-                    
-                    self._gpx_data[row]["time"] = new_dt
-                except Exception as e:
-                    print(f"Invalid time format in row {row}: {value} ({e})")
+        print(f"[DEBUG] Time at row {row} changed to {value}")
 
-        from core.gpx_parser import recalc_gpx_data
-        recalc_gpx_data(self._gpx_data)
-        self.set_gpx_data(self._gpx_data)
+        # Parse relative time and update GPX datetime
+        base_dt = self._gpx_data[0].get("time") - timedelta(seconds=get_gpx_video_shift())
+        if base_dt is None:
+            return  # Can't apply relative update
 
-    def _on_item_double_clicked(self, item):
-        if item.column() == 0:
-            self._original_value = item.text()
+        try:
+            rel_s = self._parse_hhmmss_milli(value)
+            new_dt = base_dt + timedelta(seconds=rel_s) 
+            next_dt = self._get_time_of_row(row + 1)  
+            print(f"[DEBUG] Setting new time for row {row}: {new_dt} (base={base_dt}, rel_s={rel_s})")
+
+            if next_dt and new_dt >= next_dt:
+                from PySide6.QtWidgets import QMessageBox
+                QMessageBox.warning(
+                    self.table,  # parent widget
+                    "Invalid Range",
+                    "New time must be earlier than the next time"
+                )
+                self.set_gpx_data(self._gpx_data) # Reset to original value
+                return
+            prev_dt = self._get_time_of_row(row -1) 
+
+            if prev_dt and new_dt <= prev_dt:
+                from PySide6.QtWidgets import QMessageBox
+                QMessageBox.warning(
+                    self.table,  # parent widget
+                    "Invalid Range",
+                    f"New time must be later than the previous time"
+                )
+                self.set_gpx_data(self._gpx_data) # Reset to original value
+                return
+            
+            self._gpx_data[row]["time"] = new_dt
+        except Exception as e:
+            print(f"Invalid time format in row {row}: {value} ({e})")
+
+        from core.gpx_parser import recalc_gpx_data, recalc_range
+        if isinstance(self._gpx_data, Track):
+            # nur die Zeit von Zeile row hat sich geändert => row und row+1
+            recalc_range(self._gpx_data, row, row + 1)
+        else:
+            recalc_gpx_data(self._gpx_data)
+        self.set_gpx_data(self._gpx_data)
 
     def select_row_in_pause(self, row_idx: int):
         if self._video_is_playing and is_gpx_video_shift_set():
@@ -540,22 +657,19 @@ class GPXListWidget(QWidget):
         if not (0 <= row_idx < self.table.rowCount()):
             return
 
-        self.table.blockSignals(True)
-
-        # Falls es eine alte gelbe Zeile gibt
-        if self._last_video_row is not None and self._last_video_row != row_idx:
-            # => 0..7 auf weiß
-            self._mark_row_bg_except_markcol(self._last_video_row, Qt.white)
+        sel_model = self.table.selectionModel()
+        sel_model.blockSignals(True)
 
-        # Neue Zeile 0..7 => gelb
-        self._mark_row_bg_except_markcol(row_idx, Qt.yellow)
-        self._last_video_row = row_idx
+        # Alte gelbe Zeile 0..7 auf weiß, neue Zeile 0..7 => gelb
+        self._set_highlight_row(row_idx)
 
         # Offiziell selektieren
-        self.table.setCurrentCell(row_idx, 0)
+        self.table.setCurrentIndex(self._model.index(row_idx, 0))
         self.table.selectRow(row_idx)
 
-        self.table.blockSignals(False)
+        sel_model.blockSignals(False)
+        # Signale waren blockiert => View selbst neu zeichnen
+        self.table.viewport().update()
  
 
     def delete_selected_range(self, shift: bool = True):
@@ -615,8 +729,11 @@ class GPXListWidget(QWidget):
             shift = old_gap - 1.0
             if shift > 0:
                 from datetime import timedelta
-                for i in range(b, len(self._gpx_data)):
-                    self._gpx_data[i]["time"] = self._gpx_data[i]["time"] - timedelta(seconds=shift)
+                if isinstance(self._gpx_data, Track):
+                    self._gpx_data.shift_time(-timedelta(seconds=shift), start=b)
+                else:
+                    for i in range(b, len(self._gpx_data)):
+                        self._gpx_data[i]["time"] = self._gpx_data[i]["time"] - timedelta(seconds=shift)
             print(f"[DEBUG] SHIFT={shift:.3f}s, old_gap={old_gap:.3f}s")
 
         # 4) Neu berechnen
@@ -674,109 +791,75 @@ class GPXListWidget(QWidget):
     # 4) GPX-Daten
     # ---------------------------------------------------
     def set_gpx_data(self, data):
-        self._begin_table_update()
-        try:
-            self._gpx_data = data
-
-            n = len(data)
-            self.table.clearContents()
-            self.table.setRowCount(n)
-            self._gpx_times = [0.0] * n
-            self._last_video_row = None
-
-            if n == 0:
-                return
-
-            base_dt = data[0].get("time", None)
-            prev_dt = None
-            video_shift = get_gpx_video_shift()
-
-            for row_idx, pt in enumerate(data):
-                dt = pt.get("time", None)
-                if dt and base_dt is not None:
-                    # Faster than timestamp(): use timedelta-based difference
-                    rel_s = (dt - base_dt).total_seconds() + video_shift
-                else:
-                    rel_s = 0.0
-
-                if abs(rel_s) < 0.001:
-                    rel_s = 0.0
-
-                self._gpx_times[row_idx] = rel_s
-
-                # Column 0: time
-                time_str = self._format_hhmmss_milli(rel_s)
-                self._set_cell(row_idx, 0, time_str)
+        """
+        Übergibt die Track-Spalten an das Tabellenmodell. Es werden keine
+        Items erzeugt, die Zelltexte formatiert GPXTableModel.data() erst
+        beim Zeichnen der sichtbaren Zeilen.
+        """
+        self._gpx_data = data
+        self._last_video_row = None
 
-                # Columns 1-2: lat/lon
-                lat_val = pt.get("lat", 0.0)
-                lon_val = pt.get("lon", 0.0)
-                self._set_cell(row_idx, 1, f"{lat_val:.6f}")
-                self._set_cell(row_idx, 2, f"{lon_val:.6f}")
+        n = len(data)
+        if n == 0:
+            self._gpx_times = np.zeros(0)
+            self._time_index = TimeIndex()
+            self._model.set_columns(self._gpx_times, [])
+            return
 
-                # Column 3: step (s)
-                if row_idx == 0 or not dt or not prev_dt:
-                    step_s = 0.0
-                else:
-                    diff_s = (dt - prev_dt).total_seconds()
-                    step_s = diff_s if diff_s > 0 else 0.0
-                self._set_cell(row_idx, 3, f"{step_s:.3f}")
-                prev_dt = dt
-
-                # Columns 4-8: metrics
-                dist_val = pt.get("delta_m", 0.0)
-                self._set_cell(row_idx, 4, f"{dist_val:.2f}")
-                spd_val = pt.get("speed_kmh", 0.0)
-                self._set_cell(row_idx, 5, f"{spd_val:.2f}")
-                ele_val = pt.get("ele", 0.0)
-                self._set_cell(row_idx, 6, f"{ele_val:.2f}")
-                grd_val = pt.get("gradient", 0.0)
-                self._set_cell(row_idx, 7, f"{grd_val:.1f}")
-                self._set_cell(row_idx, 8, "")
-                if rel_s < 0:
-                    self._set_row_foreground(row_idx, Qt.gray)
-        finally:
-            # End of bulk update: restore widget state
-            self._end_table_update()
+        # Zeit-/Schrittwerte einmal vektorisiert, der Rest direkt aus dem Track
+        track = as_track(data)
+        video_shift = get_gpx_video_shift()
+        rel_arr = track.rel_seconds() + video_shift
+        rel_arr[np.isnan(rel_arr)] = 0.0
+        rel_arr[np.abs(rel_arr) < 0.001] = 0.0
+        step_arr = np.zeros(n)
+        if n > 1:
+            t_ns = track.time_ns()
+            diff = np.diff(t_ns).astype(np.float64) / 1e9
+            diff[(t_ns[1:] == NAT) | (t_ns[:-1] == NAT)] = 0.0
+            step_arr[1:] = np.maximum(diff, 0.0)
+        self._gpx_times = rel_arr
+        self._time_index = TimeIndex(rel_arr)
+
+        self._step_arr = step_arr
+        self._model.set_columns(rel_arr, self._table_columns(track))
+        # Spalten sind Sichten in den Track (evtl. memory-mapped) => vor dem
+        # Speichern über die Projektdatei neu holen, sonst bleibt sie gesperrt
+        track.add_release_listener(self._on_track_released)
+        if self._fit_columns_on_load:
+            self.table.resizeColumnsToContents()
+
+    def _table_columns(self, track):
+        return [
+            track.column("lat"),
+            track.column("lon"),
+            self._step_arr,
+            track.column("delta_m"),
+            track.column("speed_kmh"),
+            track.column("ele"),
+            track.column("gradient"),
+        ]
+
+    def _on_track_released(self):
+        track = self._gpx_data
+        if hasattr(track, "add_release_listener") and 0 < len(track) == self._model.rowCount():
+            self._model.swap_columns(self._table_columns(track))
 
     # ---------------------------------------------------
     # 5) get_closest_index_for_time
     # ---------------------------------------------------
     def get_closest_index_for_time(self, current_s: float) -> int:
         """
-        Sucht in self._gpx_times den Index mit minimaler Differenz zu current_s.
+        Sucht in self._gpx_times den Index mit minimaler Differenz zu current_s
+        (Binärsuche über TimeIndex, bei nicht monotonen Zeiten linear).
         """
-        if not self._gpx_times:
-            return 0
-        best_idx = 0
-        best_diff = abs(self._gpx_times[0] - current_s)
-        for i, val in enumerate(self._gpx_times):
-            diff = abs(val - current_s)
-            if diff < best_diff:
-                best_diff = diff
-                best_idx = i
-        return best_idx
+        return self._time_index.closest(current_s)
 
     # ---------------------------------------------------
     # 6) Hilfsfunktionen (Zeilen-Markierung, Format, usw.)
     # ---------------------------------------------------
-    def _mark_row_bg(self, row_index, color):
-        for col in range(self.table.columnCount()):
-            it = self.table.item(row_index, col)
-            if it:
-                it.setBackground(color)
-
     def _format_hhmmss_milli(self, secs: float) -> str:
-        sign = '-' if secs < 0 else ''
-        secs_abs = abs(secs)
-        ms_total = int(round(secs_abs * 1000))
-        hh = ms_total // 3600000
-        rest = ms_total % 3600000
-        mm = rest // 60000
-        rest = rest % 60000
-        ss = rest // 1000
-        ms = rest % 1000
-        return f"{sign}{hh:02d}:{mm:02d}:{ss:02d}.{ms:03d}"
+        return format_hhmmss_milli(secs)
 
     def _parse_hhmmss_milli(self, time_str: str) -> float:
          # Match hh:mm:ss[.mmm] — milliseconds optional
@@ -792,22 +875,6 @@ class GPXListWidget(QWidget):
 
         return h * 3600 + m * 60 + s + ms / 1000.0
 
-    def _set_cell(self, row, col, text):
-        """
-        Efficient cell update: reuse an existing QTableWidgetItem when possible,
-        only update its text. Only column 0 is editable.
-        """
-        item = self.table.item(row, col)
-        if item is None:
-            item = QTableWidgetItem()
-            flags = item.flags()
-            if col == 0:
-                item.setFlags(flags | Qt.ItemIsEditable)
-            else:
-                item.setFlags(flags & ~Qt.ItemIsEditable)
-            self.table.setItem(row, col, item)
-        item.setText(text)
-
     def _get_mainwindow(self):
         """
         Durchwandert die Eltern-Widgets, bis das MainWindow gefunden wird.
@@ -822,41 +889,6 @@ class GPXListWidget(QWidget):
             w = w.parentWidget()
         return None
 
-    # ---------------------------------------------------
-    # Internal: freeze/unfreeze table for bulk updates
-    # ---------------------------------------------------
-    def _begin_table_update(self):
-        if self._updating_table:
-            return
-        self._updating_table = True
-        # Disable signals and repaints to speed up bulk filling
-        self.table.blockSignals(True)
-        self.table.setUpdatesEnabled(False)
-        # Disable sorting because it can be very expensive during cell insert/update
-        self._prev_sorting_enabled = self.table.isSortingEnabled()
-        self.table.setSortingEnabled(False)
-        # Temporarily fix header resize modes to avoid per-row recalculation
-        # (especially when using ResizeToContents)
-        header = self.table.horizontalHeader()
-        self._prev_resize_modes = [header.sectionResizeMode(i) for i in range(self.table.columnCount())]
-        for i in range(self.table.columnCount()):
-            header.setSectionResizeMode(i, QHeaderView.Fixed)
-
-    def _end_table_update(self):
-        # Restore original header resize modes
-        header = self.table.horizontalHeader()
-        if self._prev_resize_modes is not None:
-            for i, mode in enumerate(self._prev_resize_modes):
-                header.setSectionResizeMode(i, mode)
-        self._prev_resize_modes = None
-        # Restore sorting and repaints
-        if self._prev_sorting_enabled is not None:
-            self.table.setSortingEnabled(self._prev_sorting_enabled)
-        self._prev_sorting_enabled = None
-        self.table.blockSignals(False)
-        self.table.setUpdatesEnabled(True)
-        self._updating_table = False
-        
     def _get_time_of_row(self, row_idx: int):
         """
         Gibt das Python-datetime-Objekt zurück, das zu row_idx gehört.
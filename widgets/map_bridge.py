@@ -29,6 +29,11 @@ class MapBridge(QObject):
     syncClickedNoArg = Signal()   # <-- Neue Signal-Variante ohne Parameter
     newPointInsertedSignal = Signal(float, float, int)
     mapboxProfileChangedSignal = Signal(str)  
+    routeSyncReadySignal = Signal()
+
+    # Python => JS: Route-Änderungen (JSON aus core.route_sync.build_patch),
+    # map_page.html hängt applyRoutePatch() daran
+    routePatch = Signal(str)
     
         
     def __init__(self, parent=None):
@@ -90,4 +95,12 @@ class MapBridge(QObject):
         """
         print(f"[Py Debug] => mapboxProfileChanged => profile={profile}")
         # Weitergeben an MainWindow oder sonstige Logik:
-        self.mapboxProfileChangedSignal.emit(profile)
\ No newline at end of file
+        self.mapboxProfileChangedSignal.emit(profile)
+
+    @Slot()
+    def routeSyncReady(self):
+        """
+        JS hat sich mit routePatch verbunden (nach dem QWebChannel-Aufbau).
+        Vorher gesendete Patches wären verloren => MapWidget sendet dann alles.
+        """
+        self.routeSyncReadySignal.emit()
\ No newline at end of file
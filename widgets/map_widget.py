@@ -21,14 +21,17 @@
 import os
 import sys
 import json
+from collections import OrderedDict
 from PySide6.QtWidgets import QWidget, QVBoxLayout
-from PySide6.QtCore import QUrl, Signal, Slot
+from PySide6.QtCore import QUrl, Signal, Slot, QTimer
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWebEngineCore import QWebEngineSettings
 from PySide6.QtWebChannel import QWebChannel
 from PySide6.QtCore import QSettings
 
 from core.gpx_parser import get_gpx_video_shift, is_gpx_video_shift_set
+from core.track import Track
+from core.route_sync import RouteSnapshot, diff_routes, build_patch
 
 
 from .map_bridge import MapBridge
@@ -54,6 +57,18 @@ class MapWidget(QWidget):
         self._markE_idx  = None
         self._curr_mapbox_profile = "cycling"
 
+        # Route-Sync: zuletzt an die Karte gesendeter Stand (siehe sync_route)
+        self._route = None
+        self._route_channel_ready = False
+        self._pending_route = None
+        self._pending_fit = False
+
+        # JS-Befehle werden gesammelt und einmal pro Event-Loop-Durchlauf
+        # als ein runJavaScript() geschickt (siehe run_js)
+        self._js_queue = OrderedDict()
+        self._js_seq = 0
+        self._js_flush_scheduled = False
+
         # Layout + QWebEngineView
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -88,6 +103,7 @@ class MapWidget(QWidget):
         self._bridge.syncClickedNoArg.connect(self._on_sync_noarg_from_js)
         self._bridge.newPointInsertedSignal.connect(self._on_new_point_inserted)
         self._bridge.mapboxProfileChangedSignal.connect(self._on_mapbox_profile_changed)
+        self._bridge.routeSyncReadySignal.connect(self._on_route_sync_ready)
 
     @Slot(bool)
     def _on_map_page_load_finished(self, ok):
@@ -152,7 +168,89 @@ class MapWidget(QWidget):
         
         do_fit_str = "true" if do_fit else "false"
         js = f"loadRoute({json.dumps(route_geojson)}, {do_fit_str});"
-        self.view.page().runJavaScript(js)
+        self.run_js(js, flush=True)
+
+        # Karte hat jetzt einen anderen Stand => nächstes sync_route baut neu auf
+        self._route = None
+        self._pending_route = None
+
+    def sync_route(self, data, do_fit: bool = False):
+        """
+        Zeigt die GPX-Daten (Track oder list[dict]) in der Karte.
+        Gesendet wird nur der Unterschied zum letzten Stand (Punkte
+        einfügen/löschen/verschieben, Farbe grau/schwarz); bei großen
+        Änderungen oder do_fit=True die ganze Route als Float64Array.
+        """
+        new = RouteSnapshot.from_track(data, get_gpx_video_shift())
+        self._num_points = len(new)
+
+        if not self._route_channel_ready:
+            # JS hat sich noch nicht verbunden => in _on_route_sync_ready
+            self._pending_route = new
+            self._pending_fit = self._pending_fit or do_fit
+            return
+
+        ops = None
+        if self._route is not None and not do_fit:
+            ops = diff_routes(self._route, new)
+            if ops == []:
+                return  # unverändert
+        self._route = new
+        if ops is None:
+            print(f"[DEBUG] MapWidget.sync_route: Neuaufbau mit {len(new)} Punkten")
+        else:
+            print(f"[DEBUG] MapWidget.sync_route: {ops}")
+        self.flush_js()  # ältere Befehle beziehen sich noch auf die alten Indizes
+        self._bridge.routePatch.emit(build_patch(new, ops, fit=do_fit))
+
+    @Slot()
+    def _on_route_sync_ready(self):
+        self._route_channel_ready = True
+        if self._pending_route is not None:
+            new, fit = self._pending_route, self._pending_fit
+            self._pending_route = None
+            self._pending_fit = False
+            self._route = new
+            self.flush_js()
+            self._bridge.routePatch.emit(build_patch(new, None, fit=fit))
+
+    # ----------------------------------------------------------
+    # JS-Befehlsqueue
+    # ----------------------------------------------------------
+    def run_js(self, code: str, key=None, flush: bool = False):
+        """
+        Reiht einen JS-Befehl ein. Alles, was in einem Event-Loop-Durchlauf
+        anfällt, geht gemeinsam in einem runJavaScript() raus.
+        Befehle mit gleichem key ersetzen den älteren (der dann entfällt),
+        z.B. mehrere Farbwechsel desselben Punkts während der Wiedergabe.
+        flush=True sendet die Queue (inkl. dieses Befehls) sofort, z.B. für
+        showLoading() vor einer blockierenden Aktion.
+        Alle Aufrufe an die Karte sollten hier durchgehen, sonst kann ein
+        direktes runJavaScript() noch wartende Befehle überholen.
+        """
+        if key is None:
+            self._js_seq += 1
+            key = ("seq", self._js_seq)
+        else:
+            self._js_queue.pop(key, None)  # neu ans Ende => Reihenfolge bleibt
+        self._js_queue[key] = code
+        if flush:
+            self.flush_js()
+            return
+        if not self._js_flush_scheduled:
+            self._js_flush_scheduled = True
+            QTimer.singleShot(0, self.flush_js)
+
+    def flush_js(self):
+        """Sendet die gesammelten Befehle sofort (ein runJavaScript-Aufruf)."""
+        self._js_flush_scheduled = False
+        if not self._js_queue:
+            return
+        codes = list(self._js_queue.values())
+        self._js_queue.clear()
+        # ein fehlerhafter Befehl soll die übrigen nicht abbrechen
+        script = "\n".join(f"try {{ {c} }} catch (e) {{ console.error(e); }}" for c in codes)
+        self.view.page().runJavaScript(script)
 
     # ----------------------------------------------------------
     # Markierungen B/E
@@ -168,17 +266,17 @@ class MapWidget(QWidget):
             return
         self._markB_idx = new_b
         js_code = f"set_markB_point({new_b});"
-        self.view.page().runJavaScript(js_code)
+        self.run_js(js_code)
 
     def set_markE_point(self, new_e: int):
         if new_e < 0:
             return
         js_code = f"set_markE_point({new_e});"
-        self.view.page().runJavaScript(js_code)
+        self.run_js(js_code)
 
     def clear_marked_range(self):
         js_code = "clear_marked_range();"
-        self.view.page().runJavaScript(js_code)
+        self.run_js(js_code)
 
     # ----------------------------------------------------------
     # Play/Pause -> Video
@@ -191,7 +289,7 @@ class MapWidget(QWidget):
 
         if is_gpx_video_shift_set():
             js_bool = "true" if playing else "false"
-            self.view.page().runJavaScript(f"setVideoPlayState({js_bool})")
+            self.run_js(f"setVideoPlayState({js_bool});", key="setVideoPlayState")
 
             if playing:
                 # alten blauen Marker entfernen
@@ -242,7 +340,10 @@ class MapWidget(QWidget):
         js_code = (
             f"highlightPoint({index}, '{color}', {size_str}, {do_center_str});"
         )
-        self.view.page().runJavaScript(js_code)
+        # nur der letzte Stand pro Punkt zählt (Wiedergabe: gelb => zurück);
+        # Zentrieren hat einen eigenen key, damit ein späteres Umfärben es
+        # nicht verschluckt
+        self.run_js(js_code, key=("highlightPoint", index, bool(do_center)))
 
 
     # ----------------------------------------------------------
@@ -338,7 +439,7 @@ class MapWidget(QWidget):
 
         # Sicherer Zugriff auf GPX-Daten
         gpx_data = getattr(self._mainwindow, "_gpx_data", None)
-        if not isinstance(gpx_data, list) or len(gpx_data) == 0:
+        if not isinstance(gpx_data, (list, Track)) or len(gpx_data) == 0:
             # Keine Daten => neutrales Schwarz
             return "black"
         if i < 0 or i >= len(gpx_data):
@@ -385,12 +486,12 @@ class MapWidget(QWidget):
         self._blue_idx = idx
         self._color_point(idx, "blue", None, False)  # ← blau färben
         js = f"selectPointByIndex({idx});"
-        self.view.page().runJavaScript(js)
+        self.run_js(js, key="selectPointByIndex")
     
     def zoom_to_index(self, idx: int, zoom: int = 18):
         print(f"[DEBUG] MapWidget.zoom_to_index idx={idx} zoom={zoom}")
         js = f"zoomToIndex({idx}, {int(zoom)});"
-        self.view.page().runJavaScript(js)
+        self.run_js(js, key="zoomToIndex")
     
     def _on_mapbox_profile_changed(self, profile: str):
         print(f"[DEBUG] MapWidget: mapboxProfileChanged => profile={profile}")
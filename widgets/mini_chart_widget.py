@@ -20,9 +20,13 @@
 
 # widgets/mini_chart_widget.py
 
+import numpy as np
+
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt, QRect
-from PySide6.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PySide6.QtCore import Qt, QRect, QLineF
+from PySide6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPixmap
+
+from core.track import as_track
 
 class MiniChartWidget(QWidget):
     """
@@ -44,10 +48,15 @@ class MiniChartWidget(QWidget):
 
         # Interne Daten
         self._gpx_data = []
+        self._track = as_track([])
         self._max_points = 30   # Standard: 30 Gpx-Punkte anzeigen
         self._marker_ratio_x = 0.7  # 70% vom Widget
         self._current_index = 0     # Welcher Punkt ist 'aktuell'?
 
+        # Zuletzt gezeichnetes Bild und sein Schlüssel (siehe paintEvent)
+        self._pixmap = None
+        self._pixmap_key = None
+
     def set_max_points(self, num: int):
         """Erlaubt es dir, die max. Anzahl von GPX-Punkten (30) zu ändern."""
         self._max_points = max(1, num)
@@ -61,6 +70,7 @@ class MiniChartWidget(QWidget):
         und ein paar 'danach', damit die Kurve "scrollt".
         """
         self._gpx_data = data or []
+        self._track = as_track(self._gpx_data)
         self.update()
 
     def set_current_index(self, idx: int):
@@ -69,25 +79,44 @@ class MiniChartWidget(QWidget):
             idx = 0
         if idx >= len(self._gpx_data):
             idx = len(self._gpx_data) - 1
+        if idx == self._current_index:
+            return  # Timer-Tick ohne neuen Punkt => nichts neu zeichnen
         self._current_index = idx
         self.update()
 
     def paintEvent(self, event):
         super().paintEvent(event)
-        if not self._gpx_data:
+        if len(self._track) == 0:
             return
 
+        # Gezeichnet wird nur bei neuem Index/Daten/Größe, sonst reicht
+        # das gemerkte Pixmap (z.B. wenn das Fenster nur neu freigelegt wird)
+        w = self.width()
+        h = self.height()
+        dpr = self.devicePixelRatioF()
+        track = self._track
+        key = (id(track), track.version, len(track), self._current_index,
+               self._max_points, w, h, dpr)
+        if self._pixmap is None or self._pixmap_key != key:
+            self._pixmap = QPixmap(max(1, int(w * dpr)), max(1, int(h * dpr)))
+            self._pixmap.setDevicePixelRatio(dpr)
+            pm_painter = QPainter(self._pixmap)
+            try:
+                self._paint_chart(pm_painter, w, h)
+            finally:
+                pm_painter.end()
+            self._pixmap_key = key
+
         painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.end()
+
+    def _paint_chart(self, painter, w: int, h: int):
         painter.setRenderHint(QPainter.Antialiasing, True)
-        
-        painter.fillRect(self.rect(), QColor("#333333"))
-        
-        rect_ = self.rect()
-        w = rect_.width()
-        h = rect_.height()
+        painter.fillRect(QRect(0, 0, w, h), QColor("#333333"))
 
         # 1) Berechne, welche GPX-Punkte wir anzeigen (Fenster um current_index).
-        N = len(self._gpx_data)
+        N = len(self._track)
         if N < 1:
             return
 
@@ -103,13 +132,13 @@ class MiniChartWidget(QWidget):
         if end_i >= N:
             end_i = N - 1
 
-        # Extrahiere Teilbereich
-        relevant_points = self._gpx_data[start_i : end_i+1]
-        count_window = len(relevant_points)
+        # Extrahiere Teilbereich (Sicht auf die Track-Spalten, keine Kopie)
+        elevations = np.nan_to_num(self._track.column("ele")[start_i:end_i + 1], nan=0.0)
+        count_window = len(elevations)
         if count_window < 2:
             return
 
-        # Index des c_idx in relevant_points:
+        # Index des c_idx im Fenster:
         local_idx = c_idx - start_i
 
         # x-Positionen definieren wir in [0..1], 
@@ -120,43 +149,29 @@ class MiniChartWidget(QWidget):
 
         # WICHTIG: Wir verwenden die Höhendaten (ele) für eine natürliche Darstellung
         # statt der Steigung (gradient)
-        elevations = [p.get("ele", 0.0) for p in relevant_points]
-        
-        if not elevations:
-            return
-            
-        min_ele = min(elevations)
-        max_ele = max(elevations)
+        min_ele = float(elevations.min())
+        max_ele = float(elevations.max())
         
         # Vermeide Division durch Null
         if abs(max_ele - min_ele) < 0.1:
             max_ele = min_ele + 10.0  # 10 Meter Puffer bei flachen Strecken
 
-        pts_screen = []
-        for i, p in enumerate(relevant_points):
-            x_data = i*step + shift_x
-            ele = p.get("ele", 0.0)
-            
-            # Y-Berechnung basierend auf Höhe
-            # Höhere Punkte weiter oben, niedrigere weiter unten
-            frac = (ele - min_ele) / (max_ele - min_ele)
-            y_pix = h - 10 - (frac * (h - 20))  # 10px Rand oben und unten
-            
-            x_pix = x_data * w
-            pts_screen.append((x_pix, y_pix))
+        # Y-Berechnung basierend auf Höhe
+        # Höhere Punkte weiter oben, niedrigere weiter unten
+        frac = (elevations - min_ele) / (max_ele - min_ele)
+        ys = (h - 10 - (frac * (h - 20))).tolist()  # 10px Rand oben und unten
+        xs = ((np.arange(count_window) * step + shift_x) * w).tolist()
 
         # Zeichne die Höhenlinie
         pen_line = QPen(QColor("#00cccc"), 2)
         painter.setPen(pen_line)
-        for i in range(len(pts_screen)-1):
-            (x1, y1) = pts_screen[i]
-            (x2, y2) = pts_screen[i+1]
-            painter.drawLine(x1, y1, x2, y2)
+        painter.drawLines([QLineF(xs[i], ys[i], xs[i + 1], ys[i + 1])
+                           for i in range(count_window - 1)])
 
         # Zeichne Punkte
         painter.setPen(Qt.NoPen)
         painter.setBrush(QColor("#cccccc"))
-        for (xx, yy) in pts_screen:
+        for xx, yy in zip(xs, ys):
             painter.drawEllipse(int(xx)-1, int(yy)-1, 4, 4)
 
         # Zeichne Marker-Linie
@@ -166,17 +181,14 @@ class MiniChartWidget(QWidget):
         painter.drawLine(x_marker, 0, x_marker, h)
 
         # Zeichne aktuellen Punkt und Steigungswert
-        if 0 <= local_idx < len(pts_screen):
-            xP, yP = pts_screen[local_idx]
+        if 0 <= local_idx < count_window:
+            xP, yP = xs[local_idx], ys[local_idx]
             painter.setBrush(QColor("#ffff00"))
             painter.drawEllipse(int(xP)-3, int(yP)-3, 6, 6)
 
-            # Steigung und Höhe als Text anzeigen
-            slope_val = relevant_points[local_idx].get("gradient", 0.0)
-            ele_val = relevant_points[local_idx].get("ele", 0.0)
-            
-            # Kombinierte Anzeige: Steigung und Höhe
-            #info_str = f"{slope_val:.1f}% / {ele_val:.0f}m"
+            # Steigung als Text anzeigen
+            # fehlende Steigung => 0 statt "nan%"
+            slope_val = float(np.nan_to_num(self._track.column("gradient")[c_idx]))
             info_str = f"{slope_val:.1f}%"
             
             
@@ -196,4 +208,4 @@ class MiniChartWidget(QWidget):
                 # Punkt unten -> Text oben anzeigen
                 text_y = 15
                 
-            painter.drawText(x_marker - text_w//2, text_y, info_str)
\ No newline at end of file
+            painter.drawText(x_marker - text_w//2, text_y, info_str)